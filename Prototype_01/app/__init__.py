@@ -2,10 +2,30 @@ from flask import Flask
 from config import Config
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail
+from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
 
 
 db = SQLAlchemy()
 mail = Mail()
+migrate = Migrate()
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """
+    WAL lets readers keep working while a schedule run writes, and
+    synchronous=NORMAL is durable enough under WAL while syncing far less.
+    The busy timeout comes from the connect_args set in config.py.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
 
 def create_app(config_class=Config):
@@ -14,6 +34,11 @@ def create_app(config_class=Config):
 
     db.init_app(app)
     mail.init_app(app)
+    migrate.init_app(app, db)
+
+    from app.utils import metrics
+
+    metrics.init_app(app)
 
     from app.routes import bp as main_blueprint
 
@@ -23,8 +48,16 @@ def create_app(config_class=Config):
 
     app.register_blueprint(admin_blueprint)
 
+    from app.api import bp as api_blueprint
+
+    app.register_blueprint(api_blueprint)
+
     from . import models
 
+    from app.commands import register_commands
+
+    register_commands(app)
+
     print(f"Using database at: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
     return app
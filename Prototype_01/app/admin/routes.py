@@ -1,11 +1,12 @@
-from flask import render_template, redirect, url_for, flash
-from sqlalchemy import desc
+import datetime
+import io
+from flask import render_template, redirect, url_for, flash, request
 from sqlalchemy.exc import IntegrityError
 from app import db
 from app.admin import bp
-from app.forms import EmployeeForm, PerformanceLogForm
-from app.models import Employee, Shift, PerformanceLog
-from datetime import timedelta
+from app.forms import EmployeeForm, EmployeeImportForm, PerformanceLogForm
+from app.models import Employee, EmployeePerformanceSummary, PerformanceLog
+from app.utils import cache, employee_store, performance
 
 
 @bp.route("/employees")
@@ -21,6 +22,20 @@ def list_employees():
         return redirect(url_for("main.index"))
 
 
+def _flash_employee_conflicts(name, email, exclude_id=None):
+    """Reports which unique fields made an employee write fail."""
+    fields = employee_store.conflicting_fields(name, email, exclude_id)
+    if "name" in fields:
+        flash(f'Error: Name "{name}" is already used by another employee.', "danger")
+    if "email" in fields:
+        flash(
+            f'Error: Email "{email}" is already registered by another employee.',
+            "danger",
+        )
+    if not fields:
+        flash("Database error: Could not save employee. Please try again.", "danger")
+
+
 @bp.route("/employee/edit/<int:employee_id>", methods=["GET", "POST"])
 def edit_employee(employee_id):
     """Route for editing an existing employee."""
@@ -28,47 +43,37 @@ def edit_employee(employee_id):
     form = EmployeeForm(obj=employee)
 
     if form.validate_on_submit():
-        error = False
-        if form.email.data != employee.email:
-            existing_email = Employee.query.filter(
-                Employee.email == form.email.data, Employee.id != employee.id
-            ).first()
-            if existing_email:
-                flash(
-                    f'Error: Email "{form.email.data}" is already registered by another employee.',
-                    "danger",
-                )
-                error = True
-
-        if form.name.data != employee.name:
-            existing_name = Employee.query.filter(
-                Employee.name == form.name.data, Employee.id != employee.id
-            ).first()
-            if existing_name:
-                flash(
-                    f'Error: Name "{form.name.data}" is already used by another employee.',
-                    "danger",
-                )
-                error = True
-
-        if not error:
+        # The unique indexes on name and email are the duplicate check; the
+        # conflicting fields are only looked up if the write fails.
+        try:
+            # Names, positions and rates appear on the cached schedule page.
+            if (
+                form.name.data != employee.name
+                or form.position.data != employee.position
+                or form.hourly_rate.data != employee.hourly_rate
+            ):
+                cache.bump_version(cache.SCHEDULE)
+            # Names and positions appear in the cached employee pickers.
+            if (
+                form.name.data != employee.name
+                or form.position.data != employee.position
+            ):
+                cache.bump_version(cache.EMPLOYEES)
             employee.name = form.name.data
             employee.position = form.position.data
             employee.email = form.email.data
             employee.hourly_rate = form.hourly_rate.data
-            try:
-                db.session.commit()
-                flash(f'Employee "{employee.name}" updated successfully!', "success")
-                return redirect(url_for("admin.list_employees"))
-            except IntegrityError:
-                db.session.rollback()
-                flash(
-                    "Database error: Could not update employee. Possible duplicate name or email.",
-                    "danger",
-                )
-            except Exception as e:
-                db.session.rollback()
-                flash(f"An unexpected error occurred: {e}", "danger")
+            db.session.commit()
+            flash(f'Employee "{employee.name}" updated successfully!', "success")
+            return redirect(url_for("admin.list_employees"))
+        except IntegrityError:
+            db.session.rollback()
+            _flash_employee_conflicts(
+                form.name.data, form.email.data, exclude_id=employee_id
+            )
+        except Exception as e:
+            db.session.rollback()
+            flash(f"An unexpected error occurred: {e}", "danger")
 
     return render_template("admin/employee_form.html", title="Edit Employee", form=form)
 
@@ -78,35 +83,57 @@ def add_employee():
     """Route for adding a new employee."""
     form = EmployeeForm()
     if form.validate_on_submit():
-        existing_employee = Employee.query.filter(
-            (Employee.email == form.email.data) | (Employee.name == form.name.data)
-        ).first()
-        if existing_employee:
-            flash("Error: Employee with that name or email already exists.", "danger")
+        new_employee = Employee(
+            name=form.name.data,
+            position=form.position.data,
+            email=form.email.data,
+            hourly_rate=form.hourly_rate.data,
+        )
+        try:
+            db.session.add(new_employee)
+            cache.bump_version(cache.EMPLOYEES)
+            db.session.commit()
+            flash(f'Employee "{new_employee.name}" added successfully!', "success")
+            return redirect(url_for("admin.list_employees"))
+        except IntegrityError:
+            db.session.rollback()
+            _flash_employee_conflicts(form.name.data, form.email.data)
+        except Exception as e:
+            db.session.rollback()
+            flash(f"An unexpected error occurred: {e}", "danger")
+
+    return render_template(
+        "admin/employee_form.html", title="Add New Employee", form=form
+    )
+
+
+@bp.route("/employees/import", methods=["GET", "POST"])
+def import_employees():
+    """Bulk-adds or updates employees from an uploaded CSV file."""
+    form = EmployeeImportForm()
+    if form.validate_on_submit():
+        stream = io.TextIOWrapper(form.file.data.stream, encoding="utf-8-sig", newline="")
+        try:
+            result = employee_store.import_employees_csv(stream)
+        except ValueError as e:
+            flash(str(e), "danger")
+        except Exception as e:
+            flash(f"Import failed, nothing was saved: {e}", "danger")
         else:
-            new_employee = Employee(
-                name=form.name.data,
-                position=form.position.data,
-                email=form.email.data,
-                hourly_rate=form.hourly_rate.data,
+            flash(
+                f"Imported employees: {result.inserted} added, {result.updated} updated, "
+                f"{result.unchanged} unchanged, {len(result.errors)} skipped.",
+                "success" if not result.errors else "warning",
+            )
+            return render_template(
+                "admin/employee_import.html",
+                title="Import Employees",
+                form=EmployeeImportForm(formdata=None),
+                errors=result.errors,
             )
-            try:
-                db.session.add(new_employee)
-                db.session.commit()
-                flash(f'Employee "{new_employee.name}" added successfully!', "success")
-                return redirect(url_for("admin.list_employees"))
-            except IntegrityError:
-                db.session.rollback()
-                flash(
-                    "Database error: Employee with this name or email might already exist.",
-                    "danger",
-                )
-            except Exception as e:
-                db.session.rollback()
-                flash(f"An unexpected error occurred: {e}", "danger")
 
     return render_template(
-        "admin/employee_form.html", title="Add New Employee", form=form
+        "admin/employee_import.html", title="Import Employees", form=form, errors=[]
     )
 
 
@@ -116,22 +143,23 @@ def delete_employee(employee_id):
 
     employee = Employee.query.get_or_404(employee_id)
     try:
-        has_shifts = Shift.query.filter_by(employee_id=employee.id).first()
-        has_logs = PerformanceLog.query.filter_by(employee_id=employee.id).first()
-
-        if has_shifts or has_logs:
-            relations = []
-            if has_shifts:
-                relations.append("shifts")
-            if has_logs:
-                relations.append("performance logs")
+        relations = employee_store.dependent_records(employee.id)
+
+        if relations:
             flash(
                 f'Cannot delete employee "{employee.name}" because they have existing {" and ".join(relations)}. Please reassign or delete associated records first.',
                 "danger",
             )
         else:
             employee_name = employee.name
+            # Drops a summary row left over from logs removed outside the app.
+            db.session.execute(
+                db.delete(EmployeePerformanceSummary).where(
+                    EmployeePerformanceSummary.employee_id == employee.id
+                )
+            )
             db.session.delete(employee)
+            cache.bump_version(cache.EMPLOYEES)
             db.session.commit()
             flash(f'Employee "{employee_name}" deleted successfully.', "success")
 
@@ -149,32 +177,9 @@ def add_performance_log():
         employee = form.employee.data
         log_date = form.log_date.data
 
-        try:
-            start_of_month = log_date.replace(day=1)
-            next_month = start_of_month + timedelta(days=32)
-            start_of_next_month = next_month.replace(day=1)
-
-            existing_log = PerformanceLog.query.filter(
-                PerformanceLog.employee_id == employee.id,
-                PerformanceLog.log_date >= start_of_month,
-                PerformanceLog.log_date < start_of_next_month,
-            ).first()
-
-            if existing_log:
-                flash(
-                    f"Error: A performance log already exists for {employee.name} in {log_date.strftime('%B %Y')}. Only one per month allowed.",
-                    "danger",
-                )
-                return render_template(
-                    "admin/add_performance.html", title="Log Performance", form=form
-                )
-
-        except Exception as e:
-            flash(f"Error checking for existing logs: {e}", "danger")
-            return render_template(
-                "admin/add_performance.html", title="Log Performance", form=form
-            )
-
+        # The (employee_id, log_month) unique constraint enforces one log per
+        # month, so insert directly instead of checking first. The flush
+        # raises on a duplicate before the summary row is touched.
         new_log = PerformanceLog(
             employee_id=employee.id,
             log_date=log_date,
@@ -183,40 +188,105 @@ def add_performance_log():
         )
         try:
             db.session.add(new_log)
+            db.session.flush()
+            performance.record_log(new_log)
             db.session.commit()
             flash(
                 f"Performance logged successfully for {employee.name} on {log_date}.",
                 "success",
             )
             return redirect(url_for("admin.add_performance_log"))
+        except IntegrityError:
+            db.session.rollback()
+            flash(
+                f"Error: A performance log already exists for {employee.name} in {log_date.strftime('%B %Y')}. Only one per month allowed.",
+                "danger",
+            )
         except Exception as e:
             db.session.rollback()
             flash(f"Database error saving performance log: {e}", "danger")
-            return render_template(
-                "admin/add_performance.html", title="Log Performance", form=form
-            )
 
     return render_template(
         "admin/add_performance.html", title="Log Performance", form=form
     )
 
 
+DASHBOARD_MONTHS = 6
+
+
+def _dashboard_range():
+    """Returns (start, end_exclusive) dates from ?start= and ?end= (inclusive)."""
+    try:
+        end = request.args.get("end")
+        end = (
+            datetime.datetime.strptime(end, "%Y-%m-%d").date()
+            if end
+            else datetime.date.today()
+        )
+        start = request.args.get("start")
+        if start:
+            start = datetime.datetime.strptime(start, "%Y-%m-%d").date()
+        else:
+            month_index = end.year * 12 + end.month - 1 - (DASHBOARD_MONTHS - 1)
+            start = datetime.date(month_index // 12, month_index % 12 + 1, 1)
+    except ValueError:
+        raise ValueError("Dates must be in YYYY-MM-DD format.")
+    if end < start:
+        raise ValueError("The end date must not be before the start date.")
+    return start, end + datetime.timedelta(days=1)
+
+
+def _decode_log_cursor(cursor):
+    try:
+        log_date, log_id = cursor.rsplit("_", 1)
+        return datetime.date.fromisoformat(log_date), int(log_id)
+    except ValueError:
+        raise ValueError("Invalid page cursor.")
+
+
 @bp.route("/performance/dashboard")
 def performance_dashboard():
-    """Displays recorded performance logs in a table."""
+    """
+    Displays per-employee and per-position rating aggregates for a date range
+    (?start=&end=, both YYYY-MM-DD and inclusive; by default the last
+    DASHBOARD_MONTHS months) above one keyset-paginated page of the logs.
+    """
     print("Accessed /performance_dashboard route")
     try:
-        logs = (
-            db.session.query(PerformanceLog)
-            .join(PerformanceLog.employee)
-            .order_by(desc(PerformanceLog.log_date), Employee.name)
-            .all()
+        start, end_exclusive = _dashboard_range()
+        cursor = request.args.get("cursor")
+        after = _decode_log_cursor(cursor) if cursor else None
+    except ValueError as e:
+        flash(str(e), "warning")
+        return redirect(url_for("admin.performance_dashboard"))
+
+    try:
+        summaries = performance.employee_summaries(start, end_exclusive)
+        current = performance.current_ratings(summary.employee_id for summary in summaries)
+        positions = performance.position_summaries(summaries)
+
+        # One extra row tells us whether another page exists without a COUNT.
+        logs = performance.log_page(
+            start, end_exclusive, after=after, limit=performance.LOG_PAGE_SIZE + 1
         )
+        next_cursor = None
+        if len(logs) > performance.LOG_PAGE_SIZE:
+            logs = logs[: performance.LOG_PAGE_SIZE]
+            next_cursor = f"{logs[-1].log_date.isoformat()}_{logs[-1].id}"
 
-        print(f"Found {len(logs)} performance logs.")
+        print(f"Loaded {len(summaries)} employee summaries and {len(logs)} logs.")
 
         return render_template(
-            "admin/performance_dashboard.html", title="Performance Dashboard", logs=logs
+            "admin/performance_dashboard.html",
+            title="Performance Dashboard",
+            logs=logs,
+            summaries=summaries,
+            current=current,
+            positions=positions,
+            start=start,
+            end=end_exclusive - datetime.timedelta(days=1),
+            cursor=cursor,
+            next_cursor=next_cursor,
         )
 
     except Exception as e:
@@ -0,0 +1,160 @@
+from flask import Response, jsonify, request, stream_with_context
+from app.api import bp
+from app.utils import employee_directory, labor_cost, shift_store
+import datetime
+import json
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+STREAM_CHUNK_SIZE = 1000
+
+
+def _parse_date(name):
+    value = request.args.get(name)
+    if not value:
+        raise ValueError(f"'{name}' is required (YYYY-MM-DD).")
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format.")
+
+
+def _shift_filters():
+    """
+    Reads the range and filters shared by the shift endpoints.
+
+    `start` is inclusive and `end` exclusive, both dates. Returns
+    (start, end_exclusive, filters) or raises ValueError.
+    """
+    start = _parse_date("start")
+    end_exclusive = _parse_date("end")
+    if end_exclusive <= start:
+        raise ValueError("'end' must be after 'start'.")
+
+    filters = {"position": request.args.get("position") or None}
+    employee_id = request.args.get("employee_id")
+    if employee_id:
+        if not employee_id.isdigit():
+            raise ValueError("'employee_id' must be an integer.")
+        filters["employee_id"] = int(employee_id)
+    return start, end_exclusive, filters
+
+
+def _encode_cursor(row):
+    return f"{row.start_time.isoformat()}_{row.id}"
+
+
+def _decode_cursor(cursor):
+    try:
+        start_time, shift_id = cursor.rsplit("_", 1)
+        return datetime.datetime.fromisoformat(start_time), int(shift_id)
+    except ValueError:
+        raise ValueError("'cursor' is not a valid page cursor.")
+
+
+def _shift_json(row):
+    return {
+        "id": row.id,
+        "start_time": row.start_time.isoformat(),
+        "end_time": row.end_time.isoformat(),
+        "required_position": row.required_position,
+        "employee_id": row.employee_id,
+        "employee_name": row.employee_name,
+    }
+
+
+@bp.route("/shifts")
+def list_shifts():
+    """
+    Returns one page of shifts in [start, end) as JSON, ordered by
+    (start_time, id).
+
+    Query parameters: start, end (YYYY-MM-DD, required), position,
+    employee_id, limit (default 500, max 5000) and cursor (the next_cursor
+    of the previous page). next_cursor is null on the last page.
+    """
+    try:
+        start, end_exclusive, filters = _shift_filters()
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        if limit < 1:
+            raise ValueError("'limit' must be a positive integer.")
+        limit = min(limit, MAX_PAGE_SIZE)
+        cursor = request.args.get("cursor")
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # One extra row tells us whether another page exists without a COUNT.
+    rows = shift_store.shift_page(
+        start, end_exclusive, after=after, limit=limit + 1, **filters
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify(
+        {
+            "shifts": [_shift_json(row) for row in rows],
+            "next_cursor": _encode_cursor(rows[-1]) if has_more else None,
+        }
+    )
+
+
+@bp.route("/employees")
+def search_employees():
+    """
+    Employee autocomplete: returns {"employees": [{id, name, position}]} for
+    names starting with ?q= (case-insensitive), ordered by name.
+
+    Query parameters: q, position, limit (default 20, max 100).
+    """
+    limit = request.args.get("limit", employee_directory.SEARCH_LIMIT, type=int)
+    if limit < 1:
+        return jsonify({"error": "'limit' must be a positive integer."}), 400
+    rows = employee_directory.search_employees(
+        request.args.get("q", ""),
+        limit=min(limit, employee_directory.MAX_SEARCH_LIMIT),
+        position=request.args.get("position") or None,
+    )
+    return jsonify({"employees": [row._asdict() for row in rows]})
+
+
+@bp.route("/shifts.ndjson")
+def stream_shifts():
+    """
+    Streams every shift in [start, end) as newline-delimited JSON, one shift
+    per line. Takes the same filters as /api/shifts; rows are read in keyset
+    chunks so large ranges are never held in memory.
+    """
+    try:
+        start, end_exclusive, filters = _shift_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        for row in shift_store.iter_shift_rows(
+            start, end_exclusive, chunk_size=STREAM_CHUNK_SIZE, **filters
+        ):
+            yield json.dumps(_shift_json(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@bp.route("/shifts.csv")
+def export_shifts_csv():
+    """
+    Streams the payroll export for [start, end) as CSV: every shift with the
+    assigned employee, their hourly rate, and the shift's hours and cost.
+    """
+    try:
+        start = _parse_date("start")
+        end_exclusive = _parse_date("end")
+        if end_exclusive <= start:
+            raise ValueError("'end' must be after 'start'.")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = f"shifts_{start:%Y-%m-%d}_{end_exclusive:%Y-%m-%d}.csv"
+    return Response(
+        stream_with_context(labor_cost.iter_shift_cost_csv(start, end_exclusive)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
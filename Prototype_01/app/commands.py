@@ -0,0 +1,123 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("drain-outbox")
+@click.option("--batch-size", type=int, default=None, help="Emails claimed per batch.")
+@click.option("--loop", is_flag=True, help="Keep polling for new emails instead of exiting.")
+@click.option("--interval", type=float, default=5.0, help="Idle poll interval in seconds.")
+@with_appcontext
+def drain_outbox_command(batch_size, loop, interval):
+    """Delivers queued emails from the EmailOutbox table."""
+    from app.utils.outbox import drain_outbox
+
+    drain_outbox(batch_size=batch_size, loop=loop, interval=interval, echo=click.echo)
+
+
+@click.command("export-shifts")
+@click.option("--start", type=click.DateTime(["%Y-%m-%d"]), required=True, help="First day (inclusive).")
+@click.option("--end", type=click.DateTime(["%Y-%m-%d"]), required=True, help="Last day (exclusive).")
+@click.option("--output", type=click.File("w"), default="-", help="CSV file to write (default: stdout).")
+@with_appcontext
+def export_shifts_command(start, end, output):
+    """Exports shifts with hours and labor cost as CSV for payroll."""
+    from app.utils.labor_cost import iter_shift_cost_csv
+
+    if end <= start:
+        raise click.BadParameter("--end must be after --start.")
+    for chunk in iter_shift_cost_csv(start, end):
+        output.write(chunk)
+
+
+@click.command("upgrade-database")
+@with_appcontext
+def upgrade_database_command():
+    """Migrates the database to the latest revision, adopting unversioned ones."""
+    from app.utils.db_versioning import upgrade_database
+
+    try:
+        upgrade_database(echo=click.echo)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command():
+    """Checks that the hot Shift/PerformanceLog queries use their indexes."""
+    from app.utils.query_plans import check_query_plans
+
+    missing = 0
+    for name, plan, used in check_query_plans():
+        click.echo(f"{name}: {'uses ' + used if used else 'NO EXPECTED INDEX'}")
+        click.echo("    " + plan.replace("\n", "\n    "))
+        missing += used is None
+    if missing:
+        raise click.ClickException(f"{missing} queries do not use their indexes.")
+
+
+@click.command("forecast-batch")
+@click.argument("data", type=click.Path(exists=True, dir_okay=False))
+@click.option("--days", type=click.IntRange(1, 366), default=7, show_default=True, help="Days to forecast past each series.")
+@click.option("--series-column", default="series_id", show_default=True, help="Column identifying each series.")
+@click.option("--workers", type=int, default=None, help="Parallel fits (default: FORECAST_WORKERS).")
+@click.option("--engine", default=None, help="Forecasting engine (default: FORECAST_ENGINE).")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the combined forecast to this CSV.")
+@with_appcontext
+def forecast_batch_command(data, days, series_column, workers, engine, output):
+    """Forecasts every series (location, station, ...) in a long-format CSV/Parquet file."""
+    from app.utils.forecasting import generate_batch_forecast
+
+    try:
+        result = generate_batch_forecast(data, days, series_column, workers, engine)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for series in result.series:
+        status = f"failed: {series.error}" if series.error else f"{series.source}, {series.rows} rows"
+        click.echo(f"{series.series_id}: {status} ({series.seconds:.2f}s)")
+    if output:
+        result.forecast.to_csv(output, index=False)
+        click.echo(f"Wrote {len(result.forecast)} rows to {output}.")
+    if any(series.error for series in result.series):
+        raise click.ClickException("Some series could not be forecast.")
+
+
+@click.command("rebuild-performance-summaries")
+@with_appcontext
+def rebuild_performance_summaries_command():
+    """Recomputes every employee's performance summary from their logs."""
+    from app.utils.performance import rebuild_all_summaries
+
+    count = rebuild_all_summaries()
+    click.echo(f"Rebuilt performance summaries for {count} employees.")
+
+
+@click.command("import-employees")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--batch-size", type=int, default=None, help="Rows written per batch.")
+@with_appcontext
+def import_employees_command(csv_file, batch_size):
+    """Adds or updates employees (matched by email) from a CSV file."""
+    from app.utils.employee_store import IMPORT_BATCH_SIZE, import_employees_csv
+
+    try:
+        result = import_employees_csv(csv_file, batch_size or IMPORT_BATCH_SIZE)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for line, message in result.errors:
+        click.echo(f"line {line}: skipped, {message}")
+    click.echo(
+        f"{result.inserted} added, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {len(result.errors)} skipped."
+    )
+
+
+def register_commands(app):
+    app.cli.add_command(drain_outbox_command)
+    app.cli.add_command(export_shifts_command)
+    app.cli.add_command(upgrade_database_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(forecast_batch_command)
+    app.cli.add_command(rebuild_performance_summaries_command)
+    app.cli.add_command(import_employees_command)
@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     SubmitField,
     FloatField,
@@ -9,13 +10,43 @@ from wtforms import (
     SelectField,
 )
 from wtforms.validators import DataRequired, Optional, NumberRange, Email
-from wtforms_sqlalchemy.fields import QuerySelectField
+from app import db
 from app.models import Employee
+from app.utils.employee_directory import employee_choices
 import datetime
 
 
-def employee_query():
-    return Employee.query.order_by(Employee.name)
+class EmployeeSelectField(SelectField):
+    """
+    An employee <select> whose options come from the cached (id, name,
+    position) projection. Submitted values are validated with a single
+    primary-key lookup; `data` is the selected Employee, or None.
+    """
+
+    def __init__(self, label=None, validators=None, blank_text="", **kwargs):
+        super().__init__(label, validators, validate_choice=False, **kwargs)
+        self.blank_text = blank_text
+
+    def iter_choices(self):
+        selected_id = self.data.id if self.data is not None else None
+        yield ("", self.blank_text, selected_id is None, {})
+        for choice in employee_choices():
+            yield (str(choice.id), choice.name, choice.id == selected_id, {})
+
+    def process_data(self, value):
+        self.data = value
+
+    def process_formdata(self, valuelist):
+        self.data = None
+        if not valuelist or not valuelist[0]:
+            return
+        try:
+            employee_id = int(valuelist[0])
+        except ValueError:
+            raise ValueError(self.gettext("Not a valid choice."))
+        self.data = db.session.get(Employee, employee_id)
+        if self.data is None:
+            raise ValueError(self.gettext("Not a valid choice."))
 
 
 POSITION_CHOICES = [
@@ -58,11 +89,8 @@ POSITION_CHOICES = [
 
 
 class PerformanceLogForm(FlaskForm):
-    employee = QuerySelectField(
+    employee = EmployeeSelectField(
         "Employee",
-        query_factory=employee_query,
-        get_label="name",
-        allow_blank=True,
         blank_text="-- Select Employee --",
         validators=[DataRequired(message="Please select an employee.")],
     )
@@ -112,3 +140,16 @@ class EmployeeForm(FlaskForm):
         ],
     )
     submit = SubmitField("Save Employee")
+
+
+class EmployeeImportForm(FlaskForm):
+    """Form for uploading a CSV of employees (name, position, email, hourly_rate)."""
+
+    file = FileField(
+        "CSV File",
+        validators=[
+            FileRequired(message="Please choose a CSV file."),
+            FileAllowed(["csv"], message="Only .csv files can be imported."),
+        ],
+    )
+    submit = SubmitField("Import Employees")
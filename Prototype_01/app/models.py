@@ -1,5 +1,7 @@
 from app import db
+from sqlalchemy.orm import validates
 import datetime
+import json
 
 
 class Employee(db.Model):
@@ -8,6 +10,14 @@ class Employee(db.Model):
     position = db.Column(db.String(64))
     email = db.Column(db.String(120), index=True, unique=True)
     hourly_rate = db.Column(db.Float)
+    # name.casefold(), for case-insensitive prefix search (employee pickers).
+    # Folded in Python so accented names match the same way on every backend.
+    search_name = db.Column(db.String(128), index=True)
+
+    @validates("name")
+    def _set_search_name(self, key, name):
+        self.search_name = name.casefold() if name else None
+        return name
 
     def __repr__(self):
         return f"<Employee {self.name}>"
@@ -15,14 +25,20 @@ class Employee(db.Model):
 
 class Shift(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(
-        db.Integer, db.ForeignKey("employee.id"), nullable=True, index=True
-    )
-    start_time = db.Column(db.DateTime, nullable=False, index=True)
+    employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=True)
+    start_time = db.Column(db.DateTime, nullable=False)
     end_time = db.Column(db.DateTime, nullable=False)
-    required_position = db.Column(db.String(64), nullable=False, index=True)
+    required_position = db.Column(db.String(64), nullable=False)
     employee = db.relationship("Employee", backref="shifts")
 
+    __table_args__ = (
+        # Month-range scans ordered by (start_time, required_position), and
+        # the range deletes done when a schedule is regenerated.
+        db.Index("ix_shift_start_time_position", "start_time", "required_position"),
+        # Per-employee lookups (delete checks, rest/hour history) by time.
+        db.Index("ix_shift_employee_start_time", "employee_id", "start_time"),
+    )
+
     def __repr__(self):
         emp_name = self.employee.name if self.employee else "Unassigned"
         return f"<Shift P:{self.required_position} E:{emp_name} Start:{self.start_time.strftime('%H:%M')}>"
@@ -30,12 +46,14 @@ class Shift(db.Model):
 
 class PerformanceLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(
-        db.Integer, db.ForeignKey("employee.id"), nullable=False, index=True
-    )
+    employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
     log_date = db.Column(
         db.Date, nullable=False, index=True, default=datetime.date.today
     )
+    # First day of log_date's month; kept in sync by _set_log_month below.
+    log_month = db.Column(
+        db.Date, nullable=False, default=lambda: datetime.date.today().replace(day=1)
+    )
     rating = db.Column(db.Float)
     notes = db.Column(db.Text)
     recorded_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
@@ -43,5 +61,133 @@ class PerformanceLog(db.Model):
         "Employee", backref=db.backref("performance_logs", lazy="dynamic")
     )
 
+    __table_args__ = (
+        # One log per employee per month, enforced by the database.
+        db.UniqueConstraint(
+            "employee_id", "log_month", name="uq_performance_log_employee_month"
+        ),
+        db.Index("ix_performance_log_employee_log_date", "employee_id", "log_date"),
+    )
+
+    @validates("log_date")
+    def _set_log_month(self, key, log_date):
+        self.log_month = log_date.replace(day=1) if log_date else None
+        return log_date
+
     def __repr__(self):
         return f"<PerformanceLog E:{self.employee_id} D:{self.log_date} Rating:{self.rating}>"
+
+
+class EmployeePerformanceSummary(db.Model):
+    """
+    Running aggregates of an employee's performance logs, kept up to date by
+    app.utils.performance whenever a log is added, so readers get an
+    employee's current rating without scanning their logs.
+    """
+
+    employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), primary_key=True)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    mean_rating = db.Column(db.Float)
+    # Exponentially weighted mean of the ratings in log_date order.
+    ewma_rating = db.Column(db.Float)
+    last_rating = db.Column(db.Float)
+    last_log_date = db.Column(db.Date)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
+    )
+    employee = db.relationship(
+        "Employee", backref=db.backref("performance_summary", uselist=False)
+    )
+
+    def __repr__(self):
+        return f"<EmployeePerformanceSummary E:{self.employee_id} Logs:{self.log_count} EWMA:{self.ewma_rating}>"
+
+
+class Forecast(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(64), nullable=False)
+    ds = db.Column(db.Date, nullable=False)
+    yhat = db.Column(db.Float, nullable=False)
+    yhat_lower = db.Column(db.Float)
+    yhat_upper = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("version", "ds", name="uq_forecast_version_ds"),
+    )
+
+    def __repr__(self):
+        return f"<Forecast V:{self.version[:12]} D:{self.ds} yhat:{self.yhat:.1f}>"
+
+
+class ScheduleJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    target_month = db.Column(db.Date, nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False, default="queued", index=True)
+    current_phase = db.Column(db.String(32))
+    phase_timings = db.Column(db.Text, default="{}")
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # Refreshed by the owning process while the job is queued or running.
+    heartbeat_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        # At most one queued/running job per month.
+        db.Index(
+            "uq_schedule_job_active_month",
+            "target_month",
+            unique=True,
+            sqlite_where=db.text("status IN ('queued', 'running')"),
+            postgresql_where=db.text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "target_month": self.target_month.strftime("%Y-%m"),
+            "status": self.status,
+            "current_phase": self.current_phase,
+            "phase_timings": json.loads(self.phase_timings or "{}"),
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<ScheduleJob {self.id} {self.target_month:%Y-%m} {self.status}>"
+
+
+class EmailOutbox(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(120))
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text)
+    text_body = db.Column(db.Text)
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.recipient} {self.status}>"
+
+
+class CacheVersion(db.Model):
+    name = db.Column(db.String(32), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion {self.name}={self.value}>"
@@ -1,12 +1,22 @@
-from flask import Blueprint, render_template, flash, redirect, url_for
-from app.models import Employee, Shift
-from app.utils import forecasting, scheduling
+from flask import (
+    Blueprint,
+    render_template,
+    flash,
+    redirect,
+    url_for,
+    request,
+    jsonify,
+    make_response,
+    session,
+)
+from app.models import ScheduleJob
+from app.utils import cache, forecasting, jobs, labor_cost
 from app import db
-from sqlalchemy.orm import joinedload
 from collections import defaultdict
 from datetime import timedelta
 import datetime
 import calendar
+import json
 
 bp = Blueprint("main", __name__)
 
@@ -19,10 +29,24 @@ def index():
 
 @bp.route("/run_forecast")
 def run_forecast_route():
-    """Route to trigger the forecast generation and display results."""
+    """
+    Route to trigger the forecast generation and display results.
+
+    ?engine= picks the forecasting engine (default FORECAST_ENGINE) and
+    ?days= the horizon (default 7, at most forecasting.MAX_DAYS_TO_PREDICT).
+    """
     print("Accessed /run_forecast route")
     try:
-        forecast_df = forecasting.generate_forecast()
+        engine = request.args.get("engine")
+        days = request.args.get("days", 7, type=int)
+        try:
+            forecasting.get_engine(engine)
+        except ValueError as e:
+            return str(e), 400
+        if not 1 <= days <= forecasting.MAX_DAYS_TO_PREDICT:
+            return f"days must be between 1 and {forecasting.MAX_DAYS_TO_PREDICT}.", 400
+
+        forecast_df = forecasting.generate_forecast(days_to_predict=days, engine=engine)
 
         if forecast_df is not None:
             print("Forecast DataFrame generated successfully.")
@@ -42,25 +66,41 @@ def run_forecast_route():
 
 @bp.route("/generate_schedule")
 def generate_schedule_route():
-    """Route to trigger the schedule generation for the current month."""
+    """
+    Route to queue schedule generation for the current month.
+
+    Generation runs in a background job; this returns immediately with the
+    job id, and progress can be polled at /schedule_jobs/<job_id>. Pass
+    ?incremental=1 to only rewrite and re-notify shifts that changed.
+    """
     print("Accessed /generate_schedule route")
+    wants_json = (
+        request.accept_mimetypes.accept_json
+        and not request.accept_mimetypes.accept_html
+    )
     try:
-        success = scheduling.create_schedule()
+        incremental = request.args.get("incremental", "").lower() in ["1", "true"]
+        job = jobs.enqueue_schedule_job(incremental=incremental)
+        print(f"Schedule job {job.id} is {job.status}.")
 
-        if success:
-            print("Scheduling function reported success.")
-            flash(
-                "New schedule generated successfully for the current month!", "success"
-            )
-        else:
-            print("Scheduling function reported failure.")
-            flash(
-                "Error generating schedule for the current month. Check application logs for details.",
-                "danger",
+        if wants_json:
+            response = jsonify(job.to_dict())
+            response.status_code = 202
+            response.headers["Location"] = url_for(
+                "main.schedule_job_status", job_id=job.id
             )
+            return response
+
+        flash(
+            f"Schedule generation for the current month started (job #{job.id}). "
+            "Refresh the schedule in a moment to see the result.",
+            "success",
+        )
 
     except Exception as e:
         print(f"Exception in /generate_schedule route: {e}")
+        if wants_json:
+            return jsonify({"error": str(e)}), 500
         flash(
             f"An unexpected error occurred while trying to generate the schedule: {e}",
             "danger",
@@ -69,73 +109,167 @@ def generate_schedule_route():
     return redirect(url_for("main.index"))
 
 
-@bp.route("/schedule")
-def schedule_view():
-    """Displays the generated schedule for the current month."""
-    print("Accessed /schedule route")
-    try:
-        today = datetime.date.today()
-        start_of_month = today.replace(day=1)
-        days_in_month = calendar.monthrange(start_of_month.year, start_of_month.month)[
-            1
-        ]
-        end_of_month = start_of_month + timedelta(days=days_in_month)
-        month_name_str = start_of_month.strftime("%B %Y")
+@bp.route("/schedule_jobs/<int:job_id>")
+def schedule_job_status(job_id):
+    """Returns the status and per-phase timings of a schedule job as JSON."""
+    job = db.session.get(ScheduleJob, job_id)
+    if job is None:
+        return jsonify({"error": f"Schedule job {job_id} not found."}), 404
+    return jsonify(job.to_dict())
 
-        print(f"Querying schedule for: {month_name_str}")
 
-        shifts = (
-            db.session.query(Shift)
-            .options(joinedload(Shift.employee))
-            .outerjoin(Shift.employee)
-            .filter(Shift.start_time >= start_of_month, Shift.start_time < end_of_month)
-            .order_by(Shift.start_time, Shift.required_position)
-            .all()
-        )
+_schedule_cache = cache.RenderCache()
 
-        print(
-            f"Found {len(shifts)} shifts for {month_name_str} (including unassigned)."
-        )
+
+def _requested_month():
+    """Returns (start, end_exclusive) of ?month=YYYY-MM, defaulting to this month."""
+    month_arg = request.args.get("month")
+    if month_arg:
+        start_of_month = datetime.datetime.strptime(month_arg, "%Y-%m").date()
+    else:
+        start_of_month = datetime.date.today().replace(day=1)
+    days_in_month = calendar.monthrange(start_of_month.year, start_of_month.month)[1]
+    return start_of_month, start_of_month + timedelta(days=days_in_month)
+
+
+def _schedule_data(start_of_month, end_of_month, summary_only):
+    """Loads weekly totals and (unless summary_only) the shifts grouped by week."""
+    month_name_str = start_of_month.strftime("%B %Y")
+    print(f"Querying schedule for: {month_name_str}")
+
+    weekly_summary, grand_total_cost = labor_cost.weekly_cost_summary(
+        start_of_month, end_of_month
+    )
+
+    weekly_data = []
+    if not summary_only:
+        shifts = labor_cost.shift_rows_with_cost(start_of_month, end_of_month)
+        print(f"Found {len(shifts)} shifts for {month_name_str} (including unassigned).")
 
         weekly_shifts = defaultdict(list)
-        weekly_costs = defaultdict(float)
-        grand_total_cost = 0.0
         for shift in shifts:
-            shift_date = shift.start_time.date()
-            week_start = shift_date - timedelta(days=shift_date.weekday())
-            weekly_shifts[week_start].append(shift)
-            if shift.employee and shift.employee.hourly_rate:
-                duration_hours = (
-                    shift.end_time - shift.start_time
-                ).total_seconds() / 3600
-                shift_cost = duration_hours * shift.employee.hourly_rate
-                weekly_costs[week_start] += shift_cost
-                grand_total_cost += shift_cost
-
-        sorted_weeks = sorted(weekly_shifts.keys())
-        weekly_data = []
-        for week_start_date in sorted_weeks:
+            weekly_shifts[shift.week_start].append(shift)
+        for week in weekly_summary:
             weekly_data.append(
-                (
-                    week_start_date,
-                    weekly_shifts[week_start_date],
-                    weekly_costs[week_start_date],
-                )
+                (week.week_start, weekly_shifts[week.week_start], week.cost)
             )
         print(f"Grouped shifts into {len(weekly_data)} weeks for {month_name_str}.")
 
+    return weekly_summary, weekly_data, grand_total_cost
+
+
+def _cached_schedule_response(fmt, render):
+    """
+    Serves a schedule representation through the render cache with ETag
+    support. The cache key and ETag combine the month, the view variant and
+    the schedule version counter, which every write path bumps.
+    """
+    start_of_month, end_of_month = _requested_month()
+    summary_only = request.args.get("summary", "").lower() in ["1", "true"]
+    variant = "summary" if summary_only else "full"
+    version = cache.get_version(cache.SCHEDULE)
+    etag = f"schedule-{start_of_month:%Y-%m}-{variant}-{fmt}-v{version}"
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+        response.set_etag(etag)
+        return response
+
+    # Pages carrying one-off flash messages must not be cached or shared.
+    cacheable = not session.get("_flashes")
+    body = _schedule_cache.get(etag) if cacheable else None
+    if body is None:
+        body = render(start_of_month, end_of_month, summary_only)
+        if cacheable:
+            _schedule_cache.set(etag, body)
+
+    response = make_response(body)
+    if fmt == "json":
+        response.mimetype = "application/json"
+    if cacheable:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@bp.route("/schedule")
+def schedule_view():
+    """
+    Displays the generated schedule for a month (?month=YYYY-MM, default
+    current month).
+
+    Weekly and grand-total labor costs are aggregated in the database.
+    Pass ?summary=1 to show only the weekly totals without loading shifts.
+    Rendered pages are cached per schedule version and served with an ETag,
+    so unchanged schedules answer If-None-Match with 304.
+    """
+    print("Accessed /schedule route")
+
+    def render(start_of_month, end_of_month, summary_only):
+        month_name_str = start_of_month.strftime("%B %Y")
+        weekly_summary, weekly_data, grand_total_cost = _schedule_data(
+            start_of_month, end_of_month, summary_only
+        )
         return render_template(
             "schedule_view.html",
             title=f"Schedule for {month_name_str}",
             month_name=month_name_str,
+            month=start_of_month.strftime("%Y-%m"),
+            summary_only=summary_only,
+            weekly_summary=weekly_summary,
             weekly_data=weekly_data,
             grand_total_cost=grand_total_cost,
         )
 
+    try:
+        return _cached_schedule_response("html", render)
+
     except Exception as e:
         print(f"Error querying/processing shifts: {e}")
         flash("Error loading schedule view.", "danger")
         return redirect(url_for("main.index"))
 
 
+@bp.route("/schedule.json")
+def schedule_json():
+    """JSON equivalent of /schedule, with the same caching and ETag handling."""
+    print("Accessed /schedule.json route")
 
+    def render(start_of_month, end_of_month, summary_only):
+        weekly_summary, weekly_data, grand_total_cost = _schedule_data(
+            start_of_month, end_of_month, summary_only
+        )
+        shifts_by_week = {week_start: shifts for week_start, shifts, _ in weekly_data}
+        weeks = []
+        for week in weekly_summary:
+            week_json = {
+                "week_start": week.week_start.isoformat(),
+                "shift_count": week.shift_count,
+                "cost": round(week.cost, 2),
+            }
+            if not summary_only:
+                week_json["shifts"] = [
+                    {
+                        "id": shift.id,
+                        "start_time": shift.start_time.isoformat(),
+                        "end_time": shift.end_time.isoformat(),
+                        "required_position": shift.required_position,
+                        "employee_name": shift.employee_name,
+                        "employee_position": shift.employee_position,
+                        "cost": round(shift.cost, 2),
+                    }
+                    for shift in shifts_by_week.get(week.week_start, [])
+                ]
+            weeks.append(week_json)
+        return json.dumps(
+            {
+                "month": start_of_month.strftime("%Y-%m"),
+                "weeks": weeks,
+                "grand_total_cost": round(grand_total_cost, 2),
+            }
+        )
+
+    try:
+        return _cached_schedule_response("json", render)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,39 @@
+// Employee pickers: typing in a [data-employee-search] box replaces the
+// options of the <select> it names with matches from the search endpoint.
+// Clearing the box restores the full list.
+document.querySelectorAll('[data-employee-search]').forEach(function (input) {
+    var select = document.getElementById(input.dataset.employeeSearch);
+    if (!select) {
+        return;
+    }
+    var allOptions = Array.prototype.slice.call(select.options);
+    var blankOption = allOptions[0];
+    var timer = null;
+
+    function showOptions(options) {
+        var selected = select.value;
+        select.replaceChildren.apply(select, options);
+        select.value = selected;
+    }
+
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        var query = input.value.trim();
+        if (!query) {
+            showOptions(allOptions);
+            return;
+        }
+        timer = setTimeout(function () {
+            fetch(input.dataset.url + '?q=' + encodeURIComponent(query))
+                .then(function (response) { return response.json(); })
+                .then(function (body) {
+                    if (input.value.trim() !== query) {
+                        return; // A newer search is pending.
+                    }
+                    showOptions([blankOption].concat(body.employees.map(function (employee) {
+                        return new Option(employee.name + ' (' + employee.position + ')', employee.id);
+                    })));
+                });
+        }, 200);
+    });
+});
@@ -0,0 +1,322 @@
+# app/utils/assignment.py
+
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+import heapq
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+# --- Hard & Soft Constraint Settings ---
+
+MAX_WEEKLY_HOURS = 40  # Hard: no employee works more than this per Mon-Sun week
+MIN_REST_HOURS = 11  # Hard: rest between two shifts (blocks Eve -> next Day)
+UNFILLED_PENALTY = 10000  # Soft: cost ($) of leaving one slot unassigned
+INCUMBENT_BONUS = 100  # Soft: saving ($) for keeping someone on a shift they already hold
+RATING_BONUS = 20  # Soft: saving ($) per rating point for staff on high-demand slots
+
+ILP_TIME_LIMIT_SECONDS = 30
+
+# One staffing requirement: `count` people of `position` for [start, end).
+# Engines prefer higher-rated staff for `high_demand` slots.
+Slot = namedtuple(
+    "Slot", ["start", "end", "position", "count", "high_demand"], defaults=(False,)
+)
+
+# Lightweight employee record, so engines never touch ORM objects. `rating`
+# is the employee's current performance rating, or None if never rated.
+Candidate = namedtuple(
+    "Candidate", ["id", "position", "hourly_rate", "rating"], defaults=(None,)
+)
+
+
+# A shift an employee already holds outside the period being assigned, e.g.
+# the last days of the previous month. It counts toward the rest rule and
+# weekly hours but is not reassigned.
+BookedShift = namedtuple("BookedShift", ["employee_id", "start", "end"])
+
+
+def _hours(slot):
+    return (slot.end - slot.start).total_seconds() / 3600
+
+
+def _week_start(slot):
+    day = slot.start.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _conflicts(first, second):
+    """True if one person cannot work both slots (overlap or too little rest)."""
+    if first.start > second.start:
+        first, second = second, first
+    return second.start < first.end + timedelta(hours=MIN_REST_HOURS)
+
+
+def _booked_by_employee(booked):
+    by_employee = defaultdict(list)
+    for shift in booked or ():
+        by_employee[shift.employee_id].append(shift)
+    return by_employee
+
+
+def _booked_weekly_hours(booked):
+    """Returns {(employee id, week start): hours} of the booked shifts."""
+    weekly_hours = defaultdict(float)
+    for shift in booked or ():
+        weekly_hours[(shift.employee_id, _week_start(shift))] += _hours(shift)
+    return weekly_hours
+
+
+def _group_candidates(candidates):
+    by_position = defaultdict(list)
+    for candidate in candidates:
+        if candidate.position:
+            by_position[candidate.position].append(candidate)
+    return by_position
+
+
+def assign_greedy(slots, candidates, incumbents=None, booked=None):
+    """
+    Fills slots in chronological order from a per-position min-heap.
+
+    The heap orders staff by hours already given this run, then hourly rate,
+    so work is spread evenly and cheaper staff win ties. High-demand slots
+    instead go to the highest-rated staff first (unrated staff last). Staff
+    who would break a hard constraint for a slot are skipped and pushed
+    back. Staff listed in `incumbents` for a slot are tried before the heap.
+
+    Args:
+        incumbents (set): Optional (start, position, employee id) triples for
+            shifts people already hold, kept where the constraints allow.
+        booked (list): Optional BookedShift tuples held outside the period,
+            which the hard constraints take into account.
+
+    Returns:
+        list: For each slot (same order as `slots`), the assigned employee ids.
+    """
+    incumbents_by_slot = defaultdict(list)
+    for start, position, emp_id in incumbents or ():
+        incumbents_by_slot[(start, position)].append(emp_id)
+
+    heaps = {
+        position: [(0.0, c.hourly_rate or 0.0, c.id) for c in group]
+        for position, group in _group_candidates(candidates).items()
+    }
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    ratings = {c.id: c.rating for c in candidates}
+    hours_given = defaultdict(float)
+    last_end = {}
+    weekly_hours = _booked_weekly_hours(booked)
+    booked_by_employee = _booked_by_employee(booked)
+    assignments = [[] for _ in slots]
+
+    def can_work(emp_id, slot, hours, week):
+        rested = emp_id not in last_end or slot.start >= last_end[emp_id] + timedelta(
+            hours=MIN_REST_HOURS
+        )
+        return (
+            rested
+            and weekly_hours[(emp_id, week)] + hours <= MAX_WEEKLY_HOURS
+            and not any(_conflicts(slot, shift) for shift in booked_by_employee[emp_id])
+        )
+
+    def give(index, emp_id, slot, hours, week):
+        assignments[index].append(emp_id)
+        last_end[emp_id] = slot.end
+        weekly_hours[(emp_id, week)] += hours
+        hours_given[emp_id] += hours
+
+    order = sorted(range(len(slots)), key=lambda i: (slots[i].start, slots[i].position))
+    for index in order:
+        slot = slots[index]
+        heap = heaps.get(slot.position)
+        if not heap:
+            continue
+
+        hours = _hours(slot)
+        week = _week_start(slot)
+        eligible = {entry[2] for entry in heap}
+        for emp_id in incumbents_by_slot.get((slot.start, slot.position), []):
+            if (
+                len(assignments[index]) < slot.count
+                and emp_id in eligible
+                and emp_id not in assignments[index]
+                and can_work(emp_id, slot, hours, week)
+            ):
+                give(index, emp_id, slot, hours, week)
+
+        if slot.high_demand:
+            ranked = sorted(
+                heap,
+                key=lambda entry: (
+                    ratings[entry[2]] is None,
+                    -(ratings[entry[2]] or 0.0),
+                    hours_given[entry[2]],
+                    entry[1],
+                ),
+            )
+            for _, rate, emp_id in ranked:
+                if len(assignments[index]) >= slot.count:
+                    break
+                if emp_id not in assignments[index] and can_work(emp_id, slot, hours, week):
+                    give(index, emp_id, slot, hours, week)
+            # Re-key the heap on the updated hours.
+            heap[:] = [(hours_given[emp_id], rate, emp_id) for _, rate, emp_id in heap]
+            heapq.heapify(heap)
+            continue
+
+        skipped = []
+        while heap and len(assignments[index]) < slot.count:
+            entry = heapq.heappop(heap)
+            total_hours, rate, emp_id = entry
+            if total_hours != hours_given[emp_id]:
+                # Stale entry (hours were given outside the heap); re-queue it.
+                heapq.heappush(heap, (hours_given[emp_id], rate, emp_id))
+                continue
+            if emp_id not in assignments[index] and can_work(emp_id, slot, hours, week):
+                give(index, emp_id, slot, hours, week)
+            skipped.append((hours_given[emp_id], rate, emp_id))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+    return assignments
+
+
+def assign_ilp(
+    slots, candidates, incumbents=None, booked=None, time_limit=ILP_TIME_LIMIT_SECONDS
+):
+    """
+    Fills every slot of the period in one integer program solved with CBC.
+
+    Hard constraints: each person works at most one of any two conflicting
+    slots, none that conflicts with a shift they have `booked`, and at most
+    MAX_WEEKLY_HOURS per week, booked shifts included. The objective minimises
+    labour cost plus UNFILLED_PENALTY for each slot left unassigned, minus
+    INCUMBENT_BONUS for each shift kept with the person in `incumbents` and
+    RATING_BONUS per rating point for each rated person on a high-demand
+    slot.
+
+    Returns:
+        list: Assigned employee ids per slot, or None if PuLP is unavailable
+              or the solver did not return a usable solution.
+    """
+    try:
+        import pulp
+    except ImportError:
+        log.warning("PuLP is not installed; ILP assignment engine unavailable.")
+        return None
+
+    incumbents = incumbents or set()
+    booked_by_employee = _booked_by_employee(booked)
+    booked_hours = _booked_weekly_hours(booked)
+    by_position = _group_candidates(candidates)
+    problem = pulp.LpProblem("shift_assignment", pulp.LpMinimize)
+    objective = []
+
+    works = {}  # (slot index, employee id) -> binary variable
+    slots_by_employee = defaultdict(list)
+    for index, slot in enumerate(slots):
+        group = by_position.get(slot.position, [])
+        unfilled = pulp.LpVariable(f"u_{index}", lowBound=0, upBound=slot.count)
+        objective.append(UNFILLED_PENALTY * unfilled)
+        slot_vars = []
+        for candidate in group:
+            if any(_conflicts(slot, shift) for shift in booked_by_employee[candidate.id]):
+                continue
+            var = pulp.LpVariable(f"x_{index}_{candidate.id}", cat="Binary")
+            works[(index, candidate.id)] = var
+            slots_by_employee[candidate.id].append(index)
+            slot_vars.append(var)
+            cost = _hours(slot) * (candidate.hourly_rate or 0.0)
+            if (slot.start, slot.position, candidate.id) in incumbents:
+                cost -= INCUMBENT_BONUS
+            if slot.high_demand and candidate.rating is not None:
+                cost -= RATING_BONUS * candidate.rating
+            objective.append(cost * var)
+        problem += pulp.lpSum(slot_vars) + unfilled == slot.count
+
+    for emp_id, indexes in slots_by_employee.items():
+        indexes.sort(key=lambda i: slots[i].start)
+        weeks = defaultdict(list)
+        for offset, index in enumerate(indexes):
+            weeks[_week_start(slots[index])].append(index)
+            for later in indexes[offset + 1 :]:
+                if not _conflicts(slots[index], slots[later]):
+                    break
+                problem += works[(index, emp_id)] + works[(later, emp_id)] <= 1
+        for week, week_indexes in weeks.items():
+            allowed_hours = MAX_WEEKLY_HOURS - booked_hours[(emp_id, week)]
+            if sum(_hours(slots[i]) for i in week_indexes) > allowed_hours:
+                problem += (
+                    pulp.lpSum(_hours(slots[i]) * works[(i, emp_id)] for i in week_indexes)
+                    <= allowed_hours
+                )
+
+    problem += pulp.lpSum(objective)
+    status = problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    if problem.sol_status not in (
+        pulp.LpSolutionOptimal,
+        pulp.LpSolutionIntegerFeasible,
+    ):
+        log.warning(f"ILP solver returned status {pulp.LpStatus[status]}.")
+        return None
+
+    assignments = [[] for _ in slots]
+    for (index, emp_id), var in works.items():
+        if var.value() is not None and var.value() > 0.5:
+            assignments[index].append(emp_id)
+    return assignments
+
+
+ENGINES = {
+    "greedy": assign_greedy,
+    "ilp": assign_ilp,
+}
+
+
+def assign_slots(slots, candidates, engine="ilp", incumbents=None, booked=None):
+    """
+    Assigns staff to slots with the chosen engine, falling back to the
+    greedy engine if the chosen one is unavailable or fails.
+
+    Args:
+        slots (list): Slot tuples to fill.
+        candidates (list): Candidate tuples to choose from.
+        engine (str): One of ENGINES ("ilp" or "greedy").
+        incumbents (set): Optional (start, position, employee id) triples the
+            engine should prefer to keep.
+        booked (list): Optional BookedShift tuples held outside the period,
+            e.g. around the month being scheduled.
+
+    Returns:
+        list: For each slot (same order as `slots`), the assigned employee ids.
+              A slot may get fewer ids than its count; the rest stay unassigned.
+    """
+    started = time.perf_counter()
+    solver = ENGINES.get(engine)
+    if solver is None:
+        log.warning(f"Unknown assignment engine '{engine}'; using greedy.")
+        solver, engine = assign_greedy, "greedy"
+
+    try:
+        assignments = solver(slots, candidates, incumbents, booked)
+    except Exception as e:
+        log.error(f"Assignment engine '{engine}' failed: {e}", exc_info=True)
+        assignments = None
+
+    if assignments is None and engine != "greedy":
+        log.warning(f"Falling back to greedy assignment after '{engine}' failed.")
+        engine = "greedy"
+        assignments = assign_greedy(slots, candidates, incumbents, booked)
+
+    filled = sum(len(ids) for ids in assignments)
+    needed = sum(slot.count for slot in slots)
+    log.info(
+        f"Assignment engine '{engine}' filled {filled}/{needed} positions "
+        f"in {time.perf_counter() - started:.3f}s."
+    )
+    return assignments
@@ -0,0 +1,85 @@
+# app/utils/cache.py
+
+from collections import OrderedDict
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import CacheVersion
+import threading
+
+SCHEDULE = "schedule"
+EMPLOYEES = "employees"
+
+
+def get_version(name):
+    """Returns the current value of a named version counter (0 if never bumped)."""
+    value = (
+        db.session.query(CacheVersion.value).filter(CacheVersion.name == name).scalar()
+    )
+    return value or 0
+
+
+def bump_version(name):
+    """
+    Increments a named version counter inside the current transaction, so
+    the bump is committed (or rolled back) together with the write that
+    caused it. The caller commits.
+
+    The counter row is created on first use with an upsert, so concurrent
+    first bumps never fail the caller's write on the primary key. (The
+    SCHEDULE and EMPLOYEES rows are also seeded by a migration.)
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert(CacheVersion).values(name=name, value=1)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[CacheVersion.name],
+                set_={"value": CacheVersion.value + 1},
+            )
+        )
+        return
+
+    increment = (
+        db.update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(value=CacheVersion.value + 1)
+    )
+    if db.session.execute(increment).rowcount:
+        return
+    try:
+        # A savepoint, so losing the race does not roll back the caller's write.
+        with db.session.begin_nested():
+            db.session.execute(db.insert(CacheVersion).values(name=name, value=1))
+    except IntegrityError:
+        db.session.execute(increment)
+
+
+class RenderCache:
+    """
+    Small thread-safe LRU cache for rendered responses in this process.
+
+    Keys should include the relevant version counter, so entries for old
+    versions simply stop being requested and age out.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
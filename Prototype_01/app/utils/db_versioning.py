@@ -0,0 +1,96 @@
+# app/utils/db_versioning.py
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from flask import current_app
+from sqlalchemy import inspect
+from app import db
+import os
+import sqlalchemy as sa
+
+BASELINE_REVISION = "294f303fbfcb"
+BASELINE_TABLES = {"employee", "shift", "performance_log"}
+
+
+def _migrations_directory():
+    return os.path.join(os.path.dirname(current_app.root_path), "migrations")
+
+
+def legacy_revision(inspector):
+    """
+    Returns the revision an unversioned database built by db.create_all()
+    matches, judged by the newest schema change it already has. Before
+    create_tables.py ran migrations it built whatever the models of the day
+    described, so a database can be from any point up to 7830d6fac5df; later
+    revisions were only ever applied by migrations.
+    """
+    if "log_month" in {column["name"] for column in inspector.get_columns("performance_log")}:
+        return "7830d6fac5df"
+    return BASELINE_REVISION
+
+
+def _bring_up_to_baseline(connection, echo):
+    """
+    Adds what the baseline expects but early prototype databases (such as
+    the shipped instance/database.db) lack: shift.required_position, filled
+    from the assigned employee's position, and NOT NULL shift times. Extra
+    columns those databases have (performance_log.tasks_completed) are
+    unmapped and left alone.
+    """
+    columns = {column["name"]: column for column in inspect(connection).get_columns("shift")}
+    if "required_position" in columns:
+        return
+
+    echo("Adding shift.required_position from assigned employees' positions...")
+    operations = Operations(MigrationContext.configure(connection))
+    with operations.batch_alter_table("shift") as batch_op:
+        batch_op.add_column(sa.Column("required_position", sa.String(64), nullable=True))
+    connection.execute(
+        sa.text(
+            "UPDATE shift SET required_position = COALESCE("
+            "(SELECT employee.position FROM employee WHERE employee.id = shift.employee_id), "
+            "'Unassigned')"
+        )
+    )
+    # A shift without times cannot be scheduled or shown; drop those rows.
+    connection.execute(sa.text("DELETE FROM shift WHERE start_time IS NULL OR end_time IS NULL"))
+    with operations.batch_alter_table("shift") as batch_op:
+        batch_op.alter_column("required_position", existing_type=sa.String(64), nullable=False)
+        for name in ["start_time", "end_time"]:
+            if columns[name]["nullable"]:
+                batch_op.alter_column(name, existing_type=sa.DateTime(), nullable=False)
+
+
+def upgrade_database(echo=print):
+    """
+    Migrates the configured database to the latest revision.
+
+    Databases without an alembic_version table (built by the old
+    db.create_all() script) are adopted first: early prototype schemas are
+    brought up to the baseline, the database is stamped at the revision its
+    schema matches, and the remaining revisions then create whatever it
+    lacks.
+
+    Raises:
+        RuntimeError: If an unversioned database lacks a baseline table.
+    """
+    from flask_migrate import stamp, upgrade
+
+    directory = _migrations_directory()
+    tables = set(inspect(db.engine).get_table_names())
+    if tables and "alembic_version" not in tables:
+        missing = BASELINE_TABLES - tables
+        if missing:
+            raise RuntimeError(
+                f"Unversioned database lacks the baseline table(s) {', '.join(sorted(missing))}; "
+                "it was not built by this app and cannot be adopted."
+            )
+        with db.engine.begin() as connection:
+            _bring_up_to_baseline(connection, echo)
+        revision = legacy_revision(inspect(db.engine))
+        echo(f"Existing unversioned database found; stamping revision {revision}...")
+        stamp(directory=directory, revision=revision)
+
+    echo("Applying database migrations...")
+    upgrade(directory=directory)
+    echo("Database migrations finished.")
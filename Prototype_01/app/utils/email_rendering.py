@@ -0,0 +1,113 @@
+# app/utils/email_rendering.py
+#
+# Outside a request (schedule jobs, the outbox worker) templates are rendered
+# directly, skipping Flask's context processors and template signals. Inside
+# a request they go through render_template, so request metrics
+# (app/utils/metrics.py) count email rendering as template time.
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from flask import current_app, has_request_context, render_template
+import logging
+
+log = logging.getLogger(__name__)
+
+RenderedEmail = namedtuple("RenderedEmail", ["employee", "subject", "html", "text"])
+
+
+class ScheduleEmailRenderer:
+    """
+    Renders schedule_update emails for a whole scheduling run.
+
+    Templates are looked up once, and the formatted text for each distinct
+    shift time and week is computed once and shared by every employee who
+    works it, so rendering cost grows with the number of emails rather than
+    with template setup and strftime calls.
+
+    `period` is the run's (first day, last day); it is the date range shown
+    to employees who have no shifts left in it.
+    """
+
+    html_template_name = "email/schedule_update.html"
+    text_template_name = "email/schedule_update.txt"
+
+    def __init__(self, period=None):
+        self.period = period
+        env = current_app.jinja_env
+        self.html_template = env.get_template(self.html_template_name)
+        self.text_template = env.get_template(self.text_template_name)
+        self._shift_lines = {}
+        self._week_labels = {}
+
+    def _shift_line(self, start_time, end_time):
+        key = (start_time, end_time)
+        line = self._shift_lines.get(key)
+        if line is None:
+            line = {
+                "day": start_time.strftime("%a, %B %d, %Y"),
+                "hours": f"{start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')}",
+            }
+            self._shift_lines[key] = line
+        return line
+
+    def _week_label(self, day):
+        week_start = day - timedelta(days=day.weekday())
+        label = self._week_labels.get(week_start)
+        if label is None:
+            label = f"Week of {week_start.strftime('%B %d, %Y')}"
+            self._week_labels[week_start] = label
+        return label
+
+    def context_for(self, employee, shifts):
+        """
+        Builds the template context for one employee.
+
+        Args:
+            shifts (list): The employee's shifts, sorted by start_time.
+        """
+        weeks = []
+        for shift in shifts:
+            label = self._week_label(shift.start_time.date())
+            if not weeks or weeks[-1]["label"] != label:
+                weeks.append({"label": label, "shifts": []})
+            weeks[-1]["shifts"].append(self._shift_line(shift.start_time, shift.end_time))
+
+        if shifts:
+            min_date = shifts[0].start_time.date()
+            max_date = shifts[-1].start_time.date()
+        else:
+            min_date, max_date = self.period
+        date_range = f"{min_date.strftime('%b %d')} - {max_date.strftime('%b %d, %Y')}"
+        return {"employee": employee, "weeks": weeks, "date_range": date_range}
+
+    def _render_template(self, template, context):
+        if has_request_context():
+            return render_template(template, **context)
+        return template.render(context)
+
+    def render(self, employee, shifts):
+        """Renders the subject, HTML body and plain-text body for one employee."""
+        context = self.context_for(employee, shifts)
+        return RenderedEmail(
+            employee,
+            f"Your Pozole Schedule: {context['date_range']}",
+            self._render_template(self.html_template, context),
+            self._render_template(self.text_template, context),
+        )
+
+    def render_all(self, entries, workers=None):
+        """
+        Renders every (employee, sorted shifts) pair of a run in one pass.
+
+        Args:
+            entries (list): (employee, shifts) pairs; shifts sorted by start_time.
+            workers (int): Optional thread count to render across a pool.
+
+        Returns:
+            list: RenderedEmail tuples in the same order as `entries`.
+        """
+        if workers and workers > 1 and len(entries) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(lambda entry: self.render(*entry), entries))
+        return [self.render(employee, shifts) for employee, shifts in entries]
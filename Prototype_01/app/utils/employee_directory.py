@@ -0,0 +1,61 @@
+# app/utils/employee_directory.py
+
+from collections import namedtuple
+from app import db
+from app.models import Employee
+from app.utils import cache
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# The three columns employee pickers need, without loading ORM objects.
+EmployeeChoice = namedtuple("EmployeeChoice", ["id", "name", "position"])
+
+_choices_cache = cache.RenderCache(max_entries=2)
+
+
+def employee_choices():
+    """
+    Returns every employee as an EmployeeChoice, ordered by name.
+
+    The list is cached in this process under the EMPLOYEES version counter,
+    so while no employee is added, renamed, moved or deleted a call costs
+    one primary-key lookup.
+    """
+    version = cache.get_version(cache.EMPLOYEES)
+    choices = _choices_cache.get(version)
+    if choices is None:
+        choices = tuple(
+            EmployeeChoice(*row)
+            for row in db.session.execute(
+                db.select(Employee.id, Employee.name, Employee.position).order_by(
+                    Employee.name
+                )
+            )
+        )
+        _choices_cache.set(version, choices)
+    return choices
+
+
+def search_employees(query, limit=SEARCH_LIMIT, position=None):
+    """
+    Returns up to `limit` EmployeeChoice rows whose name starts with `query`
+    (case-insensitive, Unicode-aware), ordered by name.
+
+    The query is casefolded like Employee.search_name and matched as a range
+    on that indexed column; the LIKE only re-checks rows the range already
+    selected.
+    """
+    prefix = query.strip().casefold()
+    statement = db.select(Employee.id, Employee.name, Employee.position)
+    if prefix:
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        statement = statement.where(
+            Employee.search_name >= prefix,
+            Employee.search_name < upper_bound,
+            Employee.search_name.startswith(prefix, autoescape=True),
+        )
+    if position:
+        statement = statement.where(Employee.position == position)
+    rows = db.session.execute(statement.order_by(Employee.search_name).limit(limit))
+    return [EmployeeChoice(*row) for row in rows]
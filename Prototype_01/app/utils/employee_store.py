@@ -0,0 +1,204 @@
+# app/utils/employee_store.py
+
+from app import db
+from app.models import Employee, PerformanceLog, Shift
+from app.utils import cache
+from collections import namedtuple
+from email_validator import EmailNotValidError, validate_email
+import csv
+import logging
+
+log = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_COLUMNS = ["name", "position", "email", "hourly_rate"]
+
+ImportResult = namedtuple("ImportResult", ["inserted", "updated", "unchanged", "errors"])
+
+
+def conflicting_fields(name, email, exclude_id=None):
+    """
+    Returns which of "name" and "email" are already used by another
+    employee, in one query. Meant for reporting after a write failed on the
+    unique constraints, rather than as a check before writing.
+    """
+    query = db.select(Employee.name, Employee.email).where(
+        (Employee.name == name) | (Employee.email == email)
+    )
+    if exclude_id is not None:
+        query = query.where(Employee.id != exclude_id)
+    taken = set()
+    for row in db.session.execute(query):
+        if row.name == name:
+            taken.add("name")
+        if row.email == email:
+            taken.add("email")
+    return [field for field in ("name", "email") if field in taken]
+
+
+def dependent_records(employee_id):
+    """
+    Returns the kinds of records ("shifts", "performance logs") that still
+    reference an employee, from a single query of two EXISTS subqueries.
+    """
+    has_shifts, has_logs = db.session.execute(
+        db.select(
+            db.exists().where(Shift.employee_id == employee_id),
+            db.exists().where(PerformanceLog.employee_id == employee_id),
+        )
+    ).one()
+    relations = []
+    if has_shifts:
+        relations.append("shifts")
+    if has_logs:
+        relations.append("performance logs")
+    return relations
+
+
+def _parse_import_row(row, positions):
+    """Validates one CSV row; returns (values, None) or (None, error message)."""
+    values = {column: (row.get(column) or "").strip() for column in IMPORT_COLUMNS}
+    if not values["name"]:
+        return None, "name is required"
+    try:
+        validate_email(values["email"], check_deliverability=False)
+    except EmailNotValidError:
+        return None, f"'{values['email']}' is not a valid email"
+    if values["position"] not in positions:
+        return None, f"unknown position '{values['position']}'"
+    if values["hourly_rate"]:
+        try:
+            values["hourly_rate"] = float(values["hourly_rate"])
+        except ValueError:
+            return None, f"hourly_rate '{values['hourly_rate']}' is not a number"
+        if values["hourly_rate"] < 0:
+            return None, "hourly_rate cannot be negative"
+    else:
+        values["hourly_rate"] = None
+    return values, None
+
+
+def _import_batch(batch, seen_names, seen_emails):
+    """
+    Upserts one batch of (line number, values) keyed on email: one SELECT for
+    the batch's existing employees, then one executemany INSERT and one
+    UPDATE by primary key. These Core statements bypass the model's
+    validators, so search_name is set here. Returns (inserted, updated,
+    unchanged, errors).
+    """
+    names = [values["name"] for _, values in batch]
+    emails = [values["email"] for _, values in batch]
+    existing = db.session.execute(
+        db.select(
+            Employee.id,
+            Employee.name,
+            Employee.position,
+            Employee.email,
+            Employee.hourly_rate,
+        ).where(Employee.email.in_(emails) | Employee.name.in_(names))
+    ).all()
+    by_email = {row.email: row for row in existing}
+    email_by_name = {row.name: row.email for row in existing}
+
+    to_insert, to_update, errors = [], [], []
+    unchanged = 0
+    for line, values in batch:
+        name, email = values["name"], values["email"]
+        if email in seen_emails:
+            errors.append((line, f"email '{email}' appears earlier in the file"))
+            continue
+        if name in seen_names:
+            errors.append((line, f"name '{name}' appears earlier in the file"))
+            continue
+        if email_by_name.get(name, email) != email:
+            errors.append(
+                (line, f"name '{name}' belongs to another employee ({email_by_name[name]})")
+            )
+            continue
+        seen_names.add(name)
+        seen_emails.add(email)
+
+        current = by_email.get(email)
+        if current is None:
+            to_insert.append(dict(values, search_name=name.casefold()))
+        elif (current.name, current.position, current.hourly_rate) == (
+            name,
+            values["position"],
+            values["hourly_rate"],
+        ):
+            unchanged += 1
+        else:
+            to_update.append(dict(values, id=current.id, search_name=name.casefold()))
+
+    if to_insert:
+        db.session.execute(db.insert(Employee), to_insert)
+    if to_update:
+        db.session.execute(db.update(Employee), to_update)
+    return len(to_insert), len(to_update), unchanged, errors
+
+
+def import_employees_csv(stream, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Imports employees from CSV text with the header name, position, email,
+    hourly_rate. Rows are matched to existing employees by email: new emails
+    are inserted, known ones updated. Invalid rows are skipped and reported;
+    the rest is written in batches of `batch_size` and committed once.
+
+    Returns:
+        ImportResult: counts of inserted, updated and unchanged rows, and
+        a list of (line number, message) for the skipped rows.
+
+    Raises:
+        ValueError: If the header lacks a required column.
+    """
+    from app.forms import POSITION_CHOICES
+
+    positions = {value for value, _ in POSITION_CHOICES if value}
+    reader = csv.DictReader(stream)
+    missing = [c for c in ("name", "position", "email") if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing the column(s): {', '.join(missing)}.")
+
+    inserted = updated = unchanged = 0
+    errors = []
+    seen_names, seen_emails = set(), set()
+    batch = []
+
+    def flush_batch():
+        nonlocal inserted, updated, unchanged
+        batch_inserted, batch_updated, batch_unchanged, batch_errors = _import_batch(
+            batch, seen_names, seen_emails
+        )
+        inserted += batch_inserted
+        updated += batch_updated
+        unchanged += batch_unchanged
+        errors.extend(batch_errors)
+        batch.clear()
+
+    try:
+        for row in reader:
+            values, error = _parse_import_row(row, positions)
+            if error:
+                errors.append((reader.line_num, error))
+                continue
+            batch.append((reader.line_num, values))
+            if len(batch) >= batch_size:
+                flush_batch()
+        if batch:
+            flush_batch()
+
+        if inserted or updated:
+            cache.bump_version(cache.EMPLOYEES)
+            if updated:
+                # Names, positions and rates appear on the cached schedule page.
+                cache.bump_version(cache.SCHEDULE)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    log.info(
+        f"Employee import: {inserted} inserted, {updated} updated, "
+        f"{unchanged} unchanged, {len(errors)} skipped."
+    )
+    return ImportResult(inserted, updated, unchanged, sorted(errors))
@@ -0,0 +1,254 @@
+# app/utils/forecast_engines.py
+
+# Like forecasting.py, this module imports pandas, NumPy and Prophet lazily
+# so it stays cheap to import from the web workers.
+import json
+import logging
+
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+SEASON_LENGTH = 7  # Day-of-week seasonality on daily data
+INTERVAL_Z = 1.2816  # 80% intervals, matching Prophet's default interval_width
+
+# Bumped whenever a NumPy engine's algorithm changes, so cached models and
+# stored forecast runs from the old algorithm are not reused.
+NUMPY_ENGINE_REVISION = 1
+
+
+def _daily_history(df):
+    """Returns (ds DatetimeIndex, y ndarray) on a gap-free daily grid."""
+    import pandas as pd
+
+    df = df.dropna(subset=["y"])
+    if df.empty:
+        raise ValueError("History has no non-missing 'y' values.")
+    series = (
+        df.assign(ds=pd.to_datetime(df["ds"]).dt.normalize())
+        .groupby("ds")["y"]
+        .mean()
+        .asfreq("D")
+        .interpolate()
+    )
+    return series.index, series.to_numpy(dtype=float)
+
+
+def _forecast_frame(first_ds, fitted, future, sigma_by_step, sigma):
+    """Builds the ds/yhat/yhat_lower/yhat_upper frame for history + future."""
+    import numpy as np
+    import pandas as pd
+
+    yhat = np.concatenate([fitted, future])
+    sigmas = np.concatenate([np.full(len(fitted), sigma), sigma_by_step])
+    return pd.DataFrame(
+        {
+            "ds": pd.date_range(pd.Timestamp(first_ds), periods=len(yhat), freq="D"),
+            "yhat": yhat,
+            "yhat_lower": yhat - INTERVAL_Z * sigmas,
+            "yhat_upper": yhat + INTERVAL_Z * sigmas,
+        }
+    )
+
+
+class Forecaster:
+    """
+    Interface implemented by every forecasting engine.
+
+    fit() takes a ds/y DataFrame and returns a model; predict() returns
+    FORECAST_COLUMNS for the history plus `days_to_predict` future days, the
+    same shape Prophet produces. Models round-trip through serialize() and
+    deserialize() so model_store can cache them.
+    """
+
+    name = None
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def version(self):
+        raise NotImplementedError
+
+    def fit(self, df):
+        raise NotImplementedError
+
+    def predict(self, model, days_to_predict):
+        raise NotImplementedError
+
+    def serialize(self, model):
+        return json.dumps(model)
+
+    def deserialize(self, text):
+        return json.loads(text)
+
+
+class ProphetForecaster(Forecaster):
+    """Prophet with `params` passed to its constructor."""
+
+    name = "prophet"
+
+    def version(self):
+        import prophet
+
+        return prophet.__version__
+
+    def fit(self, df):
+        from prophet import Prophet
+        from cmdstanpy.utils import get_logger
+
+        # cmdstanpy configures its logger (at INFO) on first use; do that now
+        # so the level set here sticks.
+        get_logger().setLevel(logging.WARNING)
+        logging.getLogger("prophet").setLevel(logging.WARNING)
+        model = Prophet(**self.params)
+        model.fit(df)
+        return model
+
+    def predict(self, model, days_to_predict):
+        future = model.make_future_dataframe(periods=days_to_predict)
+        return model.predict(future)[FORECAST_COLUMNS]
+
+    def serialize(self, model):
+        from prophet.serialize import model_to_json
+
+        return model_to_json(model)
+
+    def deserialize(self, text):
+        from prophet.serialize import model_from_json
+
+        return model_from_json(text)
+
+
+class SeasonalNaiveForecaster(Forecaster):
+    """Repeats the last observed week; the baseline the others must beat."""
+
+    name = "seasonal_naive"
+
+    def version(self):
+        import numpy as np
+
+        return f"numpy-{np.__version__}-r{NUMPY_ENGINE_REVISION}"
+
+    def fit(self, df):
+        import numpy as np
+
+        index, y = _daily_history(df)
+        if len(y) < SEASON_LENGTH:
+            raise ValueError(f"Need at least {SEASON_LENGTH} days of history.")
+
+        fitted = y.copy()
+        fitted[SEASON_LENGTH:] = y[:-SEASON_LENGTH]
+        residuals = y[SEASON_LENGTH:] - fitted[SEASON_LENGTH:]
+        return {
+            "first_ds": index[0].isoformat(),
+            "fitted": fitted.tolist(),
+            "last_season": y[-SEASON_LENGTH:].tolist(),
+            "sigma": float(np.sqrt(np.mean(residuals**2))) if len(residuals) else 0.0,
+        }
+
+    def predict(self, model, days_to_predict):
+        import numpy as np
+
+        steps = np.arange(days_to_predict)
+        future = np.asarray(model["last_season"])[steps % SEASON_LENGTH]
+        # The error grows with each full season the forecast repeats.
+        sigma_by_step = model["sigma"] * np.sqrt(steps // SEASON_LENGTH + 1)
+        return _forecast_frame(
+            model["first_ds"], model["fitted"], future, sigma_by_step, model["sigma"]
+        )
+
+
+class HoltWintersForecaster(Forecaster):
+    """
+    Additive Holt-Winters with a damped trend and day-of-week seasonality.
+
+    The smoothing parameters are chosen by grid search on one-step-ahead
+    squared error; every candidate is run in the same vectorised pass over
+    the history, so fitting takes milliseconds.
+    """
+
+    name = "holt_winters"
+
+    ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+    BETAS = (0.0, 0.02, 0.05, 0.1, 0.2)
+    GAMMAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+    PHIS = (0.9, 0.98)
+
+    def version(self):
+        import numpy as np
+
+        return f"numpy-{np.__version__}-r{NUMPY_ENGINE_REVISION}"
+
+    def fit(self, df):
+        import numpy as np
+
+        index, y = _daily_history(df)
+        m = SEASON_LENGTH
+        if len(y) < 2 * m:
+            raise ValueError(f"Need at least {2 * m} days of history.")
+
+        alpha, beta, gamma, phi = (
+            grid.ravel()
+            for grid in np.meshgrid(
+                self.ALPHAS, self.BETAS, self.GAMMAS, self.PHIS, indexing="ij"
+            )
+        )
+        candidates = len(alpha)
+
+        level = np.full(candidates, y[:m].mean())
+        trend = np.full(candidates, (y[m : 2 * m].mean() - y[:m].mean()) / m)
+        season = np.tile(y[:m] - y[:m].mean(), (candidates, 1))
+        fitted = np.empty((candidates, len(y)))
+
+        for t, observed in enumerate(y):
+            s = season[:, t % m].copy()
+            fitted[:, t] = level + phi * trend + s
+            new_level = alpha * (observed - s) + (1 - alpha) * (level + phi * trend)
+            trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            season[:, t % m] = gamma * (observed - new_level) + (1 - gamma) * s
+            level = new_level
+
+        sse = ((fitted - y) ** 2).sum(axis=1)
+        best = int(np.argmin(sse))
+        # Rotate so the stored season starts on the first forecast day.
+        next_season = np.roll(season[best], -(len(y) % m))
+        return {
+            "first_ds": index[0].isoformat(),
+            "fitted": fitted[best].tolist(),
+            "level": float(level[best]),
+            "trend": float(trend[best]),
+            "season": next_season.tolist(),
+            "alpha": float(alpha[best]),
+            "beta": float(beta[best]),
+            "gamma": float(gamma[best]),
+            "phi": float(phi[best]),
+            "sigma": float(np.sqrt(sse[best] / len(y))),
+        }
+
+    def predict(self, model, days_to_predict):
+        import numpy as np
+
+        h = np.arange(1, days_to_predict + 1)
+        phi = model["phi"]
+        damped_steps = np.cumsum(phi**h)
+        future = (
+            model["level"]
+            + damped_steps * model["trend"]
+            + np.asarray(model["season"])[(h - 1) % SEASON_LENGTH]
+        )
+
+        # h-step variance for additive Holt-Winters (Hyndman & Athanasopoulos).
+        j = np.arange(1, days_to_predict)
+        c = model["alpha"] * (1 + j * model["beta"]) + model["gamma"] * (
+            j % SEASON_LENGTH == 0
+        )
+        variance_factor = 1 + np.concatenate([[0.0], np.cumsum(c**2)])
+        sigma_by_step = model["sigma"] * np.sqrt(variance_factor)
+        return _forecast_frame(
+            model["first_ds"], model["fitted"], future, sigma_by_step, model["sigma"]
+        )
+
+
+ENGINES = {
+    "prophet": ProphetForecaster,
+    "holt_winters": HoltWintersForecaster,
+    "seasonal_naive": SeasonalNaiveForecaster,
+}
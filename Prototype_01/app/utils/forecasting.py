@@ -1,18 +1,142 @@
-import pandas as pd
-from prophet import Prophet
+# pandas and Prophet (with cmdstanpy and matplotlib) are imported inside the
+# functions that use them: importing this module from app.routes must stay
+# cheap for web workers that never forecast.
+from flask import current_app, has_app_context
+from app import db
+from app.models import Forecast
+from . import forecast_engines, model_store
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import io
+import multiprocessing
 import os
-import logging
+import time
 
-logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
-logging.getLogger("prophet").setLevel(logging.WARNING)
+# Hyperparameters passed to Prophet(); they are part of the model cache key.
+PROPHET_PARAMS = {}
 
+FORECAST_COLUMNS = forecast_engines.FORECAST_COLUMNS
 
-def generate_forecast(days_to_predict=7):
+# Longest horizon the web routes and commands accept, in days.
+MAX_DAYS_TO_PREDICT = 366
+
+# Constructor params per engine; like PROPHET_PARAMS, part of the cache key.
+ENGINE_PARAMS = {"prophet": PROPHET_PARAMS}
+
+
+def get_engine(name=None):
+    """
+    Returns the forecasting engine `name` (one of forecast_engines.ENGINES),
+    defaulting to FORECAST_ENGINE from the app config, then "prophet".
+    Raises ValueError for an unknown engine.
+    """
+    if name is None:
+        name = current_app.config.get("FORECAST_ENGINE") if has_app_context() else None
+    name = name or "prophet"
+    engine_class = forecast_engines.ENGINES.get(name)
+    if engine_class is None:
+        raise ValueError(
+            f"Unknown forecast engine '{name}'; choose from {', '.join(forecast_engines.ENGINES)}."
+        )
+    return engine_class(ENGINE_PARAMS.get(name, {}))
+
+
+def _load_stored_forecast(version, horizon_end):
+    """
+    Returns the stored forecast run for `version` up to `horizon_end` as a
+    DataFrame, or None if no stored run reaches that far.
+    """
+    import pandas as pd
+
+    last_row = (
+        Forecast.query.filter(Forecast.version == version)
+        .order_by(Forecast.ds.desc())
+        .first()
+    )
+    if last_row is None or last_row.ds < horizon_end:
+        return None
+
+    rows = (
+        db.session.query(
+            Forecast.ds, Forecast.yhat, Forecast.yhat_lower, Forecast.yhat_upper
+        )
+        .filter(Forecast.version == version, Forecast.ds <= horizon_end)
+        .order_by(Forecast.ds)
+        .all()
+    )
+    stored = pd.DataFrame(rows, columns=["ds", "yhat", "yhat_lower", "yhat_upper"])
+    stored["ds"] = pd.to_datetime(stored["ds"])
+    return stored
+
+
+def _store_forecast(version, forecast_subset):
+    """Replaces the stored forecast run for `version` with `forecast_subset`."""
+    rows = [
+        {
+            "version": version,
+            "ds": row.ds.date(),
+            "yhat": float(row.yhat),
+            "yhat_lower": float(row.yhat_lower),
+            "yhat_upper": float(row.yhat_upper),
+            "created_at": datetime.datetime.utcnow(),
+        }
+        for row in forecast_subset.itertuples(index=False)
+    ]
+    try:
+        Forecast.query.filter(Forecast.version == version).delete(
+            synchronize_session=False
+        )
+        db.session.execute(db.insert(Forecast), rows)
+        db.session.commit()
+        print(f"Stored {len(rows)} forecast rows as version {version[:12]}.")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Could not store forecast run {version[:12]}: {e}")
+
+
+def _fit_and_predict(df, days_to_predict, model_key, engine):
+    """
+    Loads the `engine` model cached under `model_key` (or fits and caches
+    one on `df`) and predicts `days_to_predict` days past the history.
+
+    Returns:
+        tuple: (DataFrame of ds/yhat/yhat_lower/yhat_upper, True if the
+                model came from the cache)
     """
-    Generates a sales/demand forecast using Prophet.
+    m = model_store.load_model(model_key, engine.deserialize)
+    cached = m is not None
+
+    if cached:
+        print(f"Using cached {engine.name} model {model_key[:12]}.")
+    else:
+        print(f"Fitting {engine.name} model...")
+        m = engine.fit(df)
+        print("Model fitting complete.")
+        model_store.save_model(model_key, m, engine.serialize)
+
+    print(f"Generating forecast for {days_to_predict} days...")
+    forecast = engine.predict(m, days_to_predict)
+    print("Forecast generation complete.")
+
+    return forecast[FORECAST_COLUMNS], cached
+
+
+def generate_forecast(days_to_predict=7, engine=None):
+    """
+    Generates a sales/demand forecast using Prophet or another engine from
+    forecast_engines (per call, or FORECAST_ENGINE in the config).
+
+    Fitted models are cached on disk keyed by a fingerprint of the training
+    data, the engine, its version and its params, so a model is only refit
+    when any of them changes.
+    Inside an app context, each run is also stored in the Forecast table under
+    that fingerprint, and any horizon already covered by a stored run is
+    served from the table without touching Prophet.
 
     Args:
         days_to_predict (int): Number of days into the future to forecast.
+        engine (str): Engine name, e.g. "prophet" or "holt_winters".
 
     Returns:
         pandas.DataFrame: A DataFrame containing the forecast with columns
@@ -21,6 +145,8 @@ def generate_forecast(days_to_predict=7):
     """
     print("Attempting to generate forecast...") 
 
+    import pandas as pd
+
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_dir = os.path.join(os.path.dirname(base_dir), "data")
     file_path = os.path.join(data_dir, "historical_sales.csv")
@@ -28,7 +154,9 @@ def generate_forecast(days_to_predict=7):
     print(f"Looking for data file at: {file_path}")
 
     try:
-        df = pd.read_csv(file_path)
+        with open(file_path, "rb") as f:
+            raw_data = f.read()
+        df = pd.read_csv(io.BytesIO(raw_data))
         print(f"Successfully read {len(df)} rows from {file_path}")
 
         df["ds"] = pd.to_datetime(df["ds"])
@@ -42,20 +170,25 @@ def generate_forecast(days_to_predict=7):
             return None
 
         # --- Model Training & Forecasting ---
-        # Initialize Prophet model
-        m = Prophet()
+        engine = get_engine(engine)
+        model_key = model_store.fingerprint(
+            raw_data, engine.params, engine.name, engine.version()
+        )
+        use_store = has_app_context()
+        horizon_end = df["ds"].max().date() + datetime.timedelta(days=days_to_predict)
 
-        print("Fitting Prophet model...")
-        m.fit(df)
-        print("Model fitting complete.")
+        if use_store:
+            stored = _load_stored_forecast(model_key, horizon_end)
+            if stored is not None:
+                print(
+                    f"Serving {days_to_predict}-day forecast from stored run {model_key[:12]}."
+                )
+                return stored
 
-        future = m.make_future_dataframe(periods=days_to_predict)
+        forecast_subset, _ = _fit_and_predict(df, days_to_predict, model_key, engine)
 
-        print(f"Generating forecast for {days_to_predict} days...")
-        forecast = m.predict(future)
-        print("Forecast generation complete.")
-
-        forecast_subset = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+        if use_store:
+            _store_forecast(model_key, forecast_subset)
 
         print("Forecast results (tail):")
         print(forecast_subset.tail())
@@ -69,6 +202,146 @@ def generate_forecast(days_to_predict=7):
         print(f"An error occurred during forecasting: {e}")
         return None
 
+
+# One series' outcome in a batch run. `source` is "stored", "cached" or
+# "fitted"; `error` is set (and `rows` is 0) when the series failed.
+SeriesForecast = namedtuple(
+    "SeriesForecast", ["series_id", "rows", "seconds", "source", "error"]
+)
+BatchForecast = namedtuple("BatchForecast", ["forecast", "series"])
+
+
+def _read_series_frame(file_path):
+    """Reads long-format history from CSV or Parquet (which needs pyarrow)."""
+    import pandas as pd
+
+    if file_path.endswith(".parquet"):
+        try:
+            return pd.read_parquet(file_path)
+        except ImportError as e:
+            raise ValueError(f"Reading Parquet files requires pyarrow: {e}")
+    return pd.read_csv(file_path)
+
+
+def _forecast_series_worker(df, days_to_predict, model_key, engine_name):
+    """Process pool entry point: fits/predicts one series and times it."""
+    started = time.perf_counter()
+    forecast, cached = _fit_and_predict(
+        df, days_to_predict, model_key, get_engine(engine_name)
+    )
+    return forecast, time.perf_counter() - started, cached
+
+
+def generate_batch_forecast(
+    file_path,
+    days_to_predict=7,
+    series_column="series_id",
+    max_workers=None,
+    engine=None,
+):
+    """
+    Forecasts every series in a long-format history file (columns ds, y and
+    `series_column`, e.g. one series per location or station) in one call.
+
+    Series are fitted in parallel in a pool of at most `max_workers`
+    processes (FORECAST_WORKERS by default). Each series has its own model
+    cache key and, inside an app context, its own stored forecast run, so
+    unchanged series are not refit. A series that fails is reported in the
+    result and does not affect the others. A file without `series_column`
+    is treated as a single series named "all".
+
+    Returns:
+        BatchForecast: `forecast` is one DataFrame with a series_id column
+                       plus ds/yhat/yhat_lower/yhat_upper; `series` lists a
+                       SeriesForecast per series with its timing and error.
+    """
+    import pandas as pd
+
+    engine = get_engine(engine)
+    df = _read_series_frame(file_path)
+    if "ds" not in df.columns or "y" not in df.columns:
+        raise ValueError("History must contain 'ds' and 'y' columns.")
+    if series_column not in df.columns:
+        df[series_column] = "all"
+    df["ds"] = pd.to_datetime(df["ds"])
+
+    use_store = has_app_context()
+    if max_workers is None:
+        max_workers = current_app.config.get("FORECAST_WORKERS", 2) if use_store else 2
+
+    results = {}
+    frames = {}
+    pending = {}
+    for series_id, series_df in df.groupby(series_column, sort=True):
+        series_df = series_df[["ds", "y"]].sort_values("ds").reset_index(drop=True)
+        if len(series_df) < 2:
+            results[series_id] = SeriesForecast(
+                series_id, 0, 0.0, None, "Need at least 2 data points."
+            )
+            continue
+
+        model_key = model_store.fingerprint(
+            series_df.to_csv(index=False).encode("utf-8"),
+            engine.params,
+            engine.name,
+            engine.version(),
+        )
+        horizon_end = series_df["ds"].max().date() + datetime.timedelta(
+            days=days_to_predict
+        )
+        stored = _load_stored_forecast(model_key, horizon_end) if use_store else None
+        if stored is not None:
+            frames[series_id] = stored
+            results[series_id] = SeriesForecast(series_id, len(stored), 0.0, "stored", None)
+        else:
+            pending[series_id] = (series_df, model_key)
+
+    print(
+        f"Batch forecast: {len(pending)} series to fit, "
+        f"{len(frames)} served from stored runs, {max_workers} workers."
+    )
+
+    if pending:
+        # spawn, not fork: the web process has DB connections and threads.
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(max_workers, len(pending))),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {
+                series_id: pool.submit(
+                    _forecast_series_worker,
+                    series_df,
+                    days_to_predict,
+                    model_key,
+                    engine.name,
+                )
+                for series_id, (series_df, model_key) in pending.items()
+            }
+            for series_id, future in futures.items():
+                try:
+                    forecast, seconds, cached = future.result()
+                except Exception as e:
+                    print(f"Forecast for series {series_id} failed: {e}")
+                    results[series_id] = SeriesForecast(series_id, 0, 0.0, None, str(e))
+                    continue
+                frames[series_id] = forecast
+                results[series_id] = SeriesForecast(
+                    series_id, len(forecast), seconds, "cached" if cached else "fitted", None
+                )
+                if use_store:
+                    _store_forecast(pending[series_id][1], forecast)
+
+    combined = (
+        pd.concat(
+            [frame.assign(series_id=series_id) for series_id, frame in frames.items()],
+            ignore_index=True,
+        )[["series_id"] + FORECAST_COLUMNS]
+        if frames
+        else pd.DataFrame(columns=["series_id"] + FORECAST_COLUMNS)
+    )
+    return BatchForecast(combined, [results[key] for key in sorted(results)])
+
+
 if __name__ == "__main__":
     print("Running forecast generation directly...")
     forecast_result = generate_forecast(days_to_predict=14)
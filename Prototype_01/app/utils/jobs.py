@@ -0,0 +1,234 @@
+# app/utils/jobs.py
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db
+from app.models import ScheduleJob
+from app.utils import scheduling
+import datetime
+import json
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["queued", "running"]
+ABANDONED_ERROR = "Abandoned: the process running this job stopped before it finished."
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Jobs queued or running in this process, kept alive by the heartbeat thread.
+_owned_jobs = set()
+_owned_jobs_lock = threading.Lock()
+_heartbeat_thread = None
+
+
+def _get_executor():
+    """Returns this process's job executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = current_app.config.get("SCHEDULE_JOB_WORKERS", 1)
+            _executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="schedule-job"
+            )
+        return _executor
+
+
+def _heartbeat_loop(app, interval):
+    """Refreshes heartbeat_at of every job this process owns, forever."""
+    while True:
+        time.sleep(interval)
+        with _owned_jobs_lock:
+            job_ids = list(_owned_jobs)
+        if not job_ids:
+            continue
+        try:
+            with app.app_context(), Session(db.engine) as session:
+                session.execute(
+                    db.update(ScheduleJob)
+                    .where(ScheduleJob.id.in_(job_ids))
+                    .values(heartbeat_at=datetime.datetime.utcnow())
+                )
+                session.commit()
+        except Exception as e:
+            log.warning(f"Schedule job heartbeat failed: {e}")
+
+
+def _own_job(app, job_id):
+    """Registers a job for heartbeats, starting the heartbeat thread once."""
+    global _heartbeat_thread
+    with _owned_jobs_lock:
+        _owned_jobs.add(job_id)
+        if _heartbeat_thread is None:
+            # Several beats per lease, so one slow write does not expire a job.
+            interval = app.config.get("SCHEDULE_JOB_LEASE_SECONDS", 300) / 5
+            _heartbeat_thread = threading.Thread(
+                target=_heartbeat_loop,
+                args=(app, interval),
+                name="schedule-job-heartbeat",
+                daemon=True,
+            )
+            _heartbeat_thread.start()
+
+
+def _release_job(job_id):
+    with _owned_jobs_lock:
+        _owned_jobs.discard(job_id)
+
+
+def expire_abandoned_jobs():
+    """
+    Marks queued/running jobs whose heartbeat is older than
+    SCHEDULE_JOB_LEASE_SECONDS as failed: the process that owned them
+    crashed or was restarted, so they would otherwise block their month.
+
+    Returns:
+        int: Number of jobs marked failed.
+    """
+    lease_seconds = current_app.config.get("SCHEDULE_JOB_LEASE_SECONDS", 300)
+    now = datetime.datetime.utcnow()
+    result = db.session.execute(
+        db.update(ScheduleJob)
+        .where(
+            ScheduleJob.status.in_(ACTIVE_STATUSES),
+            ScheduleJob.heartbeat_at < now - datetime.timedelta(seconds=lease_seconds),
+        )
+        .values(
+            status="failed",
+            current_phase=None,
+            error=ABANDONED_ERROR,
+            finished_at=now,
+        )
+    )
+    db.session.commit()
+    if result.rowcount:
+        log.warning(f"Marked {result.rowcount} abandoned schedule job(s) as failed.")
+    return result.rowcount
+
+
+def _update_job(job_id, **changes):
+    """
+    Writes job progress, and a fresh heartbeat, through its own short-lived
+    session, so progress updates never commit the schedule's transaction.
+    Only call it between the schedule's transactions: on SQLite a second
+    writer waits until the first commits.
+    """
+    with Session(db.engine) as session:
+        job = session.get(ScheduleJob, job_id)
+        if job is None:
+            return
+        job.heartbeat_at = datetime.datetime.utcnow()
+        phase_seconds = changes.pop("phase_seconds", None)
+        if phase_seconds is not None:
+            timings = json.loads(job.phase_timings or "{}")
+            timings.update(phase_seconds)
+            job.phase_timings = json.dumps(timings)
+        for key, value in changes.items():
+            setattr(job, key, value)
+        session.commit()
+
+
+def _run_schedule_job(app, job_id, target_date, incremental):
+    try:
+        _execute_schedule_job(app, job_id, target_date, incremental)
+    finally:
+        _release_job(job_id)
+
+
+def _execute_schedule_job(app, job_id, target_date, incremental):
+    with app.app_context():
+        _update_job(
+            job_id,
+            status="running",
+            current_phase="forecast",
+            started_at=datetime.datetime.utcnow(),
+        )
+
+        def on_phase(phase, seconds, next_phase=None):
+            _update_job(
+                job_id,
+                current_phase=next_phase,
+                phase_seconds={phase: round(seconds, 3)},
+            )
+            if next_phase == "commit":
+                # The shift writes and the final commit are one transaction,
+                # which on SQLite holds the write lock that heartbeats would
+                # queue behind. The update above renewed the lease, so it
+                # must outlast that transaction instead.
+                _release_job(job_id)
+
+        try:
+            success = scheduling.create_schedule(
+                target_date, on_phase=on_phase, incremental=incremental
+            )
+            _update_job(
+                job_id,
+                status="succeeded" if success else "failed",
+                current_phase=None,
+                error=None if success else "Schedule generation failed. See logs.",
+                finished_at=datetime.datetime.utcnow(),
+            )
+        except Exception as e:
+            log.error(f"Schedule job {job_id} crashed: {e}", exc_info=True)
+            _update_job(
+                job_id,
+                status="failed",
+                current_phase=None,
+                error=str(e),
+                finished_at=datetime.datetime.utcnow(),
+            )
+
+
+def _active_job(target_month):
+    return ScheduleJob.query.filter(
+        ScheduleJob.target_month == target_month,
+        ScheduleJob.status.in_(ACTIVE_STATUSES),
+    ).first()
+
+
+def enqueue_schedule_job(target_date=None, incremental=False):
+    """
+    Queues schedule generation for the month containing `target_date` and
+    returns the ScheduleJob immediately. `incremental` is passed through to
+    scheduling.create_schedule.
+
+    If a job for that month is already queued or running, that job is
+    returned instead of starting a second one. The uq_schedule_job_active_month
+    index enforces this across concurrent requests and processes; jobs whose
+    owner stopped heartbeating are expired first, so a crash does not block
+    the month.
+    """
+    if target_date is None:
+        target_date = datetime.date.today()
+    target_month = target_date.replace(day=1)
+
+    expire_abandoned_jobs()
+
+    existing = _active_job(target_month)
+    if existing:
+        log.info(f"Schedule job {existing.id} already active for {target_month}.")
+        return existing
+
+    job = ScheduleJob(target_month=target_month, status="queued")
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request queued this month between the check and the insert.
+        db.session.rollback()
+        existing = _active_job(target_month)
+        if existing is None:
+            raise
+        log.info(f"Schedule job {existing.id} already active for {target_month}.")
+        return existing
+
+    app = current_app._get_current_object()
+    _own_job(app, job.id)
+    _get_executor().submit(_run_schedule_job, app, job.id, target_date, incremental)
+    log.info(f"Queued schedule job {job.id} for {target_month:%B %Y}.")
+    return job
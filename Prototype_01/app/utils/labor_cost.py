@@ -0,0 +1,200 @@
+# app/utils/labor_cost.py
+
+from sqlalchemy import func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app import db
+from app.models import Employee, Shift
+import csv
+import io
+
+
+class week_start(FunctionElement):
+    """SQL expression for the Monday (as a DATE) of the week containing a timestamp."""
+
+    type = db.Date()
+    name = "week_start"
+    inherit_cache = True
+
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    # 'weekday 0' moves forward to Sunday (or stays on it); 6 days back is Monday.
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+
+@compiles(week_start)
+def _week_start_default(element, compiler, **kw):
+    # PostgreSQL: date_trunc('week', ...) truncates to the ISO (Monday) week.
+    return f"CAST(date_trunc('week', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+class shift_hours(FunctionElement):
+    """SQL expression for the hours between two timestamps: shift_hours(start, end)."""
+
+    type = db.Float()
+    name = "shift_hours"
+    inherit_cache = True
+
+
+@compiles(shift_hours, "sqlite")
+def _shift_hours_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return (
+        f"((julianday({compiler.process(end, **kw)}) - "
+        f"julianday({compiler.process(start, **kw)})) * 24.0)"
+    )
+
+
+@compiles(shift_hours)
+def _shift_hours_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return (
+        f"(EXTRACT(EPOCH FROM ({compiler.process(end, **kw)} - "
+        f"{compiler.process(start, **kw)})) / 3600.0)"
+    )
+
+
+def shift_cost_expr():
+    """Cost of one shift: hours x the assigned employee's rate (0 if unassigned)."""
+    return shift_hours(Shift.start_time, Shift.end_time) * func.coalesce(
+        Employee.hourly_rate, 0.0
+    )
+
+
+def weekly_cost_summary(start, end_exclusive):
+    """
+    Aggregates shift count and labor cost per week in the database.
+
+    Returns:
+        tuple: (list of (week_start, shift_count, cost) rows ordered by week,
+                grand total cost)
+    """
+    week = week_start(Shift.start_time).label("week_start")
+    rows = (
+        db.session.query(
+            week,
+            func.count(Shift.id).label("shift_count"),
+            func.coalesce(func.sum(shift_cost_expr()), 0.0).label("cost"),
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .filter(Shift.start_time >= start, Shift.start_time < end_exclusive)
+        .group_by(week)
+        .order_by(week)
+        .all()
+    )
+    return rows, sum(row.cost for row in rows)
+
+
+def shift_rows_with_cost(start, end_exclusive):
+    """
+    Returns flat rows for every shift in the range, with the employee fields,
+    the week they fall in and their cost computed by the database, ordered by
+    (start_time, required_position). No ORM objects are loaded.
+    """
+    return (
+        db.session.query(
+            Shift.id,
+            Shift.start_time,
+            Shift.end_time,
+            Shift.required_position,
+            Employee.name.label("employee_name"),
+            Employee.position.label("employee_position"),
+            week_start(Shift.start_time).label("week_start"),
+            shift_cost_expr().label("cost"),
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .filter(Shift.start_time >= start, Shift.start_time < end_exclusive)
+        .order_by(Shift.start_time, Shift.required_position)
+        .all()
+    )
+
+
+EXPORT_COLUMNS = [
+    "shift_id",
+    "start_time",
+    "end_time",
+    "required_position",
+    "employee_id",
+    "employee_name",
+    "hourly_rate",
+    "hours",
+    "cost",
+]
+EXPORT_CHUNK_SIZE = 1000
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_text(value):
+    """Escapes free-text values so Excel and friends show them as text."""
+    if value and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value or ""
+
+
+def iter_shift_cost_rows(start, end_exclusive, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields one flat row per shift in [start, end_exclusive), ordered by
+    (start_time, id), with hours and cost computed by the database.
+
+    Rows are fetched `chunk_size` at a time over a server-side cursor
+    (yield_per), so memory use does not grow with the size of the range.
+    """
+    hours = shift_hours(Shift.start_time, Shift.end_time)
+    statement = (
+        db.select(
+            Shift.id.label("shift_id"),
+            Shift.start_time,
+            Shift.end_time,
+            Shift.required_position,
+            Shift.employee_id,
+            Employee.name.label("employee_name"),
+            Employee.hourly_rate,
+            hours.label("hours"),
+            (hours * func.coalesce(Employee.hourly_rate, 0.0)).label("cost"),
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .where(Shift.start_time >= start, Shift.start_time < end_exclusive)
+        .order_by(Shift.start_time, Shift.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    yield from db.session.execute(statement)
+
+
+def iter_shift_cost_csv(start, end_exclusive, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the payroll export for [start, end_exclusive) as CSV text, one
+    chunk of up to `chunk_size` rows at a time, header first.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in iter_shift_cost_rows(start, end_exclusive, chunk_size):
+        writer.writerow(
+            [
+                row.shift_id,
+                row.start_time.isoformat(sep=" "),
+                row.end_time.isoformat(sep=" "),
+                _csv_text(row.required_position),
+                "" if row.employee_id is None else row.employee_id,
+                _csv_text(row.employee_name),
+                "" if row.hourly_rate is None else f"{row.hourly_rate:.2f}",
+                f"{row.hours:.2f}",
+                f"{row.cost:.2f}",
+            ]
+        )
+        pending += 1
+        if pending >= chunk_size:
+            yield flush()
+            pending = 0
+    yield flush()
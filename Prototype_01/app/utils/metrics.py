@@ -0,0 +1,236 @@
+# app/utils/metrics.py
+
+from flask import (
+    Response,
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import bisect
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+MAX_LOGGED_QUERIES = 50  # Statements kept per request for the slow-request log
+MAX_STATEMENT_CHARS = 300
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """A labelled Prometheus-style histogram kept in this process."""
+
+    def __init__(self, name, description, label_names, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series_items = sorted(self._series.items())
+            series_items = [(labels, list(series)) for labels, series in series_items]
+        for label_values, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(
+                    self.label_names, label_values, [("le", _format_number(bound))]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return "\n".join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    "flask_request_duration_seconds",
+    "Wall time per request, until the response (or stream) finished.",
+    ["endpoint", "method", "status"],
+)
+SQL_SECONDS = Histogram(
+    "flask_request_sql_seconds",
+    "Time spent executing SQL per request.",
+    ["endpoint", "method"],
+)
+SQL_QUERIES = Histogram(
+    "flask_request_sql_queries",
+    "SQL statements executed per request.",
+    ["endpoint", "method"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+TEMPLATE_SECONDS = Histogram(
+    "flask_request_template_seconds",
+    "Time spent rendering Jinja templates per request.",
+    ["endpoint", "method"],
+)
+PYTHON_SECONDS = Histogram(
+    "flask_request_python_seconds",
+    "Request time outside SQL and template rendering (view code, serialisation).",
+    ["endpoint", "method"],
+)
+HISTOGRAMS = [REQUEST_SECONDS, SQL_SECONDS, SQL_QUERIES, TEMPLATE_SECONDS, PYTHON_SECONDS]
+
+
+class RequestStats:
+    """Timings collected for the current request, kept on flask.g."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.queries = []  # (seconds, statement), up to MAX_LOGGED_QUERIES
+        self.template_seconds = 0.0
+        self.template_starts = []
+
+
+def _current_stats():
+    if not has_request_context():
+        return None
+    return g.get("_request_stats")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats()
+    started = getattr(context, "_metrics_started", None)
+    if stats is None or started is None:
+        return
+    seconds = time.perf_counter() - started
+    stats.sql_count += 1
+    stats.sql_seconds += seconds
+    if len(stats.queries) < MAX_LOGGED_QUERIES:
+        stats.queries.append((seconds, " ".join(statement.split())[:MAX_STATEMENT_CHARS]))
+
+
+def _before_render_template(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None:
+        stats.template_starts.append(time.perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    stats = _current_stats()
+    if stats is not None and stats.template_starts:
+        stats.template_seconds += time.perf_counter() - stats.template_starts.pop()
+
+
+def _start_request():
+    g._request_stats = RequestStats()
+
+
+def _finish_request(app):
+    """
+    Returns an after_request hook that records the request once its
+    response is closed, i.e. after a streamed body has been fully sent.
+    """
+
+    def finish(response):
+        stats = _current_stats()
+        if stats is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        method = request.method
+        path = request.full_path.rstrip("?")
+        status = response.status_code
+        slow_seconds = app.config["SLOW_REQUEST_SECONDS"]
+
+        def record():
+            seconds = time.perf_counter() - stats.started
+            python_seconds = max(0.0, seconds - stats.sql_seconds - stats.template_seconds)
+
+            REQUEST_SECONDS.observe(seconds, endpoint, method, str(status))
+            SQL_SECONDS.observe(stats.sql_seconds, endpoint, method)
+            SQL_QUERIES.observe(stats.sql_count, endpoint, method)
+            TEMPLATE_SECONDS.observe(stats.template_seconds, endpoint, method)
+            PYTHON_SECONDS.observe(python_seconds, endpoint, method)
+
+            if seconds >= slow_seconds:
+                query_lines = "".join(
+                    f"\n    {query_seconds * 1000:8.1f} ms  {statement}"
+                    for query_seconds, statement in stats.queries
+                )
+                if stats.sql_count > len(stats.queries):
+                    query_lines += f"\n    ... {stats.sql_count - len(stats.queries)} more"
+                log.warning(
+                    f"Slow request: {method} {path} -> {status} in {seconds:.3f}s "
+                    f"(SQL {stats.sql_count} queries / {stats.sql_seconds:.3f}s, "
+                    f"templates {stats.template_seconds:.3f}s, "
+                    f"python {python_seconds:.3f}s){query_lines}"
+                )
+
+        response.call_on_close(record)
+        return response
+
+    return finish
+
+
+def metrics_view():
+    """Prometheus text exposition of this process's request histograms."""
+    body = "\n\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """
+    Instruments every request of `app` (wall time, SQL count and time,
+    template time) and serves the histograms at /metrics.
+
+    Histograms live in process memory, so under gunicorn each worker
+    reports its own; scrape every worker or run one per container.
+    """
+    if not app.config["METRICS_ENABLED"]:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request(app))
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
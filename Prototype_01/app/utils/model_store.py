@@ -0,0 +1,101 @@
+# app/utils/model_store.py
+
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+_base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_DIR = os.environ.get("FORECAST_MODEL_DIR") or os.path.join(
+    _base_dir, "instance", "forecast_models"
+)
+
+# Models already deserialized by this process, keyed by fingerprint, least
+# recently used first. Every data or engine change adds a new key, so only
+# the most recent few are kept.
+MAX_LOADED_MODELS = int(os.environ.get("FORECAST_LOADED_MODELS") or 4)
+_loaded_models = OrderedDict()
+_loaded_models_lock = threading.Lock()
+
+
+def _remember(key, model):
+    with _loaded_models_lock:
+        _loaded_models[key] = model
+        _loaded_models.move_to_end(key)
+        while len(_loaded_models) > MAX_LOADED_MODELS:
+            _loaded_models.popitem(last=False)
+
+
+def fingerprint(raw_data, params, engine="prophet", engine_version=""):
+    """
+    Builds a cache key for a fitted model.
+
+    Args:
+        raw_data (bytes): The raw training data exactly as read from disk.
+        params (dict): Hyperparameters the model is constructed with.
+        engine (str): Name of the forecasting engine.
+        engine_version (str): Library version, so upgrades invalidate old files.
+
+    Returns:
+        str: Hex digest that changes whenever the data or model setup changes.
+    """
+    digest = hashlib.sha256()
+    digest.update(raw_data)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(f"{engine}:{engine_version}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _model_path(key):
+    return os.path.join(MODEL_DIR, f"{key}.json")
+
+
+def load_model(key, deserialize):
+    """
+    Returns the fitted model stored under `key`, or None if there is none.
+
+    Checks this process's memory first, then the shared directory on disk,
+    so a model fitted by one gunicorn worker is reused by the others.
+    """
+    with _loaded_models_lock:
+        model = _loaded_models.get(key)
+        if model is not None:
+            _loaded_models.move_to_end(key)
+            return model
+
+    path = _model_path(key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            model = deserialize(f.read())
+    except Exception as e:
+        log.warning(f"Could not load cached model {path}: {e}")
+        return None
+
+    _remember(key, model)
+    return model
+
+
+def save_model(key, model, serialize):
+    """
+    Serializes a fitted model under `key`.
+
+    The file is written to a temp file and renamed into place, so concurrent
+    workers never read a half-written model.
+    """
+    _remember(key, model)
+    try:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=MODEL_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(serialize(model))
+        os.replace(tmp_path, _model_path(key))
+    except Exception as e:
+        log.warning(f"Could not persist model {key}: {e}")
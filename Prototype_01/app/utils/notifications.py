@@ -2,26 +2,20 @@
 
 from flask_mail import Message  # Import Message class
 from app import mail  # Import the mail instance from app/__init__.py
-from flask import (
-    current_app,
-    render_template,
-)  # Import current_app for config, render_template for HTML body
+from flask import current_app  # Import current_app for config
+from .email_rendering import ScheduleEmailRenderer
+from concurrent.futures import ThreadPoolExecutor
 import logging  # Optional: for better logging
+import time
 
 # Configure logger (optional, but good practice)
 log = logging.getLogger(__name__)
 
 
-def send_schedule_update_email(employee, shifts):
+def _can_email(employee, shifts, allow_empty=False):
     """
-    Sends an email to an employee with their assigned shifts.
-
-    Args:
-        employee (Employee): The Employee object (must have .name and .email).
-        shifts (list): A list of Shift objects assigned to this employee for the period.
-
-    Returns:
-        bool: True if email sending was attempted (doesn't guarantee delivery), False on error.
+    Checks an employee has an address and shifts to be told about (or,
+    with `allow_empty`, that their shifts were all removed).
     """
     if not (employee and employee.email):
         log.warning(
@@ -29,46 +23,93 @@ def send_schedule_update_email(employee, shifts):
         )
         return False
 
-    if not shifts:
+    if not shifts and not allow_empty:
         log.info(
             f"No shifts to notify for employee {employee.name} ({employee.email}). Email not sent."
         )
-        return True  # Not an error, just nothing to send
+        return False
+    return True
 
-    try:
-        # Get sender from app config (set in .env)
-        sender_email = current_app.config["MAIL_DEFAULT_SENDER"]
-        if not sender_email:
-            log.error("MAIL_DEFAULT_SENDER not configured. Cannot send email.")
-            return False
 
-        # Determine date range for subject (find min/max dates in shifts list)
-        if shifts:
-            min_date = min(s.start_time.date() for s in shifts)
-            max_date = max(s.start_time.date() for s in shifts)
-            date_range_str = (
-                f"{min_date.strftime('%b %d')} - {max_date.strftime('%b %d, %Y')}"
-            )
-        else:
-            date_range_str = "Upcoming Period"  # Fallback subject date
-
-        subject = f"Your Pozole Schedule: {date_range_str}"
-
-        # Create the email message object
-        msg = Message(subject=subject, sender=sender_email, recipients=[employee.email])
-
-        # Render the HTML body using the template
-        # Pass employee and shifts objects to the template context
-        msg.html = render_template(
-            "email/schedule_update.html",  # Path to the template
-            employee=employee,
-            shifts=shifts,
+def build_schedule_update_emails(entries, workers=None, period=None):
+    """
+    Builds (but does not send) schedule emails for many employees at once,
+    rendering them all in a single pass with shared precomputed context.
+
+    Args:
+        entries (list): (employee, shifts) pairs; shifts sorted by start_time.
+        workers (int): Render threads (default EMAIL_RENDER_WORKERS).
+        period (tuple): (first day, last day) of the run. When given,
+            employees with an empty shift list are told they have no shifts
+            in it; otherwise they are skipped.
+
+    Returns:
+        tuple: (list of Message, number of entries that could not be built)
+    """
+    # Get sender from app config (set in .env)
+    sender_email = current_app.config["MAIL_DEFAULT_SENDER"]
+    if not sender_email:
+        log.error("MAIL_DEFAULT_SENDER not configured. Cannot send email.")
+        return [], len(entries)
+
+    sendable = [
+        (employee, shifts)
+        for employee, shifts in entries
+        if _can_email(employee, shifts, allow_empty=period is not None)
+    ]
+    if workers is None:
+        workers = current_app.config.get("EMAIL_RENDER_WORKERS", 0)
+
+    renderer = ScheduleEmailRenderer(period)
+    messages = [
+        Message(
+            subject=rendered.subject,
+            sender=sender_email,
+            recipients=[rendered.employee.email],
+            html=rendered.html,
+            body=rendered.text,
         )
+        for rendered in renderer.render_all(sendable, workers=workers)
+    ]
+    return messages, len(entries) - len(sendable)
+
 
-        # Optional: Add a plain text body as fallback
-        # msg.body = f"Hi {employee.name},\n\nYour schedule is attached or viewable online.\n\nThanks."
+def build_schedule_update_email(employee, shifts):
+    """
+    Builds (but does not send) the schedule email for one employee.
+
+    Args:
+        employee (Employee): The Employee object (must have .name and .email).
+        shifts (list): Shifts assigned to this employee, sorted by start_time.
+
+    Returns:
+        Message: The email, or None if there is nothing to send or it cannot be built.
+    """
+    messages, _ = build_schedule_update_emails([(employee, shifts)])
+    return messages[0] if messages else None
+
+
+def send_schedule_update_email(employee, shifts):
+    """
+    Sends an email to an employee with their assigned shifts.
+
+    Args:
+        employee (Employee): The Employee object (must have .name and .email).
+        shifts (list): A list of Shift objects assigned to this employee for the period.
+
+    Returns:
+        bool: True if email sending was attempted (doesn't guarantee delivery), False on error.
+    """
+    if employee and employee.email and not shifts:
+        return True  # Not an error, just nothing to send
+
+    try:
+        msg = build_schedule_update_email(
+            employee, sorted(shifts, key=lambda s: s.start_time)
+        )
+        if msg is None:
+            return False
 
-        # Send the email
         log.info(f"Attempting to send schedule email to {employee.email}...")
         mail.send(msg)
         log.info(f"Email sent successfully to {employee.email}.")
@@ -78,5 +119,102 @@ def send_schedule_update_email(employee, shifts):
         log.error(
             f"Error sending schedule email to {employee.email}: {e}", exc_info=True
         )  # Log full exception
-        # Consider adding more specific error handling or re-trying logic later
         return False
+
+
+def _close_connection(connection):
+    if connection is not None and connection.host is not None:
+        try:
+            connection.host.quit()
+        except Exception:
+            connection.host.close()
+
+
+def _send_over_one_connection(app, messages, retries, backoff):
+    """
+    Sends `messages` in order over a single reused SMTP connection,
+    reconnecting and retrying (with exponential backoff) when a send fails.
+
+    Returns:
+        list: (message, error or None, attempts) for each message.
+    """
+    results = []
+    with app.app_context():
+        connection = None
+        try:
+            for msg in messages:
+                for attempt in range(1, retries + 2):
+                    try:
+                        if connection is None:
+                            connection = mail.connect().__enter__()
+                        connection.send(msg)
+                        results.append((msg, None, attempt))
+                        break
+                    except Exception as e:
+                        # The connection may be broken; start a fresh one next try.
+                        _close_connection(connection)
+                        connection = None
+                        if attempt > retries:
+                            log.error(f"Giving up on email to {msg.recipients}: {e}")
+                            results.append((msg, str(e), attempt))
+                        else:
+                            delay = backoff * 2 ** (attempt - 1)
+                            log.warning(
+                                f"Email to {msg.recipients} failed (attempt {attempt}): {e}. Retrying in {delay:.1f}s."
+                            )
+                            time.sleep(delay)
+        finally:
+            _close_connection(connection)
+    return results
+
+
+def send_batch(messages, concurrency=None, retries=None, backoff=None):
+    """
+    Sends many emails over a small pool of reused SMTP connections instead of
+    one connection (and TLS handshake) per message.
+
+    Args:
+        messages (list): flask_mail Message objects.
+        concurrency (int): Parallel connections (default MAIL_BATCH_CONCURRENCY).
+        retries (int): Retries per message (default MAIL_SEND_RETRIES).
+        backoff (float): Base retry delay in seconds, doubled per attempt
+                         (default MAIL_RETRY_BACKOFF).
+
+    Returns:
+        dict: {"sent", "failed", "retried", "seconds", "failures"} where
+              failures is a list of (message, error) pairs.
+    """
+    config = current_app.config
+    concurrency = concurrency or config.get("MAIL_BATCH_CONCURRENCY", 2)
+    retries = config.get("MAIL_SEND_RETRIES", 2) if retries is None else retries
+    backoff = config.get("MAIL_RETRY_BACKOFF", 1.0) if backoff is None else backoff
+
+    summary = {"sent": 0, "failed": 0, "retried": 0, "seconds": 0.0, "failures": []}
+    if not messages:
+        return summary
+
+    started = time.perf_counter()
+    app = current_app._get_current_object()
+    concurrency = max(1, min(concurrency, len(messages)))
+    chunks = [messages[i::concurrency] for i in range(concurrency)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(_send_over_one_connection, app, chunk, retries, backoff)
+            for chunk in chunks
+        ]
+        for future in futures:
+            for msg, error, attempts in future.result():
+                summary["retried"] += attempts - 1
+                if error is None:
+                    summary["sent"] += 1
+                else:
+                    summary["failed"] += 1
+                    summary["failures"].append((msg, error))
+
+    summary["seconds"] = time.perf_counter() - started
+    log.info(
+        f"Batch email finished: {summary['sent']} sent, {summary['failed']} failed, "
+        f"{summary['retried']} retries over {concurrency} connection(s) in {summary['seconds']:.2f}s."
+    )
+    return summary
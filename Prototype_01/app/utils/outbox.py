@@ -0,0 +1,176 @@
+# app/utils/outbox.py
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import or_
+from app import db
+from app.models import EmailOutbox
+from .notifications import send_batch
+import datetime
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+def enqueue_messages(messages):
+    """
+    Adds one EmailOutbox row per recipient of each message to the current
+    session. Nothing is sent and nothing is committed here: the caller
+    commits the rows in the same transaction as the data they describe.
+
+    Returns:
+        int: Number of outbox rows added.
+    """
+    now = datetime.datetime.utcnow()
+    rows = [
+        EmailOutbox(
+            sender=msg.sender if isinstance(msg.sender, str) else None,
+            recipient=recipient,
+            subject=msg.subject,
+            html_body=msg.html,
+            text_body=msg.body,
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        for msg in messages
+        for recipient in msg.recipients
+    ]
+    db.session.add_all(rows)
+    return len(rows)
+
+
+def _claim_batch(batch_size, lease_seconds):
+    """
+    Marks up to `batch_size` due rows as "sending" and returns them.
+
+    Rows left in "sending" longer than `lease_seconds` (the worker died
+    mid-batch) are claimed again, so no email is lost.
+    """
+    now = datetime.datetime.utcnow()
+    lease_expired = now - datetime.timedelta(seconds=lease_seconds)
+    rows = (
+        EmailOutbox.query.filter(
+            or_(
+                (EmailOutbox.status == "pending")
+                & (EmailOutbox.next_attempt_at <= now),
+                (EmailOutbox.status == "sending")
+                & (EmailOutbox.claimed_at < lease_expired),
+            )
+        )
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for row in rows:
+        row.status = "sending"
+        row.claimed_at = now
+    db.session.commit()
+    return rows
+
+
+def drain_batch(batch_size=None):
+    """
+    Claims one batch of due outbox rows, sends them over pooled SMTP
+    connections and records the outcome of each row.
+
+    Failed rows are rescheduled with exponential backoff
+    (OUTBOX_RETRY_BACKOFF * 2 ** attempts seconds) and dead-lettered once
+    they reach OUTBOX_MAX_ATTEMPTS.
+
+    Returns:
+        dict: {"claimed", "sent", "retrying", "dead", "seconds"}
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get("OUTBOX_BATCH_SIZE", 100)
+    max_attempts = config.get("OUTBOX_MAX_ATTEMPTS", 5)
+    backoff = config.get("OUTBOX_RETRY_BACKOFF", 30)
+    default_sender = config.get("MAIL_DEFAULT_SENDER")
+
+    started = time.perf_counter()
+    rows = _claim_batch(batch_size, config.get("OUTBOX_LEASE_SECONDS", 300))
+    result = {"claimed": len(rows), "sent": 0, "retrying": 0, "dead": 0, "seconds": 0.0}
+    if not rows:
+        return result
+
+    rows_by_message = {}
+    messages = []
+    for row in rows:
+        msg = Message(
+            subject=row.subject,
+            sender=row.sender or default_sender,
+            recipients=[row.recipient],
+            html=row.html_body,
+            body=row.text_body,
+        )
+        rows_by_message[id(msg)] = row
+        messages.append(msg)
+
+    # The outbox owns retries across runs, so each send is tried once here.
+    summary = send_batch(messages, retries=0)
+    failed = {id(msg): error for msg, error in summary["failures"]}
+
+    now = datetime.datetime.utcnow()
+    for msg in messages:
+        row = rows_by_message[id(msg)]
+        row.attempts += 1
+        row.claimed_at = None
+        if id(msg) not in failed:
+            row.status = "sent"
+            row.sent_at = now
+            row.last_error = None
+            result["sent"] += 1
+        elif row.attempts >= max_attempts:
+            row.status = "dead"
+            row.last_error = failed[id(msg)]
+            result["dead"] += 1
+            log.error(f"Outbox email {row.id} to {row.recipient} dead-lettered: {row.last_error}")
+        else:
+            row.status = "pending"
+            row.last_error = failed[id(msg)]
+            row.next_attempt_at = now + datetime.timedelta(
+                seconds=backoff * 2 ** (row.attempts - 1)
+            )
+            result["retrying"] += 1
+    db.session.commit()
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def drain_outbox(batch_size=None, loop=False, interval=5.0, echo=print):
+    """
+    Drains the outbox batch by batch until nothing is due (or forever when
+    `loop` is set, sleeping `interval` seconds whenever it is idle), and
+    reports throughput through `echo`.
+
+    Returns:
+        dict: Totals of {"sent", "retrying", "dead", "seconds"}.
+    """
+    totals = {"sent": 0, "retrying": 0, "dead": 0, "seconds": 0.0}
+    while True:
+        result = drain_batch(batch_size)
+        for key in totals:
+            totals[key] += result[key]
+
+        if result["claimed"]:
+            echo(
+                f"Outbox batch: {result['sent']} sent, {result['retrying']} retrying, "
+                f"{result['dead']} dead in {result['seconds']:.2f}s "
+                f"({result['claimed'] / max(result['seconds'], 1e-9):.1f} emails/sec)."
+            )
+            continue
+
+        if not loop:
+            break
+        time.sleep(interval)
+
+    echo(
+        f"Outbox drained: {totals['sent']} sent, {totals['retrying']} retrying, "
+        f"{totals['dead']} dead in {totals['seconds']:.2f}s "
+        f"({totals['sent'] / max(totals['seconds'], 1e-9):.1f} emails/sec)."
+    )
+    return totals
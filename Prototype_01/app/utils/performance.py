@@ -0,0 +1,276 @@
+# app/utils/performance.py
+
+from collections import namedtuple
+import datetime
+from itertools import groupby
+from sqlalchemy import case, extract, func, or_
+from app import db
+from app.models import Employee, EmployeePerformanceSummary, PerformanceLog
+
+LOG_PAGE_SIZE = 50
+EWMA_ALPHA = 0.3  # Weight of the newest rating in EmployeePerformanceSummary.ewma_rating
+REBUILD_BATCH_SIZE = 1000
+
+# Aggregates for one employee over a date range. `trend` is the least-squares
+# slope of rating per month (None with fewer than two distinct months).
+EmployeeSummary = namedtuple(
+    "EmployeeSummary",
+    ["employee_id", "name", "position", "log_count", "avg_rating", "latest_rating", "trend"],
+)
+PositionSummary = namedtuple("PositionSummary", ["position", "log_count", "avg_rating"])
+
+
+def log_page(start, end_exclusive, after=None, limit=LOG_PAGE_SIZE):
+    """
+    Returns up to `limit` logs dated in [start, end_exclusive), newest first,
+    as flat rows with the employee's name.
+
+    Pagination is keyset-based on (log_date, id) descending: `after` is the
+    (log_date, id) of the last row of the previous page, so every page costs
+    the same however much history has accumulated.
+    """
+    query = (
+        db.session.query(
+            PerformanceLog.id,
+            PerformanceLog.log_date,
+            PerformanceLog.rating,
+            PerformanceLog.notes,
+            PerformanceLog.recorded_at,
+            Employee.name.label("employee_name"),
+        )
+        .join(Employee, PerformanceLog.employee_id == Employee.id)
+        .filter(
+            PerformanceLog.log_date >= start, PerformanceLog.log_date < end_exclusive
+        )
+    )
+    if after is not None:
+        query = query.filter(db.tuple_(PerformanceLog.log_date, PerformanceLog.id) < after)
+    return (
+        query.order_by(PerformanceLog.log_date.desc(), PerformanceLog.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def employee_summaries(start, end_exclusive):
+    """
+    Computes per-employee aggregates for logs in [start, end_exclusive) in a
+    single grouped query: log count, average rating, latest rating (via a
+    row_number() window) and the rating trend per month.
+
+    Returns:
+        list: EmployeeSummary rows ordered by employee name.
+    """
+    month_index = (
+        extract("year", PerformanceLog.log_month) * 12
+        + extract("month", PerformanceLog.log_month)
+    )
+    ranked = (
+        db.select(
+            PerformanceLog.employee_id,
+            PerformanceLog.rating,
+            month_index.label("x"),
+            func.row_number()
+            .over(
+                partition_by=PerformanceLog.employee_id,
+                order_by=(PerformanceLog.log_date.desc(), PerformanceLog.id.desc()),
+            )
+            .label("recency"),
+        )
+        .where(
+            PerformanceLog.log_date >= start,
+            PerformanceLog.log_date < end_exclusive,
+            PerformanceLog.rating.isnot(None),
+        )
+        .subquery()
+    )
+
+    n = func.count(ranked.c.rating)
+    sum_x = func.sum(ranked.c.x)
+    sum_y = func.sum(ranked.c.rating)
+    sum_xy = func.sum(ranked.c.x * ranked.c.rating)
+    sum_xx = func.sum(ranked.c.x * ranked.c.x)
+    slope_denominator = n * sum_xx - sum_x * sum_x
+
+    rows = (
+        db.session.query(
+            Employee.id,
+            Employee.name,
+            Employee.position,
+            n.label("log_count"),
+            func.avg(ranked.c.rating).label("avg_rating"),
+            func.max(case((ranked.c.recency == 1, ranked.c.rating))).label("latest_rating"),
+            case(
+                (
+                    slope_denominator != 0,
+                    (n * sum_xy - sum_x * sum_y) * 1.0 / slope_denominator,
+                ),
+            ).label("trend"),
+        )
+        .join(ranked, ranked.c.employee_id == Employee.id)
+        .group_by(Employee.id, Employee.name, Employee.position)
+        .order_by(Employee.name)
+        .all()
+    )
+    return [EmployeeSummary(*row) for row in rows]
+
+
+def position_summaries(summaries):
+    """
+    Rolls EmployeeSummary rows up to per-position averages, weighting each
+    employee by their number of logs (so the result is the average over all
+    logs, computed without a second pass over the log table).
+    """
+    totals = {}
+    for summary in summaries:
+        position = summary.position or "Unassigned"
+        count, rating_sum = totals.get(position, (0, 0.0))
+        totals[position] = (
+            count + summary.log_count,
+            rating_sum + summary.avg_rating * summary.log_count,
+        )
+    return [
+        PositionSummary(position, count, rating_sum / count)
+        for position, (count, rating_sum) in sorted(totals.items())
+    ]
+
+
+def _summarize(employee_id, logs):
+    """
+    Folds (log_date, rating) pairs, in log_date order, into the column values
+    of an EmployeePerformanceSummary row.
+    """
+    values = {
+        "employee_id": employee_id,
+        "log_count": 0,
+        "rating_count": 0,
+        "mean_rating": None,
+        "ewma_rating": None,
+        "last_rating": None,
+        "last_log_date": None,
+        "updated_at": datetime.datetime.utcnow(),
+    }
+    for log_date, rating in logs:
+        values["log_count"] += 1
+        values["last_log_date"] = log_date
+        if rating is None:
+            continue
+        count = values["rating_count"] = values["rating_count"] + 1
+        mean = values["mean_rating"] or 0.0
+        values["mean_rating"] = mean + (rating - mean) / count
+        ewma = values["ewma_rating"]
+        values["ewma_rating"] = (
+            rating if ewma is None else EWMA_ALPHA * rating + (1 - EWMA_ALPHA) * ewma
+        )
+        values["last_rating"] = rating
+    return values
+
+
+def rebuild_employee_summary(employee_id):
+    """Recomputes one employee's summary row from their logs (not committed)."""
+    logs = db.session.execute(
+        db.select(PerformanceLog.log_date, PerformanceLog.rating)
+        .where(PerformanceLog.employee_id == employee_id)
+        .order_by(PerformanceLog.log_date, PerformanceLog.id)
+    ).all()
+    summary = db.session.get(EmployeePerformanceSummary, employee_id)
+    if not logs:
+        if summary is not None:
+            db.session.delete(summary)
+        return None
+    if summary is None:
+        summary = EmployeePerformanceSummary(employee_id=employee_id)
+        db.session.add(summary)
+    for column, value in _summarize(employee_id, logs).items():
+        setattr(summary, column, value)
+    return summary
+
+
+def record_log(log):
+    """
+    Folds a newly flushed PerformanceLog into its employee's summary in the
+    same transaction, with one UPDATE when the log is the employee's newest.
+    Out-of-order (backdated) logs and employees without a summary row fall
+    back to rebuild_employee_summary, since the EWMA depends on date order.
+    """
+    summary = EmployeePerformanceSummary.__table__.c
+    values = {
+        "log_count": summary.log_count + 1,
+        "last_log_date": log.log_date,
+        "updated_at": datetime.datetime.utcnow(),
+    }
+    if log.rating is not None:
+        # SET expressions all read the row's old values.
+        values.update(
+            rating_count=summary.rating_count + 1,
+            mean_rating=(
+                func.coalesce(summary.mean_rating, 0.0) * summary.rating_count + log.rating
+            )
+            / (summary.rating_count + 1),
+            ewma_rating=case(
+                (summary.ewma_rating.is_(None), log.rating),
+                else_=EWMA_ALPHA * log.rating + (1 - EWMA_ALPHA) * summary.ewma_rating,
+            ),
+            last_rating=log.rating,
+        )
+    result = db.session.execute(
+        db.update(EmployeePerformanceSummary.__table__)
+        .where(
+            summary.employee_id == log.employee_id,
+            or_(summary.last_log_date.is_(None), summary.last_log_date <= log.log_date),
+        )
+        .values(**values)
+    )
+    if result.rowcount == 0:
+        rebuild_employee_summary(log.employee_id)
+
+
+def rebuild_all_summaries(batch_size=REBUILD_BATCH_SIZE):
+    """
+    Recomputes every EmployeePerformanceSummary row from the logs in one
+    ordered pass and commits. Logs are read with a server-side cursor and
+    summaries are inserted `batch_size` at a time as they are produced, so
+    memory does not grow with the number of logs or employees. The delete
+    and every insert share one transaction.
+
+    Returns:
+        int: Number of summary rows written.
+    """
+    written = 0
+    batch = []
+
+    def flush():
+        nonlocal written
+        db.session.execute(db.insert(EmployeePerformanceSummary), batch)
+        written += len(batch)
+        batch.clear()
+
+    try:
+        db.session.execute(db.delete(EmployeePerformanceSummary))
+        result = db.session.execute(
+            db.select(PerformanceLog.employee_id, PerformanceLog.log_date, PerformanceLog.rating)
+            .order_by(PerformanceLog.employee_id, PerformanceLog.log_date, PerformanceLog.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for employee_id, logs in groupby(result, key=lambda log: log.employee_id):
+            batch.append(_summarize(employee_id, ((log.log_date, log.rating) for log in logs)))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return written
+
+
+def current_ratings(employee_ids=None):
+    """
+    Returns {employee_id: EmployeePerformanceSummary} read from the summary
+    table, optionally limited to `employee_ids`.
+    """
+    query = EmployeePerformanceSummary.query
+    if employee_ids is not None:
+        query = query.filter(EmployeePerformanceSummary.employee_id.in_(list(employee_ids)))
+    return {summary.employee_id: summary for summary in query}
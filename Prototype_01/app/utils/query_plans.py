@@ -0,0 +1,123 @@
+# app/utils/query_plans.py
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app import db
+from app.models import Employee, PerformanceLog, Shift
+import datetime
+
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN for any statement: EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return f"EXPLAIN QUERY PLAN {compiler.process(element.statement, **kw)}"
+
+
+@compiles(explain)
+def _explain_default(element, compiler, **kw):
+    return f"EXPLAIN {compiler.process(element.statement, **kw)}"
+
+
+def hot_queries():
+    """
+    The queries the composite indexes exist for, as (name, statement,
+    acceptable index names). Parameter values are arbitrary; only the plan
+    shape matters.
+    """
+    start = datetime.datetime(2025, 4, 1)
+    end_exclusive = datetime.datetime(2025, 5, 1)
+    return [
+        (
+            "schedule month range",
+            db.select(Shift.id)
+            .where(Shift.start_time >= start, Shift.start_time < end_exclusive)
+            .order_by(Shift.start_time, Shift.required_position),
+            ["ix_shift_start_time_position"],
+        ),
+        (
+            "schedule range delete",
+            db.delete(Shift).where(
+                Shift.start_time >= start, Shift.start_time < end_exclusive
+            ),
+            ["ix_shift_start_time_position"],
+        ),
+        (
+            "employee shift existence",
+            db.select(Shift.id).where(Shift.employee_id == 1).limit(1),
+            ["ix_shift_employee_start_time"],
+        ),
+        (
+            "performance log month probe",
+            db.select(PerformanceLog.id).where(
+                PerformanceLog.employee_id == 1,
+                PerformanceLog.log_date >= start.date(),
+                PerformanceLog.log_date < end_exclusive.date(),
+            ),
+            ["ix_performance_log_employee_log_date"],
+        ),
+        (
+            "employee performance log existence",
+            db.select(PerformanceLog.id).where(PerformanceLog.employee_id == 1).limit(1),
+            [
+                "ix_performance_log_employee_log_date",
+                # SQLite names the unique constraint's index itself.
+                "uq_performance_log_employee_month",
+                "sqlite_autoindex_performance_log_1",
+            ],
+        ),
+        (
+            "performance dashboard log page",
+            db.select(PerformanceLog.id)
+            .where(
+                PerformanceLog.log_date >= start.date(),
+                PerformanceLog.log_date < end_exclusive.date(),
+            )
+            .order_by(PerformanceLog.log_date.desc(), PerformanceLog.id.desc())
+            .limit(50),
+            ["ix_performance_log_log_date"],
+        ),
+        (
+            "employee name prefix search",
+            db.select(Employee.id)
+            .where(Employee.search_name >= "jo", Employee.search_name < "jp")
+            .order_by(Employee.search_name)
+            .limit(20),
+            ["ix_employee_search_name"],
+        ),
+    ]
+
+
+def check_query_plans():
+    """
+    EXPLAINs every hot query against the current database and reports
+    whether its plan uses one of the expected indexes. On PostgreSQL
+    sequential scans are disabled for the check, so small tables still show
+    the index the planner would pick once they grow.
+
+    Returns:
+        list: (name, plan text, index used or None) per query.
+    """
+    results = []
+    connection = db.session.connection()
+    try:
+        if connection.dialect.name == "postgresql":
+            db.session.execute(db.text("SET LOCAL enable_seqscan = off"))
+        for name, statement, indexes in hot_queries():
+            plan = "\n".join(
+                " ".join(str(value) for value in row)
+                for row in db.session.execute(explain(statement))
+            )
+            used = next((index for index in indexes if index in plan), None)
+            results.append((name, plan, used))
+    finally:
+        # EXPLAIN never runs the DELETE; roll back to drop the SET LOCAL.
+        db.session.rollback()
+    return results
@@ -1,14 +1,14 @@
+from flask import current_app
 from app import db
-from app.models import Employee, Shift
-from . import forecasting
-from .notifications import send_schedule_update_email
+from app.models import Employee
+from . import assignment, cache, forecasting, outbox, performance, shift_store
+from .notifications import build_schedule_update_emails
 import datetime
 from datetime import timedelta
-import random
-import pandas as pd
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import calendar
-import logging  
+import logging
+import time
 
 log = logging.getLogger(__name__)
 logging.getLogger("cmdstanpy").setLevel(logging.WARNING)  
@@ -54,18 +54,95 @@ HIGH_DEMAND_EXTRA = {
 
 DEMAND_THRESHOLD = 175  # Adjust as needed
 
-def create_schedule(target_date=None):
+# A shift planned by create_schedule, kept as a plain row until it is written.
+PlannedShift = namedtuple("PlannedShift", shift_store.SHIFT_COLUMNS)
+
+
+def daily_demand_for_month(forecast_df, start_of_month, days_in_month):
+    """
+    Aligns forecast demand to the days of a month in one vectorized pass.
+
+    Returns:
+        numpy.ndarray: yhat for each day of the month (index = day offset),
+                       0 for days the forecast does not cover.
+    """
+    import pandas as pd
+
+    month_days = pd.date_range(start_of_month, periods=days_in_month, freq="D")
+    demand = (
+        forecast_df.assign(ds=pd.to_datetime(forecast_df["ds"]).dt.normalize())
+        .drop_duplicates("ds")
+        .set_index("ds")["yhat"]
+        .reindex(month_days, fill_value=0.0)
+    )
+    return demand.to_numpy(dtype=float)
+
+
+def build_needs_matrix(high_demand):
+    """
+    Builds staffing needs for every day and shift type at once.
+
+    Args:
+        high_demand (numpy.ndarray): Boolean flag per day of the month.
+
+    Returns:
+        dict: {shift_type: (positions, counts)} where counts[day_offset, i]
+              is how many staff of positions[i] that shift needs that day.
+    """
+    import numpy as np
+
+    needs_matrix = {}
+    for shift_type, base in BASE_NEEDS.items():
+        extra = HIGH_DEMAND_EXTRA.get(shift_type, {})
+        positions = list(base) + [pos for pos in extra if pos not in base]
+        base_row = np.array([base.get(pos, 0) for pos in positions], dtype=int)
+        extra_row = np.array([extra.get(pos, 0) for pos in positions], dtype=int)
+        counts = base_row + np.outer(high_demand.astype(int), extra_row)
+        needs_matrix[shift_type] = (positions, counts)
+    return needs_matrix
+
+def create_schedule(target_date=None, on_phase=None, incremental=False):
     """
     Generates a position-based, multi-shift schedule for a target month
     based on forecast, creating unassigned shifts if needed, saves shifts
     to DB, and sends notifications for assigned shifts.
+
+    Args:
+        target_date (datetime.date): Any date in the month to schedule.
+        on_phase (callable): Optional callback invoked as
+            on_phase(phase, seconds, next_phase) as each of the phases
+            "forecast", "assign", "commit" (shift writes) and "notify"
+            (queueing emails and the final commit) finishes. "commit" and
+            "notify" run in one transaction and are reported after it
+            commits, so the callback never writes while it is open.
+        incremental (bool): If True, keep existing assignments where possible,
+            write only the shifts that differ from what is stored, and notify
+            only employees whose shifts changed. Otherwise the month is
+            replaced wholesale and every assigned employee is notified.
     """
     log.info("--- Starting Advanced Schedule Generation ---")
+    phase_started = time.perf_counter()
+    unreported_phases = []
+
+    def finish_phase(phase, next_phase=None, report=True):
+        nonlocal phase_started
+        now = time.perf_counter()
+        seconds = now - phase_started
+        phase_started = now
+        log.info(f"Phase '{phase}' finished in {seconds:.3f}s.")
+        unreported_phases.append((phase, seconds, next_phase))
+        if not report:
+            return
+        if on_phase:
+            for finished in unreported_phases:
+                on_phase(*finished)
+        unreported_phases.clear()
+
     employee_shifts_to_notify = defaultdict(
         list
     )  
     employees_scheduled_this_run = {}  
-    shifts_to_add_to_session = []  
+    planned_shifts = []
 
     try:
         # 1. Determine Target Month
@@ -86,10 +163,15 @@ def create_schedule(target_date=None):
         if forecast_df is None:
             log.error("Forecast generation failed. Cannot create schedule.")
             return False
-        forecast_df["ds"] = pd.to_datetime(
-            forecast_df["ds"]
-        ).dt.date  # Ensure only date part
-        log.info("Forecast generated.")
+        daily_demand = daily_demand_for_month(
+            forecast_df, start_of_month, days_in_month
+        )
+        high_demand = daily_demand >= DEMAND_THRESHOLD
+        needs_matrix = build_needs_matrix(high_demand)
+        log.info(
+            f"Forecast generated. {int(high_demand.sum())} high-demand days in {month_name_str}."
+        )
+        finish_phase("forecast", "assign")
 
         # 3. Get Employees and Group by Position
         employees = Employee.query.all()
@@ -106,48 +188,27 @@ def create_schedule(target_date=None):
         else:
             log.warning("No employees found in the database.")
 
-        # 4. Clear existing shifts for the target month only
-        log.info(f"Clearing existing shifts for {month_name_str}...")
-        num_deleted = Shift.query.filter(
-            Shift.start_time >= start_of_month,
-            Shift.start_time < end_of_month_exclusive,
-        ).delete(synchronize_session="fetch")
-        log.info(
-            f"{num_deleted} existing shifts cleared from session (pending commit)."
-        )
-
-        # 5. Loop Through Days and Shifts, Prepare Shift Objects
+        # 4. Build every staffing slot for the month
         log.info(f"Preparing new shifts for {month_name_str}...")
+        slots = []
         for day_offset in range(days_in_month):
             current_date = start_of_month + timedelta(days=day_offset)
             log.debug(f"\nProcessing Date: {current_date.strftime('%Y-%m-%d (%a)')}")
 
-            # Find forecast for the current day
-            daily_forecast = forecast_df[forecast_df["ds"] == current_date]
-            predicted_demand = (
-                daily_forecast["yhat"].iloc[0] if not daily_forecast.empty else 0
-            )
-            is_high_demand = predicted_demand >= DEMAND_THRESHOLD
+            predicted_demand = daily_demand[day_offset]
+            is_high_demand = high_demand[day_offset]
             log.debug(
                 f"  Demand (yhat): {predicted_demand:.2f} -> {'High' if is_high_demand else 'Low'} Demand"
             )
 
             # --- Generate Shifts for Each Type (Day, Eve) ---
             for shift_type in ["Day", "Eve"]:
-                log.debug(f"  Processing {shift_type} Shift Needs...")
-                needs = BASE_NEEDS.get(shift_type, {}).copy()
+                positions, counts = needs_matrix[shift_type]
                 shift_start_time = (
                     DAY_SHIFT_START if shift_type == "Day" else EVE_SHIFT_START
                 )
                 shift_end_time = DAY_SHIFT_END if shift_type == "Day" else EVE_SHIFT_END
 
-                if is_high_demand and shift_type in HIGH_DEMAND_EXTRA:
-                    for pos, count in HIGH_DEMAND_EXTRA[shift_type].items():
-                        needs[pos] = needs.get(pos, 0) + count
-                    log.debug(
-                        f"    (High demand: Added extra staff - {HIGH_DEMAND_EXTRA[shift_type]})"
-                    )
-
                 start_datetime = datetime.datetime.combine(
                     current_date, shift_start_time
                 )
@@ -158,122 +219,163 @@ def create_schedule(target_date=None):
                 )
                 end_datetime = datetime.datetime.combine(end_date, shift_end_time)
 
-                # --- Fill required positions for this shift ---
-                for position, count_needed in needs.items():
-                    if count_needed <= 0:
-                        continue
-
-                    log.debug(f"    Need {count_needed} x {position}")
-                    available_for_pos = employees_by_position.get(position, [])
-
-                    if not available_for_pos:
-                        log.warning(
-                            f"      No employees found for position: {position}. Creating {count_needed} UNASSIGNED shifts."
-                        )
-                        for i in range(count_needed):
-                            new_shift = Shift(
-                                employee_id=None,
-                                start_time=start_datetime,
-                                end_time=end_datetime,
-                                required_position=position,
+                for position, count_needed in zip(positions, counts[day_offset]):
+                    count_needed = int(count_needed)
+                    if count_needed > 0:
+                        slots.append(
+                            assignment.Slot(
+                                start_datetime,
+                                end_datetime,
+                                position,
+                                count_needed,
+                                # Peak shifts on busy days go to the best-rated staff.
+                                high_demand=bool(is_high_demand)
+                                and shift_type in HIGH_DEMAND_EXTRA,
                             )
-                            shifts_to_add_to_session.append(new_shift)
-                        continue  
-
-                    
-                    shuffled_available = random.sample(
-                        available_for_pos, len(available_for_pos)
-                    )
-                    assigned_employee_ids_this_slot_type = set()
-
-                    log.debug(
-                        f"      Available {position}s: {len(shuffled_available)}. Assigning up to: {count_needed}"
-                    )
-
-                    for i in range(count_needed): 
-                        assigned_employee = None
-                        
-                        for emp in shuffled_available:
-                        
-                        
-                            if emp.id not in assigned_employee_ids_this_slot_type:
-                                assigned_employee = emp
-                                assigned_employee_ids_this_slot_type.add(emp.id)
-                                break  # Found one
-
-                        
-                        new_shift = Shift(
-                            employee_id=assigned_employee.id
-                            if assigned_employee
-                            else None,
-                            start_time=start_datetime,
-                            end_time=end_datetime,
-                            required_position=position,
                         )
-                        shifts_to_add_to_session.append(
-                            new_shift
-                        ) 
-
-                        if assigned_employee:
-                            log.debug(
-                                f"      -> Assigned {assigned_employee.name} to {position} shift slot {i + 1}."
-                            )
-                            employees_scheduled_this_run[assigned_employee.id] = (
-                                assigned_employee
-                            )
-                            employee_shifts_to_notify[assigned_employee.id].append(
-                                new_shift
-                            ) 
-                        else:
-                            log.warning(
-                                f"      -> No further available {position} found for slot {i + 1}/{count_needed}. Created UNASSIGNED shift."
-                            )
-  
 
-        # 6. Add all prepared shifts and commit
-        if shifts_to_add_to_session:
-            log.info(
-                f"\nAttempting to add and commit {len(shifts_to_add_to_session)} new shifts for {month_name_str}..."
+        # 5. Assign staff to the whole month in one pass
+        # Current ratings come from the maintained summary table: one query,
+        # however many performance logs exist.
+        ratings = {
+            emp_id: summary.ewma_rating
+            for emp_id, summary in performance.current_ratings().items()
+        }
+        candidates = [
+            assignment.Candidate(
+                emp.id, emp.position, emp.hourly_rate, ratings.get(emp.id)
             )
-            db.session.add_all(shifts_to_add_to_session)
-            db.session.commit()
-            log.info("Shifts committed successfully.")
-
-            # 7. Send Notifications (only for assigned shifts)
-            log.info("--- Starting Email Notifications ---")
-            notification_success_count = 0
-            notification_fail_count = 0
-            for emp_id, shifts_list in employee_shifts_to_notify.items():
-                employee = employees_scheduled_this_run.get(emp_id)
-                if employee and employee.email:  
-                    log.info(
-                        f"Attempting to send notification to {employee.name} ({employee.email})..."
+            for emp in employees
+        ]
+        employees_by_id = {emp.id: emp for emp in employees}
+        incumbents = None
+        if incremental:
+            incumbents = {
+                (shift.start_time, shift.required_position, shift.employee_id)
+                for shift in shift_store.load_shift_rows(
+                    start_of_month, end_of_month_exclusive
+                )
+                if shift.employee_id is not None
+            }
+        # Shifts held in the weeks around the month count toward the rest
+        # rule and weekly hours of the month's first and last days.
+        booked = [
+            assignment.BookedShift(shift.employee_id, shift.start_time, shift.end_time)
+            for start, end in [
+                (start_of_month - timedelta(days=7), start_of_month),
+                (end_of_month_exclusive, end_of_month_exclusive + timedelta(days=7)),
+            ]
+            for shift in shift_store.load_shift_rows(start, end)
+            if shift.employee_id is not None
+        ]
+        slot_assignments = assignment.assign_slots(
+            slots,
+            candidates,
+            engine=current_app.config.get("SCHEDULE_ASSIGNMENT_ENGINE", "ilp"),
+            incumbents=incumbents,
+            booked=booked,
+        )
+
+        for slot, assigned_ids in zip(slots, slot_assignments):
+            if slot.position not in employees_by_position:
+                log.warning(
+                    f"      No employees found for position: {slot.position}. Creating {slot.count} UNASSIGNED shifts."
+                )
+            for i in range(slot.count):
+                assigned_employee = (
+                    employees_by_id[assigned_ids[i]] if i < len(assigned_ids) else None
+                )
+                new_shift = PlannedShift(
+                    employee_id=assigned_employee.id if assigned_employee else None,
+                    start_time=slot.start,
+                    end_time=slot.end,
+                    required_position=slot.position,
+                )
+                planned_shifts.append(new_shift)
+
+                if assigned_employee:
+                    log.debug(
+                        f"      -> Assigned {assigned_employee.name} to {slot.position} shift slot {i + 1}."
                     )
-                    shifts_list.sort(key=lambda x: x.start_time)
-                    if send_schedule_update_email(employee, shifts_list):
-                        notification_success_count += 1
-                    else:
-                        notification_fail_count += 1
-                elif employee:
-                    log.warning(
-                        f"Cannot send email to {employee.name}, missing email address."
+                    employees_scheduled_this_run[assigned_employee.id] = (
+                        assigned_employee
                     )
-                    notification_fail_count += 1
-                else:
+                    employee_shifts_to_notify[assigned_employee.id].append(new_shift)
+                elif slot.position in employees_by_position:
                     log.warning(
-                        f"Could not find employee object for ID {emp_id} during notification."
+                        f"      -> No further available {slot.position} found for {slot.start:%Y-%m-%d %H:%M} slot {i + 1}/{slot.count}. Created UNASSIGNED shift."
                     )
-                    notification_fail_count += 1
+
+        finish_phase("assign", "commit")
+
+        # 6. Write the month's shifts. Incremental runs only touch rows that
+        # changed; full runs range-delete and bulk insert. Nothing is committed
+        # until the notification emails are queued alongside them.
+        shift_rows = [shift._asdict() for shift in planned_shifts]
+        changed_employee_ids = None
+        previous_employee_ids = set()
+        if incremental:
+            log.info(f"\nSyncing {len(shift_rows)} planned shifts for {month_name_str}...")
+            diff = shift_store.sync_shifts(
+                start_of_month, end_of_month_exclusive, shift_rows
+            )
+            changed_employee_ids = diff.changed_employee_ids
             log.info(
-                f"--- Email Notifications Finished: {notification_success_count} succeeded, {notification_fail_count} failed ---"
+                f"Shifts written ({diff.inserted} inserted, {diff.updated} updated, "
+                f"{diff.deleted} deleted, {diff.unchanged} unchanged; "
+                f"{len(changed_employee_ids)} employees affected)."
             )
-
         else:
-           
-            db.session.commit()
             log.info(
-                f"No new shifts generated for {month_name_str}. Existing shifts for month cleared."
+                f"\nReplacing shifts for {month_name_str} with {len(shift_rows)} new shifts..."
             )
+            num_deleted, num_inserted, previous_employee_ids = shift_store.replace_shifts(
+                start_of_month, end_of_month_exclusive, shift_rows
+            )
+            log.info(f"Shifts written ({num_deleted} deleted, {num_inserted} inserted).")
+        # Reported after the commit below: on SQLite this transaction now holds
+        # the write lock, which a progress write from another connection would
+        # wait on until the busy timeout.
+        finish_phase("commit", "notify", report=False)
+
+        # 7. Queue notification emails (only for assigned shifts) in the same
+        # transaction, so they are committed together with the shifts. The
+        # `flask drain-outbox` worker delivers them.
+        log.info("--- Queueing Email Notifications ---")
+        notification_fail_count = 0
+        entries = []
+        for emp_id, shifts_list in employee_shifts_to_notify.items():
+            if changed_employee_ids is not None and emp_id not in changed_employee_ids:
+                continue
+            employee = employees_scheduled_this_run.get(emp_id)
+            if employee:
+                shifts_list.sort(key=lambda x: x.start_time)
+                entries.append((employee, shifts_list))
+            else:
+                log.warning(
+                    f"Could not find employee object for ID {emp_id} during notification."
+                )
+                notification_fail_count += 1
+        # Employees who lost every shift this month still need to hear about it.
+        removed_employee_ids = (
+            changed_employee_ids if incremental else previous_employee_ids
+        ) - employee_shifts_to_notify.keys()
+        for emp_id in removed_employee_ids:
+            entries.append((employees_by_id.get(emp_id), []))
+        messages, num_skipped = build_schedule_update_emails(
+            entries,
+            period=(start_of_month, end_of_month_exclusive - timedelta(days=1)),
+        )
+        notification_fail_count += num_skipped
+        num_queued = outbox.enqueue_messages(messages)
+
+        cache.bump_version(cache.SCHEDULE)
+        db.session.commit()
+        log.info(
+            f"Shifts committed for {month_name_str}. "
+            f"--- Email Notifications: {num_queued} queued, {notification_fail_count} could not be built ---"
+        )
+        finish_phase("notify")
 
         return True
 
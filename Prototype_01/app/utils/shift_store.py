@@ -0,0 +1,268 @@
+# app/utils/shift_store.py
+
+from app import db
+from app.models import Employee, Shift
+from collections import defaultdict, namedtuple
+from sqlalchemy import inspect
+import csv
+import io
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+SHIFT_COLUMNS = ["employee_id", "start_time", "end_time", "required_position"]
+
+
+def _copy_rows_postgres(rows):
+    """Streams rows into the shift table with COPY on the session's connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                "" if row["employee_id"] is None else row["employee_id"],
+                row["start_time"].isoformat(sep=" "),
+                row["end_time"].isoformat(sep=" "),
+                row["required_position"],
+            ]
+        )
+    buffer.seek(0)
+
+    raw_connection = db.session.connection().connection
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Shift.__tablename__} ({', '.join(SHIFT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def bulk_insert_shifts(rows):
+    """
+    Inserts shift rows (dicts keyed by SHIFT_COLUMNS) without building ORM
+    objects: COPY on PostgreSQL, a single executemany INSERT elsewhere.
+    Runs in the current transaction and does not commit.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if not rows:
+        return 0
+
+    started = time.perf_counter()
+    if db.session.get_bind().dialect.name == "postgresql":
+        _copy_rows_postgres(rows)
+        method = "COPY"
+    else:
+        db.session.execute(db.insert(Shift), rows)
+        method = "executemany"
+
+    elapsed = time.perf_counter() - started
+    log.info(
+        f"Inserted {len(rows)} shifts via {method} in {elapsed:.3f}s "
+        f"({len(rows) / max(elapsed, 1e-9):,.0f} rows/sec)."
+    )
+    return len(rows)
+
+
+def _evict_shifts(start, end_exclusive):
+    """
+    Brings the session in line after bulk writes to shifts starting in
+    [start, end_exclusive), which bypass it: Shift objects there are
+    detached, so later queries load the new rows (SQLite reuses freed ids),
+    and loaded Employee.shifts lists are expired.
+    """
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Shift):
+            start_time = inspect(obj).dict.get("start_time")
+            if start_time is None or start <= start_time < end_exclusive:
+                db.session.expunge(obj)
+        elif isinstance(obj, Employee) and "shifts" in inspect(obj).dict:
+            db.session.expire(obj, ["shifts"])
+
+
+def replace_shifts(start, end_exclusive, rows):
+    """
+    Deletes every shift starting in [start, end_exclusive) and bulk inserts
+    `rows` in its place, all in the current transaction. The caller commits.
+
+    Returns:
+        tuple: (rows deleted, rows inserted, ids of the employees who held
+               any of the deleted shifts)
+    """
+    previous_employee_ids = set(
+        db.session.scalars(
+            db.select(Shift.employee_id)
+            .where(
+                Shift.start_time >= start,
+                Shift.start_time < end_exclusive,
+                Shift.employee_id.is_not(None),
+            )
+            .distinct()
+        )
+    )
+
+    started = time.perf_counter()
+    num_deleted = Shift.query.filter(
+        Shift.start_time >= start,
+        Shift.start_time < end_exclusive,
+    ).delete(synchronize_session=False)
+    elapsed = time.perf_counter() - started
+    log.info(
+        f"Deleted {num_deleted} shifts in {elapsed:.3f}s "
+        f"({num_deleted / max(elapsed, 1e-9):,.0f} rows/sec)."
+    )
+
+    num_inserted = bulk_insert_shifts(rows)
+    _evict_shifts(start, end_exclusive)
+    return num_deleted, num_inserted, previous_employee_ids
+
+
+ShiftDiff = namedtuple(
+    "ShiftDiff", ["inserted", "updated", "deleted", "unchanged", "changed_employee_ids"]
+)
+
+DELETE_CHUNK_SIZE = 500
+
+
+def load_shift_rows(start, end_exclusive):
+    """Returns the stored shifts starting in [start, end_exclusive) as plain rows."""
+    return (
+        db.session.query(
+            Shift.id,
+            Shift.employee_id,
+            Shift.start_time,
+            Shift.end_time,
+            Shift.required_position,
+        )
+        .filter(Shift.start_time >= start, Shift.start_time < end_exclusive)
+        .order_by(Shift.start_time, Shift.required_position, Shift.id)
+        .all()
+    )
+
+
+def sync_shifts(start, end_exclusive, rows):
+    """
+    Brings the stored shifts in [start, end_exclusive) in line with `rows`
+    using only the INSERT/UPDATE/DELETE statements that are actually needed.
+
+    Shifts are matched per (start_time, required_position) slot group: stored
+    rows that already hold a desired (employee_id, end_time) are left alone,
+    leftover stored rows are updated to leftover desired ones, and any
+    surplus on either side is inserted or deleted. Runs in the current
+    transaction; the caller commits.
+
+    Returns:
+        ShiftDiff: Counts per operation plus the ids of employees whose
+                   shifts changed (the only ones who need notifying),
+                   including those whose shifts were deleted or unassigned.
+    """
+    started = time.perf_counter()
+
+    existing_groups = defaultdict(list)
+    for shift in load_shift_rows(start, end_exclusive):
+        existing_groups[(shift.start_time, shift.required_position)].append(shift)
+
+    desired_groups = defaultdict(list)
+    for row in rows:
+        desired_groups[(row["start_time"], row["required_position"])].append(row)
+
+    to_insert, to_update, to_delete = [], [], []
+    changed_employee_ids = set()
+    unchanged = 0
+
+    for key in existing_groups.keys() | desired_groups.keys():
+        existing = list(existing_groups.get(key, []))
+        pending = []
+        for row in desired_groups.get(key, []):
+            match = next(
+                (
+                    shift
+                    for shift in existing
+                    if shift.employee_id == row["employee_id"]
+                    and shift.end_time == row["end_time"]
+                ),
+                None,
+            )
+            if match is not None:
+                existing.remove(match)
+                unchanged += 1
+            else:
+                pending.append(row)
+
+        for shift, row in zip(existing, pending):
+            to_update.append(
+                {"id": shift.id, "employee_id": row["employee_id"], "end_time": row["end_time"]}
+            )
+            changed_employee_ids.update([shift.employee_id, row["employee_id"]])
+        for shift in existing[len(pending) :]:
+            to_delete.append(shift.id)
+            changed_employee_ids.add(shift.employee_id)
+        for row in pending[len(existing) :]:
+            to_insert.append(row)
+            changed_employee_ids.add(row["employee_id"])
+
+    for i in range(0, len(to_delete), DELETE_CHUNK_SIZE):
+        Shift.query.filter(Shift.id.in_(to_delete[i : i + DELETE_CHUNK_SIZE])).delete(
+            synchronize_session=False
+        )
+    if to_update:
+        db.session.execute(db.update(Shift), to_update)
+    bulk_insert_shifts(to_insert)
+    _evict_shifts(start, end_exclusive)
+
+    changed_employee_ids.discard(None)
+    log.info(
+        f"Synced shifts in {time.perf_counter() - started:.3f}s: "
+        f"{len(to_insert)} inserted, {len(to_update)} updated, "
+        f"{len(to_delete)} deleted, {unchanged} unchanged."
+    )
+    return ShiftDiff(
+        len(to_insert), len(to_update), len(to_delete), unchanged, changed_employee_ids
+    )
+
+
+def shift_page(start, end_exclusive, after=None, limit=500, position=None, employee_id=None):
+    """
+    Returns up to `limit` shifts starting in [start, end_exclusive) as flat
+    rows ordered by (start_time, id), optionally filtered by required
+    position and employee.
+
+    Pagination is keyset-based: `after` is the (start_time, id) of the last
+    row of the previous page, so every page is an index range scan no matter
+    how deep into the range it is.
+    """
+    query = (
+        db.session.query(
+            Shift.id,
+            Shift.start_time,
+            Shift.end_time,
+            Shift.required_position,
+            Shift.employee_id,
+            Employee.name.label("employee_name"),
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .filter(Shift.start_time >= start, Shift.start_time < end_exclusive)
+    )
+    if position:
+        query = query.filter(Shift.required_position == position)
+    if employee_id is not None:
+        query = query.filter(Shift.employee_id == employee_id)
+    if after is not None:
+        query = query.filter(db.tuple_(Shift.start_time, Shift.id) > after)
+    return query.order_by(Shift.start_time, Shift.id).limit(limit).all()
+
+
+def iter_shift_rows(start, end_exclusive, chunk_size=1000, **filters):
+    """
+    Yields every matching shift in [start, end_exclusive) in (start_time, id)
+    order, fetching `chunk_size` rows per keyset page so memory stays flat
+    for ranges of any size.
+    """
+    after = None
+    while True:
+        rows = shift_page(start, end_exclusive, after=after, limit=chunk_size, **filters)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after = (rows[-1].start_time, rows[-1].id)
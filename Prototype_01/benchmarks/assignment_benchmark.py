@@ -0,0 +1,133 @@
+"""
+Compares the shift assignment engines against the original random fill loop.
+
+Run from the Prototype_01 directory:
+
+    python -m benchmarks.assignment_benchmark --employees 300 --positions 30
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+import argparse
+import random
+import timeit
+
+from app.utils import assignment
+
+
+def build_month(num_employees, num_positions, seed):
+    """Builds synthetic slots and candidates for a 30-day month."""
+    rng = random.Random(seed)
+    positions = [f"Position {i + 1}" for i in range(num_positions)]
+    candidates = [
+        assignment.Candidate(i + 1, positions[i % num_positions], rng.uniform(15, 30))
+        for i in range(num_employees)
+    ]
+    staff_per_position = max(1, num_employees // num_positions)
+
+    slots = []
+    start_of_month = date(2025, 4, 1)
+    for day_offset in range(30):
+        current_date = start_of_month + timedelta(days=day_offset)
+        day_start = datetime.combine(current_date, time(10, 0))
+        eve_start = datetime.combine(current_date, time(16, 0))
+        for position in positions:
+            day_need = max(1, staff_per_position // 5)
+            eve_need = max(1, staff_per_position // 3) + rng.randint(0, 1)
+            slots.append(
+                assignment.Slot(day_start, day_start + timedelta(hours=8), position, day_need)
+            )
+            slots.append(
+                assignment.Slot(eve_start, eve_start + timedelta(hours=8), position, eve_need)
+            )
+    return slots, candidates
+
+
+def legacy_random_fill(slots, candidates):
+    """The original create_schedule loop: shuffle the position, take the first free."""
+    by_position = defaultdict(list)
+    for candidate in candidates:
+        by_position[candidate.position].append(candidate)
+
+    assignments = []
+    for slot in slots:
+        available = by_position.get(slot.position, [])
+        shuffled = random.sample(available, len(available))
+        chosen = []
+        for _ in range(slot.count):
+            for candidate in shuffled:
+                if candidate.id not in chosen:
+                    chosen.append(candidate.id)
+                    break
+        assignments.append(chosen)
+    return assignments
+
+
+def evaluate(slots, candidates, assignments):
+    """Returns (filled, cost, rest/overlap violations, weekly-hour violations)."""
+    rates = {c.id: c.hourly_rate for c in candidates}
+    worked = defaultdict(list)
+    filled = 0
+    cost = 0.0
+    for slot, ids in zip(slots, assignments):
+        for emp_id in ids:
+            filled += 1
+            cost += assignment._hours(slot) * rates[emp_id]
+            worked[emp_id].append(slot)
+
+    rest_violations = 0
+    hour_violations = 0
+    for emp_slots in worked.values():
+        emp_slots.sort(key=lambda s: s.start)
+        for first, second in zip(emp_slots, emp_slots[1:]):
+            if assignment._conflicts(first, second):
+                rest_violations += 1
+        weekly = defaultdict(float)
+        for slot in emp_slots:
+            weekly[assignment._week_start(slot)] += assignment._hours(slot)
+        hour_violations += sum(
+            1 for hours in weekly.values() if hours > assignment.MAX_WEEKLY_HOURS
+        )
+    return filled, cost, rest_violations, hour_violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shift assignment engines.")
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--positions", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    slots, candidates = build_month(args.employees, args.positions, args.seed)
+    needed = sum(slot.count for slot in slots)
+    print(
+        f"{args.employees} employees, {args.positions} positions, "
+        f"{len(slots)} slots, {needed} positions to fill\n"
+    )
+    print(
+        f"{'engine':<10}{'seconds':>10}{'filled':>12}{'cost ($)':>14}"
+        f"{'rest viol.':>12}{'hour viol.':>12}"
+    )
+
+    engines = [
+        ("legacy", legacy_random_fill),
+        ("greedy", assignment.assign_greedy),
+        ("ilp", assignment.assign_ilp),
+    ]
+    for name, engine in engines:
+        result = {}
+        seconds = timeit.timeit(
+            lambda: result.update(value=engine(slots, candidates)), number=1
+        )
+        if result["value"] is None:
+            print(f"{name:<10}{'unavailable':>10}")
+            continue
+        filled, cost, rest, hours = evaluate(slots, candidates, result["value"])
+        print(
+            f"{name:<10}{seconds:>10.3f}{f'{filled}/{needed}':>12}{cost:>14,.0f}"
+            f"{rest:>12}{hours:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Times rendering a full run of schedule_update emails.
+
+Run from the Prototype_01 directory:
+
+    python -m benchmarks.email_render_benchmark --emails 1000
+"""
+
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+import argparse
+import timeit
+
+from app import create_app
+from app.utils.email_rendering import ScheduleEmailRenderer
+from config import Config
+
+FakeEmployee = namedtuple("FakeEmployee", ["id", "name", "email"])
+FakeShift = namedtuple("FakeShift", ["start_time", "end_time"])
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+
+# The email body as it was rendered before ScheduleEmailRenderer: one
+# render_template call per employee, formatting every shift inline.
+LEGACY_TEMPLATE = """
+<p>Hi {{ employee.name }},</p>
+<ul>
+{% for shift in shifts %}
+    <li>
+        <strong>{{ shift.start_time.strftime('%a, %B %d, %Y') }}:</strong>
+        {{ shift.start_time.strftime('%I:%M %p') }} - {{ shift.end_time.strftime('%I:%M %p') }}
+    </li>
+{% endfor %}
+</ul>
+"""
+
+
+def build_entries(num_emails, shifts_per_employee):
+    start_of_month = date(2025, 4, 1)
+    entries = []
+    for i in range(num_emails):
+        shifts = []
+        for n in range(shifts_per_employee):
+            day = start_of_month + timedelta(days=(i + n * 2) % 30)
+            start = datetime.combine(day, time(10, 0) if (i + n) % 2 else time(16, 0))
+            shifts.append(FakeShift(start, start + timedelta(hours=8)))
+        shifts.sort(key=lambda s: s.start_time)
+        entries.append(
+            (FakeEmployee(i, f"Employee {i}", f"employee{i}@example.com"), shifts)
+        )
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schedule email rendering.")
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--shifts", type=int, default=20, help="Shifts per employee.")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    entries = build_entries(args.emails, args.shifts)
+
+    with app.test_request_context():
+
+        legacy_template = app.jinja_env.from_string(LEGACY_TEMPLATE)
+
+        def per_email_render_template():
+            for employee, shifts in entries:
+                min(s.start_time.date() for s in shifts)
+                max(s.start_time.date() for s in shifts)
+                context = {"employee": employee, "shifts": shifts}
+                app.update_template_context(context)
+                legacy_template.render(context)
+
+        def single_pass():
+            ScheduleEmailRenderer().render_all(entries)
+
+        def thread_pool():
+            ScheduleEmailRenderer().render_all(entries, workers=args.workers)
+
+        print(f"Rendering {args.emails} emails x {args.shifts} shifts (HTML + text)\n")
+        for name, fn in [
+            ("Legacy per-email render (HTML only)", per_email_render_template),
+            ("ScheduleEmailRenderer single pass", single_pass),
+            (f"ScheduleEmailRenderer, {args.workers} threads", thread_pool),
+        ]:
+            seconds = min(timeit.repeat(fn, number=1, repeat=3))
+            print(f"{name:<52}{seconds:>8.3f}s  ({args.emails / seconds:,.0f} emails/sec)")
+
+
+if __name__ == "__main__":
+    main()
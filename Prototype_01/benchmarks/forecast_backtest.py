@@ -0,0 +1,86 @@
+"""
+Rolling-origin backtest of the forecasting engines: accuracy and runtime.
+
+For each cutoff, every engine is fitted on the history up to that day and
+asked for the next --horizon days, which are compared with what actually
+happened. Models are fitted directly, bypassing the model cache.
+
+Run from the Prototype_01 directory:
+
+    python -m benchmarks.forecast_backtest --horizon 7 --min-train 21
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils import forecast_engines
+from app.utils.forecasting import ENGINE_PARAMS
+
+
+def backtest(df, engine, horizon, min_train, step):
+    """Returns (errors, actuals, interval hits) over all folds and the seconds per fold."""
+    errors, actuals, seconds, covered = [], [], [], []
+    for cutoff in range(min_train, len(df) - horizon + 1, step):
+        train = df.iloc[:cutoff]
+        actual = df["y"].to_numpy(dtype=float)[cutoff : cutoff + horizon]
+
+        started = time.perf_counter()
+        model = engine.fit(train)
+        forecast = engine.predict(model, horizon).tail(horizon)
+        seconds.append(time.perf_counter() - started)
+
+        errors.append(forecast["yhat"].to_numpy() - actual)
+        actuals.append(actual)
+        covered.append(
+            (actual >= forecast["yhat_lower"].to_numpy())
+            & (actual <= forecast["yhat_upper"].to_numpy())
+        )
+    return (
+        np.concatenate(errors),
+        np.concatenate(actuals),
+        np.concatenate(covered),
+        np.array(seconds),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest forecasting engines.")
+    parser.add_argument("--data", default="data/historical_sales.csv")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--min-train", type=int, default=21)
+    parser.add_argument("--step", type=int, default=1)
+    parser.add_argument(
+        "--engines", default=",".join(forecast_engines.ENGINES), help="Comma-separated."
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    df["ds"] = pd.to_datetime(df["ds"])
+    df = df.sort_values("ds").reset_index(drop=True)
+    folds = len(range(args.min_train, len(df) - args.horizon + 1, args.step))
+    if folds == 0:
+        parser.error("Not enough history for one fold; lower --min-train or --horizon.")
+
+    print(f"{len(df)} days of history, {folds} folds, {args.horizon}-day horizon\n")
+    print(
+        f"{'engine':<16}{'MAE':>8}{'RMSE':>8}{'MAPE %':>8}{'80% cov.':>10}"
+        f"{'ms/fit':>10}{'total s':>10}"
+    )
+
+    for name in args.engines.split(","):
+        engine = forecast_engines.ENGINES[name](ENGINE_PARAMS.get(name, {}))
+        errors, actuals, covered, seconds = backtest(
+            df, engine, args.horizon, args.min_train, args.step
+        )
+        print(
+            f"{name:<16}{np.abs(errors).mean():>8.2f}{np.sqrt((errors**2).mean()):>8.2f}"
+            f"{100 * np.abs(errors / actuals).mean():>8.2f}{100 * covered.mean():>9.0f}%"
+            f"{1000 * seconds.mean():>10.1f}{seconds.sum():>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
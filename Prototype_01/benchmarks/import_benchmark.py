@@ -0,0 +1,85 @@
+"""
+Measures web worker cold start: import time, the slowest imports and peak
+RSS for building the app, and checks that the forecasting stack is not
+loaded until a forecast is actually generated.
+
+Run from the Prototype_01 directory:
+
+    python -m benchmarks.import_benchmark
+
+Exits non-zero if pandas, Prophet or cmdstanpy are imported by
+create_app() or by importing the routes.
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Modules a worker serving only the employee/performance pages never needs.
+HEAVY_MODULES = ["pandas", "prophet", "cmdstanpy", "matplotlib"]
+
+CHILD_SCRIPT = f"""
+import resource, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+elapsed = time.perf_counter() - started
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(f"RESULT {{elapsed:.3f}} {{rss_mb:.1f}} {{','.join(loaded)}}")
+"""
+
+
+def parse_importtime(stderr, top, depth):
+    """Returns the `top` slowest (cumulative microseconds, module) imports
+    nested at most `depth` levels deep."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        # -X importtime indents nested imports by two spaces per level.
+        level = (len(module) - len(module.lstrip(" ")) + 1) // 2
+        if level <= depth:
+            entries.append((int(cumulative), module.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and memory.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2, help="Import nesting levels to list.")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        line = next(l for l in result.stdout.splitlines() if l.startswith("RESULT"))
+        _, elapsed, rss_mb, *loaded = line.split(" ")
+        runs.append((float(elapsed), float(rss_mb), [m for m in loaded[0].split(",") if m]))
+        stderr = result.stderr
+
+    best = min(runs)
+    print(
+        f"create_app(): best {best[0]:.3f}s of {args.runs} runs "
+        f"(under -X importtime), peak RSS {best[1]:.1f} MB\n"
+    )
+    print("Slowest imports (cumulative):")
+    for cumulative, module in parse_importtime(stderr, args.top, args.depth):
+        print(f"  {cumulative / 1000:>9.1f} ms  {module}")
+
+    loaded = best[2]
+    if loaded:
+        print(f"\nFAIL: loaded at startup: {', '.join(loaded)}")
+        sys.exit(1)
+    print(f"\nOK: none of {', '.join(HEAVY_MODULES)} loaded at startup.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,62 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, ".env"))
 
 
+def engine_options(database_uri):
+    """
+    SQLAlchemy engine options tuned for the backend in `database_uri`.
+
+    PostgreSQL: each gunicorn worker (WEB_CONCURRENCY) gets an equal share of
+    DB_MAX_CONNECTIONS, connections are pinged before use and recycled, and
+    every statement runs under DB_STATEMENT_TIMEOUT_MS.
+
+    SQLite: connections wait up to SQLITE_BUSY_TIMEOUT seconds for a lock
+    instead of failing with "database is locked"; WAL mode and
+    synchronous=NORMAL are set per connection in app/__init__.py.
+    """
+    if database_uri.startswith("sqlite"):
+        return {
+            "connect_args": {
+                "timeout": float(os.environ.get("SQLITE_BUSY_TIMEOUT") or 15),
+                # Schedule jobs and the request that queued them share the file.
+                "check_same_thread": False,
+            }
+        }
+
+    if database_uri.startswith(("postgres", "postgresql")):
+        workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+        max_connections = int(os.environ.get("DB_MAX_CONNECTIONS") or 20)
+        statement_timeout = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS") or 30000)
+        return {
+            "pool_size": int(
+                os.environ.get("DB_POOL_SIZE") or max(2, max_connections // workers - 2)
+            ),
+            "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW") or 2),
+            "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT") or 10),
+            "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE") or 1800),
+            "pool_pre_ping": True,
+            "connect_args": {"options": f"-c statement_timeout={statement_timeout}"},
+        }
+
+    return {"pool_pre_ping": True}
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY") or "you-will-never-guess"
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DATABASE_URL"
     ) or "sqlite:///" + os.path.join(basedir, "instance", "database.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    SCHEDULE_JOB_WORKERS = int(os.environ.get("SCHEDULE_JOB_WORKERS") or 1)
+    # Queued/running jobs without a heartbeat for this long are marked failed.
+    # No heartbeat is sent while a job writes its month, so this must also
+    # outlast that one transaction (shift writes plus queued emails).
+    SCHEDULE_JOB_LEASE_SECONDS = int(os.environ.get("SCHEDULE_JOB_LEASE_SECONDS") or 300)
+    SCHEDULE_ASSIGNMENT_ENGINE = os.environ.get("SCHEDULE_ASSIGNMENT_ENGINE") or "ilp"
+    FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS") or 2)
+    # "prophet", or "holt_winters" / "seasonal_naive" for the NumPy engines.
+    FORECAST_ENGINE = os.environ.get("FORECAST_ENGINE") or "prophet"
 
     MAIL_SERVER = os.environ.get("MAIL_SERVER")
     MAIL_PORT = int(os.environ.get("MAIL_PORT") or 587)
@@ -23,4 +73,18 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get(
         "MAIL_DEFAULT_SENDER"
     )  # This will be your verified email
+    EMAIL_RENDER_WORKERS = int(os.environ.get("EMAIL_RENDER_WORKERS") or 0)
+    MAIL_BATCH_CONCURRENCY = int(os.environ.get("MAIL_BATCH_CONCURRENCY") or 2)
+    MAIL_SEND_RETRIES = int(os.environ.get("MAIL_SEND_RETRIES") or 2)
+    MAIL_RETRY_BACKOFF = float(os.environ.get("MAIL_RETRY_BACKOFF") or 1.0)
+
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE") or 100)
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS") or 5)
+    OUTBOX_RETRY_BACKOFF = float(os.environ.get("OUTBOX_RETRY_BACKOFF") or 30)
+    OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS") or 300)
+
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ["true", "1", "t"]
+    # Requests slower than this are logged with their SQL statements.
+    SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS") or 1.0)
+
     ADMINS = [os.environ.get("ADMIN_EMAIL") or "some-default-admin@example.com"]
@@ -1,8 +1,9 @@
-from app import create_app, db
+from app import create_app
+from app.utils.db_versioning import upgrade_database
 
 app = create_app()
 
 with app.app_context():
-    print("Attempting db.create_all() via script inside container...")
-    db.create_all()
-    print("db.create_all() finished via script.")
+    # Also adopts databases built by the old db.create_all() version of
+    # this script; see upgrade_database().
+    upgrade_database()
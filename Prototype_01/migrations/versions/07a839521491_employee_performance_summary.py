@@ -0,0 +1,72 @@
+"""employee performance summary
+
+Revision ID: 07a839521491
+Revises: 7830d6fac5df
+Create Date: 2026-10-18 13:43:24.075836
+
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '07a839521491'
+down_revision = '7830d6fac5df'
+branch_labels = None
+depends_on = None
+
+# Matches app.utils.performance.EWMA_ALPHA at the time of this revision.
+EWMA_ALPHA = 0.3
+
+
+def upgrade():
+    summary = op.create_table('employee_performance_summary',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('mean_rating', sa.Float(), nullable=True),
+    sa.Column('ewma_rating', sa.Float(), nullable=True),
+    sa.Column('last_rating', sa.Float(), nullable=True),
+    sa.Column('last_log_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employee.id'], ),
+    sa.PrimaryKeyConstraint('employee_id')
+    )
+
+    # Backfill from existing logs; `flask rebuild-performance-summaries` does
+    # the same from the application afterwards.
+    performance_log = sa.table('performance_log',
+        sa.column('id', sa.Integer()),
+        sa.column('employee_id', sa.Integer()),
+        sa.column('log_date', sa.Date()),
+        sa.column('rating', sa.Float()),
+    )
+    logs = op.get_bind().execute(
+        sa.select(performance_log.c.employee_id, performance_log.c.log_date, performance_log.c.rating)
+        .order_by(performance_log.c.employee_id, performance_log.c.log_date, performance_log.c.id)
+    )
+    rows = []
+    for employee_id, employee_logs in groupby(logs, key=lambda log: log.employee_id):
+        row = {'employee_id': employee_id, 'log_count': 0, 'rating_count': 0,
+               'mean_rating': None, 'ewma_rating': None, 'last_rating': None,
+               'last_log_date': None, 'updated_at': None}
+        for log in employee_logs:
+            row['log_count'] += 1
+            row['last_log_date'] = log.log_date
+            if log.rating is None:
+                continue
+            row['rating_count'] += 1
+            mean = row['mean_rating'] or 0.0
+            row['mean_rating'] = mean + (log.rating - mean) / row['rating_count']
+            ewma = row['ewma_rating']
+            row['ewma_rating'] = log.rating if ewma is None else EWMA_ALPHA * log.rating + (1 - EWMA_ALPHA) * ewma
+            row['last_rating'] = log.rating
+        rows.append(row)
+    if rows:
+        op.bulk_insert(summary, rows)
+
+
+def downgrade():
+    op.drop_table('employee_performance_summary')
@@ -0,0 +1,93 @@
+"""forecast, schedule job, email outbox and cache version tables
+
+Revision ID: 5e2b7c9d1f48
+Revises: 294f303fbfcb
+Create Date: 2026-10-18 15:48:51.902364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b7c9d1f48'
+down_revision = '294f303fbfcb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases stamped at the baseline may already have some of these from
+    # db.create_all(); only the missing ones are created.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'cache_version' not in existing:
+        op.create_table('cache_version',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+    if 'email_outbox' not in existing:
+        op.create_table('email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sender', sa.String(length=120), nullable=True),
+        sa.Column('recipient', sa.String(length=120), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('html_body', sa.Text(), nullable=True),
+        sa.Column('text_body', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+            batch_op.create_index('ix_email_outbox_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+    if 'forecast' not in existing:
+        op.create_table('forecast',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.String(length=64), nullable=False),
+        sa.Column('ds', sa.Date(), nullable=False),
+        sa.Column('yhat', sa.Float(), nullable=False),
+        sa.Column('yhat_lower', sa.Float(), nullable=True),
+        sa.Column('yhat_upper', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('version', 'ds', name='uq_forecast_version_ds')
+        )
+
+    if 'schedule_job' not in existing:
+        op.create_table('schedule_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('target_month', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('current_phase', sa.String(length=32), nullable=True),
+        sa.Column('phase_timings', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('schedule_job', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_schedule_job_status'), ['status'], unique=False)
+            batch_op.create_index(batch_op.f('ix_schedule_job_target_month'), ['target_month'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('schedule_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_schedule_job_target_month'))
+        batch_op.drop_index(batch_op.f('ix_schedule_job_status'))
+
+    op.drop_table('schedule_job')
+    op.drop_table('forecast')
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_outbox_status_next_attempt')
+
+    op.drop_table('email_outbox')
+    op.drop_table('cache_version')
@@ -0,0 +1,65 @@
+"""composite shift and performance log indexes
+
+Revision ID: 7830d6fac5df
+Revises: 5e2b7c9d1f48
+Create Date: 2026-10-18 13:27:27.699145
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7830d6fac5df'
+down_revision = '5e2b7c9d1f48'
+branch_labels = None
+depends_on = None
+
+
+def _index_names(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # Databases built by older create_all() scripts lack some of the
+    # single-column indexes replaced below, so only existing ones are dropped.
+    performance_log_indexes = _index_names('performance_log')
+    shift_indexes = _index_names('shift')
+
+    # log_month is added nullable, backfilled from log_date, then tightened.
+    with op.batch_alter_table('performance_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('log_month', sa.Date(), nullable=True))
+
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE performance_log SET log_month = date(log_date, 'start of month')")
+    else:
+        op.execute("UPDATE performance_log SET log_month = CAST(date_trunc('month', log_date) AS DATE)")
+
+    with op.batch_alter_table('performance_log', schema=None) as batch_op:
+        batch_op.alter_column('log_month', existing_type=sa.Date(), nullable=False)
+        if 'ix_performance_log_employee_id' in performance_log_indexes:
+            batch_op.drop_index(batch_op.f('ix_performance_log_employee_id'))
+        batch_op.create_index('ix_performance_log_employee_log_date', ['employee_id', 'log_date'], unique=False)
+        batch_op.create_unique_constraint('uq_performance_log_employee_month', ['employee_id', 'log_month'])
+
+    with op.batch_alter_table('shift', schema=None) as batch_op:
+        for index in ['ix_shift_employee_id', 'ix_shift_required_position', 'ix_shift_start_time']:
+            if index in shift_indexes:
+                batch_op.drop_index(index)
+        batch_op.create_index('ix_shift_employee_start_time', ['employee_id', 'start_time'], unique=False)
+        batch_op.create_index('ix_shift_start_time_position', ['start_time', 'required_position'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('shift', schema=None) as batch_op:
+        batch_op.drop_index('ix_shift_start_time_position')
+        batch_op.drop_index('ix_shift_employee_start_time')
+        batch_op.create_index(batch_op.f('ix_shift_start_time'), ['start_time'], unique=False)
+        batch_op.create_index(batch_op.f('ix_shift_required_position'), ['required_position'], unique=False)
+        batch_op.create_index(batch_op.f('ix_shift_employee_id'), ['employee_id'], unique=False)
+
+    with op.batch_alter_table('performance_log', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_performance_log_employee_month', type_='unique')
+        batch_op.drop_index('ix_performance_log_employee_log_date')
+        batch_op.create_index(batch_op.f('ix_performance_log_employee_id'), ['employee_id'], unique=False)
+        batch_op.drop_column('log_month')
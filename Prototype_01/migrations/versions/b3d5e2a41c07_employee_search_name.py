@@ -0,0 +1,51 @@
+"""employee search name
+
+Revision ID: b3d5e2a41c07
+Revises: 07a839521491
+Create Date: 2026-10-18 14:02:11.402518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d5e2a41c07'
+down_revision = '07a839521491'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('employee', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_name', sa.String(length=128), nullable=True))
+
+    # SQL lower() only folds ASCII on SQLite, so the key is computed in Python,
+    # as Employee._set_search_name does.
+    employee = sa.table('employee',
+        sa.column('id', sa.Integer()),
+        sa.column('name', sa.String()),
+        sa.column('search_name', sa.String()),
+    )
+    connection = op.get_bind()
+    rows = [
+        {'employee_id': id_, 'search_name': name.casefold()}
+        for id_, name in connection.execute(sa.select(employee.c.id, employee.c.name))
+        if name
+    ]
+    if rows:
+        connection.execute(
+            employee.update()
+            .where(employee.c.id == sa.bindparam('employee_id'))
+            .values(search_name=sa.bindparam('search_name')),
+            rows,
+        )
+
+    with op.batch_alter_table('employee', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_employee_search_name'), ['search_name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('employee', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_employee_search_name'))
+        batch_op.drop_column('search_name')
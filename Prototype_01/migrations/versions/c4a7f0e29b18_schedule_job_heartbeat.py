@@ -0,0 +1,42 @@
+"""schedule job heartbeat and active month index
+
+Revision ID: c4a7f0e29b18
+Revises: b3d5e2a41c07
+Create Date: 2026-10-18 15:10:42.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7f0e29b18'
+down_revision = 'b3d5e2a41c07'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade():
+    with op.batch_alter_table('schedule_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+    # Jobs still active here belong to processes stopped for the upgrade;
+    # failing them also clears any duplicates the unique index would reject.
+    op.execute(
+        "UPDATE schedule_job SET status = 'failed', current_phase = NULL, "
+        "error = 'Abandoned: the process running this job stopped before it finished.' "
+        "WHERE status IN ('queued', 'running')"
+    )
+    op.execute("UPDATE schedule_job SET heartbeat_at = COALESCE(finished_at, started_at, created_at)")
+
+    op.create_index('uq_schedule_job_active_month', 'schedule_job', ['target_month'], unique=True,
+                    sqlite_where=ACTIVE, postgresql_where=ACTIVE)
+
+
+def downgrade():
+    op.drop_index('uq_schedule_job_active_month', table_name='schedule_job',
+                  sqlite_where=ACTIVE, postgresql_where=ACTIVE)
+    with op.batch_alter_table('schedule_job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,35 @@
+"""seed cache versions
+
+Revision ID: d81f3b6c0a95
+Revises: c4a7f0e29b18
+Create Date: 2026-10-18 15:32:08.640117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3b6c0a95'
+down_revision = 'c4a7f0e29b18'
+branch_labels = None
+depends_on = None
+
+# Matches app.utils.cache.SCHEDULE and EMPLOYEES at the time of this revision.
+NAMES = ['schedule', 'employees']
+
+
+def upgrade():
+    # Counters that already exist keep their value.
+    for name in NAMES:
+        op.execute(
+            sa.text(
+                "INSERT INTO cache_version (name, value) SELECT :name, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM cache_version WHERE name = :name)"
+            ).bindparams(name=name)
+        )
+
+
+def downgrade():
+    # The rows are harmless to keep; bump_version recreates them anyway.
+    pass
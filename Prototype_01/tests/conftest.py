@@ -0,0 +1,51 @@
+import pytest
+from app import create_app, db
+from config import Config, basedir, engine_options
+import os
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    Returns a factory for apps on a fresh SQLite file (or `database`, or the
+    URL `database_uri`), migrated to head unless `migrated` is False. Other
+    keyword arguments override config values before the app is built.
+    """
+    from flask_migrate import upgrade
+
+    apps = []
+
+    def factory(database=None, migrated=True, database_uri=None, **overrides):
+        if database_uri is None:
+            database = database or tmp_path / f"test{len(apps)}.db"
+            database_uri = "sqlite:///" + str(database)
+        config = type(
+            "TestConfig",
+            (Config,),
+            {
+                "TESTING": True,
+                "WTF_CSRF_ENABLED": False,
+                "SQLALCHEMY_DATABASE_URI": database_uri,
+                "SQLALCHEMY_ENGINE_OPTIONS": engine_options(database_uri),
+                "MAIL_DEFAULT_SENDER": "scheduler@example.com",
+                **overrides,
+            },
+        )
+        app = create_app(config)
+        if migrated:
+            with app.app_context():
+                upgrade(directory=os.path.join(basedir, "migrations"))
+        apps.append(app)
+        return app
+
+    yield factory
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
@@ -0,0 +1,54 @@
+from app import db
+from app.models import Shift
+import datetime
+import pytest
+
+
+@pytest.fixture
+def shift_ids(app):
+    """Eight shifts, five of them starting at the same time, in (start, id) order."""
+    same_start = datetime.datetime(2025, 3, 3, 16)
+    starts = [datetime.datetime(2025, 3, 3, 10)] + [same_start] * 5
+    starts += [datetime.datetime(2025, 3, 4, 10), datetime.datetime(2025, 3, 4, 16)]
+    with app.app_context():
+        shifts = [
+            Shift(
+                start_time=start,
+                end_time=start + datetime.timedelta(hours=8),
+                required_position="Cook",
+            )
+            for start in starts
+        ]
+        db.session.add_all(shifts)
+        db.session.commit()
+        return [shift.id for shift in sorted(shifts, key=lambda s: (s.start_time, s.id))]
+
+
+def test_shift_pages_cross_equal_start_times(app, shift_ids):
+    client = app.test_client()
+    params = {"start": "2025-03-01", "end": "2025-04-01", "limit": 3}
+    seen, pages = [], 0
+    while True:
+        response = client.get("/api/shifts", query_string=params)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [shift["id"] for shift in body["shifts"]]
+        pages += 1
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    assert seen == shift_ids
+    assert pages == 3
+
+
+@pytest.mark.parametrize(
+    "cursor", ["garbage", "2025-03-03T16:00:00_x", "_12", "2025-13-01T00:00:00_1"]
+)
+def test_malformed_cursor_is_rejected(app, cursor):
+    response = app.test_client().get(
+        "/api/shifts",
+        query_string={"start": "2025-03-01", "end": "2025-04-01", "cursor": cursor},
+    )
+    assert response.status_code == 400
+    assert "cursor" in response.get_json()["error"]
@@ -0,0 +1,82 @@
+from app.utils import assignment
+from app.utils.assignment import BookedShift, Candidate, Slot
+import datetime
+import pytest
+
+MONDAY = datetime.date(2025, 3, 3)
+ENGINES = [assignment.assign_greedy, assignment.assign_ilp]
+
+
+def _at(day_offset, hour):
+    return datetime.datetime.combine(MONDAY, datetime.time()) + datetime.timedelta(
+        days=day_offset, hours=hour
+    )
+
+
+def day_slot(day_offset, position="Cook", count=1, high_demand=False):
+    return Slot(_at(day_offset, 10), _at(day_offset, 18), position, count, high_demand)
+
+
+def eve_slot(day_offset, position="Cook", count=1):
+    return Slot(_at(day_offset, 16), _at(day_offset, 24), position, count)
+
+
+def _cost(slots, candidates, assignments):
+    """The labour cost plus unfilled penalty both engines try to minimise."""
+    rates = {candidate.id: candidate.hourly_rate or 0.0 for candidate in candidates}
+    cost = 0.0
+    for slot, ids in zip(slots, assignments):
+        cost += sum(assignment._hours(slot) * rates[emp_id] for emp_id in ids)
+        cost += assignment.UNFILLED_PENALTY * (slot.count - len(ids))
+    return cost
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rest_rule_blocks_eve_then_next_day(engine):
+    slots = [eve_slot(0), day_slot(1)]
+    assert engine(slots, [Candidate(1, "Cook", 20.0)]) in ([[1], []], [[], [1]])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_weekly_hours_are_capped(engine):
+    slots = [day_slot(day) for day in range(6)]
+    assignments = engine(slots, [Candidate(1, "Cook", 20.0)])
+    assert sum(len(ids) for ids in assignments) == assignment.MAX_WEEKLY_HOURS // 8
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_unfillable_slots_stay_unassigned(engine):
+    slots = [day_slot(0, count=2), day_slot(0, position="Chef")]
+    assert engine(slots, [Candidate(1, "Cook", 20.0)]) == [[1], []]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_booked_shifts_count_toward_rest_and_weekly_hours(engine):
+    # Sunday evening of the previous week leaves too little rest for Monday.
+    booked = [BookedShift(1, _at(-1, 16), _at(-1, 24))]
+    slots = [day_slot(0), day_slot(1)]
+    assert engine(slots, [Candidate(1, "Cook", 20.0)], booked=booked) == [[], [1]]
+
+    # 32 of this week's 40 hours are already booked: one more day shift fits.
+    booked = [BookedShift(1, _at(day, 10), _at(day, 18)) for day in range(4)]
+    slots = [day_slot(4), day_slot(5)]
+    assignments = engine(slots, [Candidate(1, "Cook", 20.0)], booked=booked)
+    assert sum(len(ids) for ids in assignments) == 1
+
+
+def test_ilp_costs_no_more_than_greedy():
+    candidates = [
+        Candidate(1, "Cook", 18.0, 4.5),
+        Candidate(2, "Cook", 25.0, 3.0),
+        Candidate(3, "Cook", 30.0),
+        Candidate(4, "Server", 15.0, 5.0),
+    ]
+    slots = []
+    for day in range(7):
+        slots += [day_slot(day, count=2, high_demand=day >= 4), eve_slot(day, count=2)]
+        slots += [day_slot(day, position="Server"), eve_slot(day, position="Server")]
+
+    greedy = assignment.assign_greedy(slots, candidates)
+    ilp = assignment.assign_ilp(slots, candidates)
+    assert ilp is not None
+    assert _cost(slots, candidates, ilp) <= _cost(slots, candidates, greedy)
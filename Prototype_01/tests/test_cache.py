@@ -0,0 +1,37 @@
+from app import db
+from app.models import CacheVersion
+from app.utils import cache
+
+
+def test_schedule_etag_answers_304_until_the_schedule_changes(app):
+    client = app.test_client()
+    url = "/schedule.json?month=2025-03"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    with app.app_context():
+        cache.bump_version(cache.SCHEDULE)
+        db.session.commit()
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json() == first.get_json()
+
+
+def test_bump_version_creates_a_missing_counter(app):
+    with app.app_context():
+        db.session.execute(db.delete(CacheVersion).where(CacheVersion.name == "schedule"))
+        db.session.commit()
+        assert cache.get_version(cache.SCHEDULE) == 0
+
+        cache.bump_version(cache.SCHEDULE)
+        cache.bump_version(cache.SCHEDULE)
+        db.session.commit()
+        assert cache.get_version(cache.SCHEDULE) == 2
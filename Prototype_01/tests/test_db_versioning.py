@@ -0,0 +1,144 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from config import basedir
+from flask import current_app
+from flask_migrate import upgrade
+from sqlalchemy import inspect
+from app import db
+from app.utils.db_versioning import upgrade_database
+from app.utils.query_plans import check_query_plans
+import os
+import pytest
+import shutil
+import sqlalchemy as sa
+
+MIGRATIONS = os.path.join(basedir, "migrations")
+
+
+def _schema_differences():
+    with db.engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), db.metadata)
+
+
+def _head_revision():
+    with db.engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def _assert_at_head_with_every_table():
+    assert set(db.metadata.tables) <= set(inspect(db.engine).get_table_names())
+    config = current_app.extensions["migrate"].migrate.get_config(MIGRATIONS)
+    assert _head_revision() == ScriptDirectory.from_config(config).get_current_head()
+    assert all(used for _, _, used in check_query_plans())
+
+
+def _build_with_original_create_tables():
+    """The schema the original create_tables.py built, without alembic_version."""
+    upgrade(directory=MIGRATIONS, revision="294f303fbfcb")
+    with db.engine.begin() as connection:
+        connection.execute(sa.text("DROP TABLE alembic_version"))
+        connection.execute(
+            sa.text(
+                "INSERT INTO employee (id, name, position, email, hourly_rate) "
+                "VALUES (1, 'Ana', 'Server', 'ana@example.com', 16.5)"
+            )
+        )
+        connection.execute(
+            sa.text(
+                "INSERT INTO shift (employee_id, start_time, end_time, required_position) "
+                "VALUES (1, '2025-04-01 09:00:00', '2025-04-01 17:00:00', 'Server')"
+            )
+        )
+        connection.execute(
+            sa.text(
+                "INSERT INTO performance_log (employee_id, log_date, rating) "
+                "VALUES (1, '2025-04-01', 4.0)"
+            )
+        )
+
+
+def test_adopts_database_built_by_original_create_tables(make_app):
+    app = make_app(migrated=False)
+    with app.app_context():
+        _build_with_original_create_tables()
+
+        upgrade_database(echo=lambda message: None)
+
+        _assert_at_head_with_every_table()
+        assert _schema_differences() == []
+        summary = db.session.execute(
+            sa.text("SELECT log_count, mean_rating FROM employee_performance_summary")
+        ).one()
+        assert tuple(summary) == (1, 4.0)
+        assert db.session.execute(sa.text("SELECT count(*) FROM shift")).scalar() == 1
+
+
+def test_adopts_create_all_database_with_some_series_tables_and_fewer_indexes(make_app):
+    """create_all() mid-series: schedule_job already exists, an index is missing."""
+    app = make_app(migrated=False)
+    with app.app_context():
+        _build_with_original_create_tables()
+        with db.engine.begin() as connection:
+            connection.execute(sa.text("DROP INDEX ix_shift_employee_id"))
+            connection.execute(
+                sa.text(
+                    "CREATE TABLE schedule_job (id INTEGER NOT NULL PRIMARY KEY, "
+                    "target_month DATE NOT NULL, status VARCHAR(16) NOT NULL, "
+                    "current_phase VARCHAR(32), phase_timings TEXT, error TEXT, "
+                    "created_at DATETIME, started_at DATETIME, finished_at DATETIME)"
+                )
+            )
+            connection.execute(
+                sa.text(
+                    "INSERT INTO schedule_job (target_month, status) "
+                    "VALUES ('2025-04-01', 'succeeded')"
+                )
+            )
+
+        upgrade_database(echo=lambda message: None)
+
+        _assert_at_head_with_every_table()
+        assert db.session.execute(sa.text("SELECT count(*) FROM schedule_job")).scalar() == 1
+
+
+def test_adopts_shipped_prototype_database(make_app, tmp_path):
+    """instance/database.db predates the baseline: no shift.required_position."""
+    database = tmp_path / "shipped.db"
+    shutil.copy(os.path.join(basedir, "instance", "database.db"), database)
+    app = make_app(database=database, migrated=False)
+    with app.app_context():
+        counts = {
+            table: db.session.execute(sa.text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ["employee", "shift", "performance_log"]
+        }
+        db.session.remove()
+
+        upgrade_database(echo=lambda message: None)
+
+        _assert_at_head_with_every_table()
+        for table, count in counts.items():
+            assert db.session.execute(sa.text(f"SELECT count(*) FROM {table}")).scalar() == count
+        assert not db.session.execute(
+            sa.text("SELECT count(*) FROM shift WHERE required_position IS NULL")
+        ).scalar()
+        # The only leftover is the unmapped column the prototype had.
+        assert [diff[:3] for diff in _schema_differences()] == [
+            ("remove_column", None, "performance_log")
+        ]
+
+
+def test_refuses_unversioned_database_without_baseline_tables(make_app):
+    app = make_app(migrated=False)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(sa.text("CREATE TABLE something_else (id INTEGER)"))
+
+        with pytest.raises(RuntimeError, match="baseline table"):
+            upgrade_database(echo=lambda message: None)
+
+
+def test_upgrade_database_is_a_no_op_at_head(app):
+    with app.app_context():
+        upgrade_database(echo=lambda message: None)
+        _assert_at_head_with_every_table()
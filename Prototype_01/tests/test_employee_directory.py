@@ -0,0 +1,37 @@
+from app import db
+from app.models import Employee
+from app.utils import employee_store
+import io
+
+
+def _names(client, query):
+    response = client.get("/api/employees", query_string={"q": query})
+    assert response.status_code == 200
+    return [row["name"] for row in response.get_json()["employees"]]
+
+
+def test_search_folds_accented_names_on_both_sides(app):
+    with app.app_context():
+        db.session.add_all(
+            [
+                Employee(name="Émile Zola", position="Server", email="emile@example.com"),
+                Employee(name="Emma Stone", position="Server", email="emma@example.com"),
+            ]
+        )
+        db.session.commit()
+
+    client = app.test_client()
+    for query in ["é", "É", "émi", "ÉMILE"]:
+        assert _names(client, query) == ["Émile Zola"]
+    assert _names(client, "em") == ["Emma Stone"]
+
+
+def test_csv_import_sets_search_name(app):
+    with app.app_context():
+        employee_store.import_employees_csv(
+            io.StringIO("name,position,email\nStraße Weiß,Server,s@example.com\n")
+        )
+        employee = db.session.execute(db.select(Employee)).scalar_one()
+        assert employee.search_name == "strasse weiss"
+
+    assert _names(app.test_client(), "STRASS") == ["Straße Weiß"]
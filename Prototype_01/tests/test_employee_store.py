@@ -0,0 +1,126 @@
+from app import db
+from app.models import Employee, EmployeePerformanceSummary, Shift
+from app.utils import employee_store
+import csv
+import datetime
+import io
+
+
+def _import(text):
+    return employee_store.import_employees_csv(io.StringIO(text))
+
+
+def test_import_reports_duplicates_within_the_file(app):
+    with app.app_context():
+        result = _import(
+            "name,position,email,hourly_rate\n"
+            "Ana,Server,ana@example.com,15\n"
+            "Ana Again,Cook,ana@example.com,16\n"
+            "Ana,Cook,other@example.com,17\n"
+            "Bo,Cook,bo@example.com,\n"
+        )
+        employees = db.session.execute(
+            db.select(Employee.name, Employee.email, Employee.hourly_rate).order_by(
+                Employee.name
+            )
+        ).all()
+
+    assert (result.inserted, result.updated, result.unchanged) == (2, 0, 0)
+    assert result.errors == [
+        (3, "email 'ana@example.com' appears earlier in the file"),
+        (4, "name 'Ana' appears earlier in the file"),
+    ]
+    assert employees == [("Ana", "ana@example.com", 15.0), ("Bo", "bo@example.com", None)]
+
+
+def test_imported_formula_names_are_escaped_on_export(app):
+    with app.app_context():
+        _import("name,position,email\n=SUM(A1:A9),Server,sum@example.com\n")
+        employee = db.session.execute(db.select(Employee)).scalar_one()
+        assert employee.name == "=SUM(A1:A9)"
+        db.session.add(
+            Shift(
+                employee_id=employee.id,
+                start_time=datetime.datetime(2025, 3, 3, 10),
+                end_time=datetime.datetime(2025, 3, 3, 18),
+                required_position="Server",
+            )
+        )
+        db.session.commit()
+
+    response = app.test_client().get(
+        "/api/shifts.csv", query_string={"start": "2025-03-01", "end": "2025-04-01"}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0]["employee_name"] == "'=SUM(A1:A9)"
+
+
+def _post_employee(client, url, name, email):
+    return client.post(
+        url,
+        data={"name": name, "position": "Server", "email": email, "hourly_rate": "15"},
+    ).get_data(as_text=True)
+
+
+def test_unique_violations_report_the_conflicting_fields(app):
+    with app.app_context():
+        db.session.add_all(
+            [
+                Employee(name="Ana", position="Server", email="ana@example.com"),
+                Employee(name="Bo", position="Server", email="bo@example.com"),
+            ]
+        )
+        db.session.commit()
+        bo_id = db.session.execute(db.select(Employee.id).filter_by(name="Bo")).scalar()
+
+        assert employee_store.conflicting_fields("Ana", "new@example.com") == ["name"]
+        assert employee_store.conflicting_fields("Ana", "ana@example.com", exclude_id=1) == []
+
+    client = app.test_client()
+    page = _post_employee(client, "/admin/employee/add", "Ana", "new@example.com")
+    assert "is already used by another employee" in page
+    assert "is already registered" not in page
+
+    page = _post_employee(client, f"/admin/employee/edit/{bo_id}", "Bo", "ana@example.com")
+    assert "is already registered by another employee" in page
+    assert "is already used" not in page
+
+
+def test_delete_employee_removes_a_stale_summary(app):
+    with app.app_context():
+        employee = Employee(name="Ana", position="Server", email="ana@example.com")
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(EmployeePerformanceSummary(employee_id=employee.id, log_count=1))
+        db.session.commit()
+        employee_id = employee.id
+        assert employee_store.dependent_records(employee_id) == []
+
+    response = app.test_client().post(f"/admin/employee/delete/{employee_id}")
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert db.session.get(Employee, employee_id) is None
+        assert db.session.get(EmployeePerformanceSummary, employee_id) is None
+
+
+def test_delete_employee_with_shifts_is_refused(app):
+    with app.app_context():
+        employee = Employee(name="Ana", position="Server", email="ana@example.com")
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(
+            Shift(
+                employee_id=employee.id,
+                start_time=datetime.datetime(2025, 3, 3, 10),
+                end_time=datetime.datetime(2025, 3, 3, 18),
+                required_position="Server",
+            )
+        )
+        db.session.commit()
+        employee_id = employee.id
+        assert employee_store.dependent_records(employee_id) == ["shifts"]
+
+    app.test_client().post(f"/admin/employee/delete/{employee_id}")
+    with app.app_context():
+        assert db.session.get(Employee, employee_id) is not None
@@ -0,0 +1,101 @@
+from app.models import Forecast
+from app.utils import forecast_engines, forecasting, model_store
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _history(days=56, noise=0.0):
+    """Daily demand with a weekly pattern and a gentle upward trend."""
+    rng = np.random.default_rng(0)
+    steps = np.arange(days)
+    y = 100 + 0.5 * steps + np.tile([0, -10, -5, 0, 15, 30, 20], days // 7 + 1)[:days]
+    y = y + rng.normal(0, noise, days)
+    return pd.DataFrame({"ds": pd.date_range("2025-01-06", periods=days), "y": y})
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, "MODEL_DIR", str(tmp_path / "models"))
+
+
+def test_holt_winters_follows_trend_and_weekly_season():
+    engine = forecast_engines.HoltWintersForecaster()
+    history = _history(days=70)
+    model = engine.fit(history.iloc[:56])
+    forecast = engine.predict(model, 14)
+
+    assert list(forecast.columns) == forecast_engines.FORECAST_COLUMNS
+    assert len(forecast) == 56 + 14
+    future = forecast.iloc[56:]
+    assert (future["ds"].to_numpy() == history["ds"].iloc[56:].to_numpy()).all()
+    assert np.abs(future["yhat"].to_numpy() - history["y"].iloc[56:].to_numpy()).mean() < 3
+    assert (future["yhat_lower"] <= future["yhat"]).all()
+    assert (future["yhat"] <= future["yhat_upper"]).all()
+
+
+def test_holt_winters_intervals_widen_and_model_round_trips():
+    engine = forecast_engines.HoltWintersForecaster()
+    model = engine.fit(_history(noise=3.0))
+    forecast = engine.predict(model, 21)
+    width = (forecast["yhat_upper"] - forecast["yhat_lower"]).iloc[-21:].to_numpy()
+    assert (np.diff(width) >= -1e-9).all()
+    assert width[-1] > width[0]
+
+    restored = engine.deserialize(engine.serialize(model))
+    pd.testing.assert_frame_equal(engine.predict(restored, 21), forecast)
+
+
+def test_seasonal_naive_repeats_the_last_week():
+    engine = forecast_engines.SeasonalNaiveForecaster()
+    history = _history()
+    forecast = engine.predict(engine.fit(history), 14)
+    last_week = history["y"].iloc[-7:].to_numpy()
+    assert np.allclose(forecast["yhat"].iloc[-14:], np.tile(last_week, 2))
+
+
+@pytest.mark.parametrize("name, days", [("holt_winters", 13), ("seasonal_naive", 6)])
+def test_numpy_engines_reject_short_history(name, days):
+    with pytest.raises(ValueError, match="at least"):
+        forecasting.get_engine(name).fit(_history(days=days))
+
+
+def test_engine_selection_and_defaults(make_app):
+    assert forecasting.get_engine("holt_winters").name == "holt_winters"
+    # Outside an app there is no config; Prophet is the default.
+    assert forecasting.get_engine().name == "prophet"
+    with pytest.raises(ValueError, match="Unknown forecast engine"):
+        forecasting.get_engine("arima")
+
+    app = make_app(migrated=False, FORECAST_ENGINE="seasonal_naive")
+    with app.app_context():
+        assert forecasting.get_engine().name == "seasonal_naive"
+        assert forecasting.get_engine("holt_winters").name == "holt_winters"
+
+
+def test_forecast_runs_are_stored_per_engine(app, model_dir):
+    with app.app_context():
+        holt_winters = forecasting.generate_forecast(7, engine="holt_winters")
+        naive = forecasting.generate_forecast(7, engine="seasonal_naive")
+        assert holt_winters is not None and naive is not None
+        versions = {row.version for row in Forecast.query.all()}
+        assert len(versions) == 2
+
+        # A shorter horizon of an engine's stored run is served from the table.
+        stored = forecasting.generate_forecast(3, engine="holt_winters")
+        assert np.allclose(stored["yhat"], holt_winters["yhat"].iloc[: len(stored)])
+
+
+@pytest.mark.parametrize(
+    "query, status",
+    [
+        ("days=0", 400),
+        ("days=367", 400),
+        ("days=1000000", 400),
+        ("engine=arima", 400),
+        ("days=366&engine=seasonal_naive", 200),
+    ],
+)
+def test_run_forecast_validates_days_and_engine(app, model_dir, query, status):
+    response = app.test_client().get(f"/run_forecast?{query}")
+    assert response.status_code == status
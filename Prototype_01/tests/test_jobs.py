@@ -0,0 +1,118 @@
+from app import db
+from app.models import Employee, ScheduleJob, Shift
+from app.utils import jobs, model_store
+from sqlalchemy.exc import IntegrityError
+import datetime
+import pytest
+
+
+@pytest.fixture
+def schedule_app(make_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, "MODEL_DIR", str(tmp_path / "models"))
+    app = make_app(FORECAST_ENGINE="seasonal_naive", SCHEDULE_ASSIGNMENT_ENGINE="greedy")
+    with app.app_context():
+        db.session.add_all(
+            [
+                Employee(name="Ada Manager", position="Manager", email="ada@example.com"),
+                Employee(name="Ben Server", position="Server", email="ben@example.com"),
+                Employee(name="Cy Cook", position="Cook", email="cy@example.com"),
+            ]
+        )
+        db.session.commit()
+    return app
+
+
+def _wait_for_jobs():
+    # The executor runs jobs in order, so this returns once earlier ones finished.
+    jobs._get_executor().submit(lambda: None).result(timeout=120)
+
+
+def test_schedule_job_succeeds_on_sqlite(schedule_app):
+    with schedule_app.app_context():
+        job = jobs.enqueue_schedule_job(datetime.date(2025, 3, 15))
+        _wait_for_jobs()
+        db.session.expire_all()
+        job = db.session.get(ScheduleJob, job.id)
+
+        assert job.status == "succeeded", job.error
+        assert job.current_phase is None
+        assert set(job.to_dict()["phase_timings"]) == {"forecast", "assign", "commit", "notify"}
+        assert db.session.query(Shift).count() > 0
+        assert job.id not in jobs._owned_jobs
+
+
+def _add_job(status, heartbeat_at=None, month=datetime.date(2025, 3, 1)):
+    job = ScheduleJob(target_month=month, status=status, heartbeat_at=heartbeat_at)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_enqueue_returns_the_active_job_for_the_month(app):
+    with app.app_context():
+        existing = _add_job("running")
+        assert jobs.enqueue_schedule_job(datetime.date(2025, 3, 20)).id == existing.id
+        assert db.session.query(ScheduleJob).count() == 1
+
+
+def test_only_one_active_job_per_month(app):
+    with app.app_context():
+        _add_job("succeeded")
+        _add_job("failed")
+        _add_job("queued")
+        with pytest.raises(IntegrityError):
+            _add_job("running")
+
+
+def test_enqueue_race_returns_the_job_that_won(app, monkeypatch):
+    with app.app_context():
+        winner = _add_job("queued")
+        lookups = iter([None])
+        original = jobs._active_job
+        # The first check misses the winner, as if it committed just after.
+        monkeypatch.setattr(
+            jobs, "_active_job", lambda month: next(lookups, None) or original(month)
+        )
+
+        assert jobs.enqueue_schedule_job(datetime.date(2025, 3, 1)).id == winner.id
+        assert db.session.query(ScheduleJob).count() == 1
+
+
+def test_abandoned_jobs_expire_and_free_their_month(schedule_app):
+    with schedule_app.app_context():
+        lease = schedule_app.config["SCHEDULE_JOB_LEASE_SECONDS"]
+        now = datetime.datetime.utcnow()
+        stale = _add_job("running", now - datetime.timedelta(seconds=lease + 1))
+        live = _add_job("queued", now, month=datetime.date(2025, 4, 1))
+
+        job = jobs.enqueue_schedule_job(datetime.date(2025, 3, 1))
+        _wait_for_jobs()
+        db.session.expire_all()
+
+        assert job.id != stale.id
+        assert db.session.get(ScheduleJob, stale.id).status == "failed"
+        assert db.session.get(ScheduleJob, stale.id).error == jobs.ABANDONED_ERROR
+        assert db.session.get(ScheduleJob, live.id).status == "queued"
+        assert db.session.get(ScheduleJob, job.id).status == "succeeded"
+
+
+@pytest.mark.parametrize(
+    "outcome, error",
+    [(False, "Schedule generation failed. See logs."), (RuntimeError("boom"), "boom")],
+)
+def test_failed_schedule_marks_the_job_failed(app, monkeypatch, outcome, error):
+    def create_schedule(target_date, on_phase=None, incremental=False):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(jobs.scheduling, "create_schedule", create_schedule)
+    with app.app_context():
+        job = jobs.enqueue_schedule_job(datetime.date(2025, 3, 1))
+        _wait_for_jobs()
+        db.session.expire_all()
+        job = db.session.get(ScheduleJob, job.id)
+
+        assert (job.status, job.error) == ("failed", error)
+        assert job.finished_at is not None
+        assert job.id not in jobs._owned_jobs
@@ -0,0 +1,46 @@
+from app import db
+from app.models import Employee, Shift
+from app.utils.labor_cost import iter_shift_cost_csv
+import csv
+import datetime
+import io
+
+
+def test_shift_export_escapes_formula_like_text(app):
+    with app.app_context():
+        employee = Employee(
+            name="=HYPERLINK(\"http://example.com\")",
+            position="Server",
+            email="formula@example.com",
+            hourly_rate=15.0,
+        )
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add_all(
+            [
+                Shift(
+                    employee_id=employee.id,
+                    start_time=datetime.datetime(2025, 4, 1, 9),
+                    end_time=datetime.datetime(2025, 4, 1, 17),
+                    required_position="@Server",
+                ),
+                Shift(
+                    employee_id=None,
+                    start_time=datetime.datetime(2025, 4, 2, 9),
+                    end_time=datetime.datetime(2025, 4, 2, 17),
+                    required_position="Host/Hostess",
+                ),
+            ]
+        )
+        db.session.commit()
+
+        text = "".join(
+            iter_shift_cost_csv(datetime.datetime(2025, 4, 1), datetime.datetime(2025, 5, 1))
+        )
+
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert rows[0]["employee_name"] == "'=HYPERLINK(\"http://example.com\")"
+    assert rows[0]["required_position"] == "'@Server"
+    assert rows[0]["cost"] == "120.00"
+    assert rows[1]["employee_name"] == ""
+    assert rows[1]["required_position"] == "Host/Hostess"
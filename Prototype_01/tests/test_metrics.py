@@ -0,0 +1,95 @@
+from app.utils import metrics
+import re
+
+SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$')
+
+
+def _parse(text):
+    """Returns {(name, frozenset of label pairs): value} and the TYPE of each metric."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if not line:
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Malformed sample line: {line!r}"
+        labels = frozenset(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match["labels"] or ""))
+        samples[(match["name"], labels)] = float(match["value"])
+    return samples, types
+
+
+def _series(samples, name, **labels):
+    """The cumulative buckets, sum and count of one histogram series."""
+    wanted = set(labels.items())
+    buckets = sorted(
+        (float("inf") if dict(key)["le"] == "+Inf" else float(dict(key)["le"]), value)
+        for (sample, key), value in samples.items()
+        if sample == f"{name}_bucket" and wanted <= key
+    )
+    key = frozenset(wanted)
+    return buckets, samples.get((f"{name}_sum", key)), samples.get((f"{name}_count", key))
+
+
+def _scrape(client):
+    with client.get("/metrics") as response:
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        return _parse(response.get_data(as_text=True))
+
+
+def test_metrics_exposition_and_bucket_cumulation(app):
+    client = app.test_client()
+    for _ in range(3):
+        # Requests are recorded when their response is closed.
+        with client.get("/api/employees?q=a") as response:
+            assert response.status_code == 200
+    samples, types = _scrape(client)
+
+    assert {histogram.name for histogram in metrics.HISTOGRAMS} <= types.keys()
+    assert set(types.values()) == {"histogram"}
+
+    labels = {"endpoint": "api.search_employees", "method": "GET", "status": "200"}
+    buckets, total, count = _series(samples, "flask_request_duration_seconds", **labels)
+    assert count >= 3
+    assert [bound for bound, _ in buckets] == list(metrics.SECONDS_BUCKETS) + [float("inf")]
+    assert all(a <= b for (_, a), (_, b) in zip(buckets, buckets[1:]))
+    assert buckets[-1][1] == count
+    assert total > 0
+
+    labels.pop("status")
+    buckets, _, count = _series(samples, "flask_request_sql_queries", **labels)
+    assert [bound for bound, _ in buckets][:-1] == list(metrics.QUERY_COUNT_BUCKETS)
+    assert buckets[-1][1] == count >= 3
+
+
+def test_streamed_responses_are_recorded_when_closed(app):
+    client = app.test_client()
+    labels = {"endpoint": "api.stream_shifts", "method": "GET", "status": "200"}
+
+    def recorded():
+        return _series(_scrape(client)[0], "flask_request_duration_seconds", **labels)[2] or 0
+
+    before = recorded()
+    response = client.get(
+        "/api/shifts.ndjson?start=2025-03-01&end=2025-04-01", buffered=False
+    )
+    assert response.status_code == 200
+    assert recorded() == before
+
+    response.get_data()
+    response.close()
+    assert recorded() == before + 1
+
+
+def test_label_values_are_escaped():
+    histogram = metrics.Histogram("test_seconds", "Test.", ["path"])
+    histogram.observe(0.02, 'a"b\\c\nd')
+    text = histogram.render()
+    assert 'path="a\\"b\\\\c\\nd"' in text
+    assert 'test_seconds_bucket{path="a\\"b\\\\c\\nd",le="0.025"} 1' in text
+    assert 'test_seconds_bucket{path="a\\"b\\\\c\\nd",le="0.01"} 0' in text
@@ -0,0 +1,30 @@
+from app.utils import model_store
+import json
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(model_store, "MAX_LOADED_MODELS", 2)
+    monkeypatch.setattr(model_store, "_loaded_models", model_store.OrderedDict())
+    return model_store
+
+
+def test_loaded_models_are_bounded_least_recently_used_first(store):
+    for key in ["a", "b"]:
+        store.save_model(key, {"key": key}, json.dumps)
+    assert store.load_model("a", json.loads) == {"key": "a"}  # a is now the newest
+    store.save_model("c", {"key": "c"}, json.dumps)
+
+    assert list(store._loaded_models) == ["a", "c"]
+
+
+def test_evicted_models_reload_from_disk(store):
+    for key in ["a", "b", "c"]:
+        store.save_model(key, {"key": key}, json.dumps)
+    assert "a" not in store._loaded_models
+
+    assert store.load_model("a", json.loads) == {"key": "a"}
+    assert list(store._loaded_models) == ["c", "a"]
+    assert store.load_model("missing", json.loads) is None
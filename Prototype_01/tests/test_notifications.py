@@ -0,0 +1,104 @@
+from aiosmtpd.controller import Controller
+from collections import Counter
+from flask_mail import Message
+from app.utils.notifications import send_batch
+import pytest
+import socket
+
+
+class SinkHandler:
+    """Records delivered messages; fails the first delivery to some recipients."""
+
+    def __init__(self, flaky=(), broken=()):
+        self.delivered = Counter()
+        self.flaky = set(flaky)
+        self.broken = set(broken)
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        recipient = envelope.rcpt_tos[0]
+        if recipient in self.broken:
+            return "451 4.3.0 Mailbox temporarily unavailable"
+        if recipient in self.flaky:
+            self.flaky.discard(recipient)
+            return "451 4.3.0 Try again later"
+        self.delivered[recipient] += 1
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink(make_app):
+    """Starts a local SMTP server and returns (app, handler) pointed at it."""
+    handlers = []
+    controllers = []
+
+    def start(**handler_args):
+        handler = SinkHandler(**handler_args)
+        controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        handlers.append(handler)
+        controllers.append(controller)
+        app = make_app(
+            MAIL_SERVER="127.0.0.1",
+            MAIL_PORT=controller.port,
+            MAIL_USE_TLS=False,
+            MAIL_USE_SSL=False,
+            MAIL_USERNAME=None,
+            MAIL_PASSWORD=None,
+            MAIL_RETRY_BACKOFF=0,
+            # Flask-Mail skips SMTP entirely when TESTING is set.
+            MAIL_SUPPRESS_SEND=False,
+        )
+        return app, handler
+
+    yield start
+
+    for controller in controllers:
+        controller.stop()
+
+
+def _messages(recipients):
+    return [
+        Message(subject=f"Schedule {i}", recipients=[recipient], body="Hello")
+        for i, recipient in enumerate(recipients)
+    ]
+
+
+def test_send_batch_retries_transient_failure_and_sends_each_message_once(smtp_sink):
+    recipients = [f"employee{i}@example.com" for i in range(6)]
+    app, handler = smtp_sink(flaky=[recipients[2]])
+
+    with app.app_context():
+        summary = send_batch(_messages(recipients), concurrency=2, retries=2)
+
+    assert summary["sent"] == 6
+    assert summary["failed"] == 0
+    assert summary["retried"] == 1
+    assert handler.delivered == Counter({recipient: 1 for recipient in recipients})
+    # Two pooled connections, plus one reconnect after the failed send.
+    assert handler.connections == 3
+
+
+def test_send_batch_reports_messages_that_exhaust_their_retries(smtp_sink):
+    recipients = ["ok@example.com", "broken@example.com", "also-ok@example.com"]
+    app, handler = smtp_sink(broken=["broken@example.com"])
+
+    with app.app_context():
+        summary = send_batch(_messages(recipients), concurrency=1, retries=1)
+
+    assert summary["sent"] == 2
+    assert summary["failed"] == 1
+    assert summary["retried"] == 1
+    assert [msg.recipients for msg, _ in summary["failures"]] == [["broken@example.com"]]
+    assert handler.delivered == Counter({"ok@example.com": 1, "also-ok@example.com": 1})
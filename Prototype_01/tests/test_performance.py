@@ -0,0 +1,43 @@
+from app import db
+from app.models import Employee, EmployeePerformanceSummary, PerformanceLog
+from app.utils import performance
+import datetime
+
+
+def test_rebuild_all_summaries_writes_in_batches_and_matches_incremental(app):
+    with app.app_context():
+        employees = [
+            Employee(name=f"Employee {i}", position="Server", email=f"e{i}@example.com")
+            for i in range(7)
+        ]
+        db.session.add_all(employees)
+        db.session.flush()
+        for i, employee in enumerate(employees):
+            for month in range(1, 4 + i % 3):
+                log = PerformanceLog(
+                    employee_id=employee.id,
+                    log_date=datetime.date(2025, month, 10),
+                    rating=None if (i + month) % 4 == 0 else float((i * month) % 5 + 1),
+                )
+                db.session.add(log)
+                db.session.flush()
+                performance.record_log(log)
+        db.session.commit()
+
+        def snapshot():
+            return {
+                row.employee_id: (
+                    row.log_count,
+                    row.rating_count,
+                    row.mean_rating,
+                    row.ewma_rating,
+                    row.last_rating,
+                    row.last_log_date,
+                )
+                for row in EmployeePerformanceSummary.query
+            }
+
+        incremental = snapshot()
+        assert performance.rebuild_all_summaries(batch_size=3) == 7
+        db.session.expire_all()
+        assert snapshot() == incremental
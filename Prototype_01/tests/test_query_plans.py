@@ -0,0 +1,28 @@
+from app.utils.query_plans import check_query_plans, hot_queries
+import os
+import pytest
+
+# A scratch PostgreSQL database to check plans on too; it is migrated to head.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.mark.parametrize(
+    "database_uri",
+    [
+        pytest.param(None, id="sqlite"),
+        pytest.param(
+            POSTGRES_URL,
+            id="postgresql",
+            marks=pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+        ),
+    ],
+)
+def test_hot_queries_use_their_indexes(make_app, database_uri):
+    """The EXPLAIN check behind `flask check-query-plans`, on a migrated schema."""
+    app = make_app(database_uri=database_uri)
+    with app.app_context():
+        results = check_query_plans()
+
+    assert [name for name, _, _ in results] == [name for name, _, _ in hot_queries()]
+    missing = {name: plan for name, plan, used in results if used is None}
+    assert not missing, f"Queries not using their expected index: {missing}"
@@ -0,0 +1,31 @@
+from app import db
+from app.models import Employee, Shift
+import datetime
+import pytest
+
+
+@pytest.mark.parametrize(
+    "query, link",
+    [
+        ("month=2025-03&summary=1", "/schedule?month=2025-03"),
+        ("month=2025-03", "/schedule?month=2025-03&amp;summary=1"),
+    ],
+)
+def test_view_toggle_keeps_the_month(app, query, link):
+    with app.app_context():
+        employee = Employee(name="Ana", position="Server", email="ana@example.com", hourly_rate=15)
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(
+            Shift(
+                employee_id=employee.id,
+                start_time=datetime.datetime(2025, 3, 4, 10),
+                end_time=datetime.datetime(2025, 3, 4, 18),
+                required_position="Server",
+            )
+        )
+        db.session.commit()
+
+    page = app.test_client().get(f"/schedule?{query}").get_data(as_text=True)
+    assert "March 2025" in page
+    assert f'href="{link}"' in page
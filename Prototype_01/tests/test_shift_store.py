@@ -0,0 +1,86 @@
+from app import db
+from app.models import Employee, Shift
+from app.utils import shift_store
+import datetime
+import pytest
+
+MONTH_START = datetime.datetime(2025, 3, 1)
+MONTH_END = datetime.datetime(2025, 4, 1)
+
+
+@pytest.fixture
+def employee_ids(app):
+    with app.app_context():
+        employees = [
+            Employee(name=f"Cook {i}", position="Cook", email=f"cook{i}@example.com")
+            for i in range(4)
+        ]
+        db.session.add_all(employees)
+        db.session.commit()
+        return [employee.id for employee in employees]
+
+
+def _row(employee_id, day, hour=10, position="Cook"):
+    start = MONTH_START + datetime.timedelta(days=day, hours=hour)
+    return {
+        "employee_id": employee_id,
+        "start_time": start,
+        "end_time": start + datetime.timedelta(hours=8),
+        "required_position": position,
+    }
+
+
+def _stored():
+    return {
+        (shift.start_time, shift.required_position, shift.employee_id): shift.id
+        for shift in shift_store.load_shift_rows(MONTH_START, MONTH_END)
+    }
+
+
+def test_sync_only_touches_changed_slots(app, employee_ids):
+    a, b, c, d = employee_ids
+    with app.app_context():
+        rows = [_row(a, 0), _row(b, 0), _row(c, 1), _row(d, 2), _row(None, 3)]
+        shift_store.replace_shifts(MONTH_START, MONTH_END, rows)
+        db.session.commit()
+        before = _stored()
+
+        # Day 0 keeps a but swaps b for c; day 2 loses its shift; day 4 is new.
+        rows = [_row(a, 0), _row(c, 0), _row(c, 1), _row(None, 3), _row(b, 4)]
+        diff = shift_store.sync_shifts(MONTH_START, MONTH_END, rows)
+        db.session.commit()
+        after = _stored()
+
+    assert (diff.inserted, diff.updated, diff.deleted, diff.unchanged) == (1, 1, 1, 3)
+    assert diff.changed_employee_ids == {b, c, d}
+    for key in [_row(a, 0), _row(c, 1), _row(None, 3)]:
+        key = (key["start_time"], key["required_position"], key["employee_id"])
+        assert after[key] == before[key]
+    day0 = _row(c, 0)
+    assert after[(day0["start_time"], "Cook", c)] == before[(day0["start_time"], "Cook", b)]
+    assert len(after) == 5
+
+
+def test_replace_leaves_the_session_consistent(app, employee_ids):
+    a, b = employee_ids[:2]
+    with app.app_context():
+        shift_store.replace_shifts(MONTH_START, MONTH_END, [_row(a, 0), _row(a, 1)])
+        db.session.commit()
+        loaded = Shift.query.order_by(Shift.id).all()
+        assert [shift.employee_id for shift in loaded] == [a, a]
+        owner = db.session.get(Employee, a)
+        assert len(owner.shifts) == 2
+
+        deleted, inserted, previous = shift_store.replace_shifts(
+            MONTH_START, MONTH_END, [_row(b, 0), _row(b, 2)]
+        )
+        assert (deleted, inserted, previous) == (2, 2, {a})
+
+        # Same transaction: queries must see the new rows, not stale objects.
+        shifts = Shift.query.order_by(Shift.start_time).all()
+        assert [(s.employee_id, s.start_time) for s in shifts] == [
+            (b, _row(b, 0)["start_time"]),
+            (b, _row(b, 2)["start_time"]),
+        ]
+        assert owner.shifts == []
+        db.session.commit()
@@ -0,0 +1,50 @@
+from benchmarks.import_benchmark import HEAVY_MODULES, parse_importtime
+from config import basedir
+import json
+import os
+import subprocess
+import sys
+
+CHILD_SCRIPT = """
+import json, sys
+from app import create_app
+app = create_app()
+import app.routes, app.admin.routes, app.api.routes
+print(json.dumps(sorted(name for name in {modules!r} if name in sys.modules)))
+"""
+
+# Cumulative import time of the app package and the blueprints create_app()
+# imports, measured with -X importtime. About 0.4s today; the budget leaves
+# room for slower machines and catches the forecasting stack (Prophet alone
+# adds about 0.5s). STARTUP_IMPORT_BUDGET overrides it.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET") or 1.0)
+
+
+def _run_child(tmp_path, *python_options):
+    """A fresh interpreter, so modules other tests imported do not count."""
+    return subprocess.run(
+        [sys.executable, *python_options, "-c", CHILD_SCRIPT.format(modules=HEAVY_MODULES)],
+        cwd=basedir,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_create_app_does_not_import_the_forecasting_stack(tmp_path):
+    result = _run_child(tmp_path)
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded == []
+
+
+def test_app_import_time_stays_within_budget(tmp_path):
+    result = _run_child(tmp_path, "-X", "importtime")
+    top_level = parse_importtime(result.stderr, top=sys.maxsize, depth=1)
+    app_modules = {
+        module: microseconds / 1e6
+        for microseconds, module in top_level
+        if module == "app" or module.startswith("app.")
+    }
+    assert "app" in app_modules
+    assert sum(app_modules.values()) <= IMPORT_BUDGET_SECONDS, app_modules
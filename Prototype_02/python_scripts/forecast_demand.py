@@ -1,71 +1,266 @@
 import pandas as pd
 from prophet import Prophet
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import os
 import sys
 import json
+import time
 import argparse
 import logging
 import warnings
 
-warnings.simplefilter("ignore") 
+warnings.simplefilter("ignore")
 logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 logging.getLogger('prophet').setLevel(logging.WARNING)
-logging.basicConfig(level=logging.WARNING) 
+logging.basicConfig(level=logging.WARNING)
 
-def run_forecast(data_path, periods_to_predict):
+# Fitted models and finished forecasts kept warm between requests in --serve
+# mode. Both are keyed by the data file's path, size and modification time,
+# so editing the CSV triggers a refit on the next request. Both are LRU
+# caches: requests can name any data file and horizon, and a long-lived
+# worker must not grow without bound.
+MODEL_CACHE_SIZE = 4
+FORECAST_CACHE_SIZE = 32
+
+_models = OrderedDict()
+_forecasts = OrderedDict()
+_cache_sizes = {"models": MODEL_CACHE_SIZE, "forecasts": FORECAST_CACHE_SIZE}
+
+
+def _cache_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache, key, value, max_entries):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+
+
+def _data_key(data_path):
+    try:
+        stat = os.stat(data_path)
+    except FileNotFoundError:
+        raise ValueError(f"Data file not found at: {data_path}")
+    return (os.path.abspath(data_path), stat.st_size, stat.st_mtime_ns)
+
+
+def _read_history(data_path):
+    """Reads history from CSV, or Parquet (needs pyarrow) for .parquet files."""
+    try:
+        if data_path.endswith('.parquet'):
+            return pd.read_parquet(data_path)
+        return pd.read_csv(data_path)
+    except FileNotFoundError:
+        raise ValueError(f"Data file not found at: {data_path}")
+    except Exception as e:
+        raise ValueError(f"Error reading data file: {e}")
+
+
+def _clean_history(df):
+    if 'ds' not in df.columns or 'y' not in df.columns:
+        raise ValueError("CSV input must contain 'ds' and 'y' columns.")
+
+    try:
+        df['ds'] = pd.to_datetime(df['ds'])
+    except Exception as e:
+        raise ValueError(f"Error converting 'ds' column to datetime: {e}")
+
+    try:
+        df['y'] = pd.to_numeric(df['y'])
+    except Exception as e:
+         raise ValueError(f"Error converting 'y' column to numeric: {e}")
+
+    if len(df) < 2:
+        raise ValueError("Need at least 2 data points for forecasting.")
+    return df
+
+
+def _fit_model(data_path):
+    m = Prophet()
+    m.fit(_clean_history(_read_history(data_path)))
+    return m
+
+
+def _forecast_output(m, periods_to_predict):
+    future = m.make_future_dataframe(periods=periods_to_predict)
+    forecast = m.predict(future)
+
+    forecast_output = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
+    forecast_output['ds'] = forecast_output['ds'].dt.strftime('%Y-%m-%d')
+    return forecast_output.to_dict(orient='records')
+
+
+def _check_periods(periods_to_predict):
+    if not isinstance(periods_to_predict, int) or isinstance(periods_to_predict, bool) or periods_to_predict <= 0:
+        raise ValueError("Periods to predict must be a positive integer.")
+
+
+def forecast_records(data_path, periods_to_predict):
     """
-    Reads historical data, runs Prophet forecast, and prints results as JSON to stdout.
-    Prints errors as JSON to stderr.
+    Returns the forecast for `periods_to_predict` days after the data in
+    `data_path` as a list of {ds, yhat, yhat_lower, yhat_upper} dicts,
+    reusing the fitted model and earlier results while the file is unchanged.
+    Raises ValueError for bad input.
     """
-    try:
-        if not isinstance(periods_to_predict, int) or periods_to_predict <= 0:
-            raise ValueError("Periods to predict must be a positive integer.")
+    _check_periods(periods_to_predict)
 
-        try:
-            df = pd.read_csv(data_path)
-        except FileNotFoundError:
-            raise ValueError(f"Data file not found at: {data_path}")
-        except Exception as e:
-            raise ValueError(f"Error reading CSV file: {e}")
+    key = _data_key(data_path)
+    records = _cache_get(_forecasts, (key, periods_to_predict))
+    if records is not None:
+        return records
 
-        if 'ds' not in df.columns or 'y' not in df.columns:
-            raise ValueError("CSV input must contain 'ds' and 'y' columns.")
+    m = _cache_get(_models, key)
+    if m is None:
+        # Drop models and results for older versions of this file.
+        for old_key in [k for k in _models if k[0] == key[0]]:
+            del _models[old_key]
+        for old_key in [k for k in _forecasts if k[0][0] == key[0]]:
+            del _forecasts[old_key]
+        m = _fit_model(data_path)
+        _cache_put(_models, key, m, _cache_sizes["models"])
 
-        try:
-            df['ds'] = pd.to_datetime(df['ds'])
-        except Exception as e:
-            raise ValueError(f"Error converting 'ds' column to datetime: {e}")
+    records = _forecast_output(m, periods_to_predict)
+    _cache_put(_forecasts, (key, periods_to_predict), records, _cache_sizes["forecasts"])
+    return records
 
-        try:
-            df['y'] = pd.to_numeric(df['y'])
-        except Exception as e:
-             raise ValueError(f"Error converting 'y' column to numeric: {e}")
 
-        if len(df) < 2:
-            raise ValueError("Need at least 2 data points for forecasting.")
+def _forecast_one_series(series_df, periods_to_predict):
+    """Process pool entry point: fits and predicts one series, timing it."""
+    started = time.perf_counter()
+    m = Prophet()
+    m.fit(_clean_history(series_df))
+    return _forecast_output(m, periods_to_predict), time.perf_counter() - started
+
+
+def batch_forecast_records(data_path, periods_to_predict, series_column, workers=2):
+    """
+    Forecasts every series in a long-format file (ds, y and `series_column`,
+    e.g. one series per location or station), fitting up to `workers` series
+    in parallel processes. A failing series is reported and skipped.
+
+    Returns a dict {"forecast": [records with series_id], "series":
+    [{series_id, rows, seconds, error}]}, cached per file version like
+    forecast_records.
+    """
+    _check_periods(periods_to_predict)
+
+    key = _data_key(data_path)
+    cache_key = (key, periods_to_predict, series_column)
+    result = _cache_get(_forecasts, cache_key)
+    if result is not None:
+        return result
+
+    for old_key in [k for k in _forecasts if k[0][0] == key[0] and k[0] != key]:
+        del _forecasts[old_key]
 
-        m = Prophet()
-        m.fit(df)
+    df = _read_history(data_path)
+    if series_column not in df.columns:
+        raise ValueError(f"Data has no '{series_column}' column.")
 
-        future = m.make_future_dataframe(periods=periods_to_predict)
-        forecast = m.predict(future)
+    groups = {str(series_id): group[['ds', 'y']].copy()
+              for series_id, group in df.groupby(series_column, sort=True)}
+    forecast, series = [], []
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(groups) or 1))) as pool:
+        futures = {series_id: pool.submit(_forecast_one_series, group, periods_to_predict)
+                   for series_id, group in groups.items()}
+        for series_id, future in futures.items():
+            try:
+                records, seconds = future.result()
+            except Exception as e:
+                series.append({"series_id": series_id, "rows": 0, "seconds": 0.0, "error": str(e)})
+                continue
+            forecast.extend(dict(record, series_id=series_id) for record in records)
+            series.append({"series_id": series_id, "rows": len(records),
+                           "seconds": round(seconds, 3), "error": None})
 
-        forecast_output = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
-        forecast_output['ds'] = forecast_output['ds'].dt.strftime('%Y-%m-%d')
+    result = {"forecast": forecast, "series": series}
+    _cache_put(_forecasts, cache_key, result, _cache_sizes["forecasts"])
+    return result
 
-        print(forecast_output.to_json(orient='records', date_format='iso'))
-        sys.stdout.flush() 
+
+def run_forecast(data_path, periods_to_predict, series_column=None, workers=2):
+    """
+    Reads historical data, runs Prophet forecast, and prints results as JSON to stdout.
+    With `series_column`, forecasts every series in the file (see
+    batch_forecast_records). Prints errors as JSON to stderr.
+    """
+    try:
+        if series_column:
+            result = batch_forecast_records(data_path, periods_to_predict, series_column, workers)
+        else:
+            result = forecast_records(data_path, periods_to_predict)
+        print(json.dumps(result))
+        sys.stdout.flush()
 
     except Exception as e:
         error_output = json.dumps({"error": str(e)})
         print(error_output, file=sys.stderr)
-        sys.stderr.flush() 
-        sys.exit(1) 
+        sys.stderr.flush()
+        sys.exit(1)
+
+
+def serve(default_data_path=None, workers=2, cache_size=FORECAST_CACHE_SIZE):
+    """
+    Persistent worker mode: reads one JSON request per line on stdin,
+    {"id": ..., "days": N, "data": "optional/path.csv", "series_column":
+    "optional"}, and writes one JSON response per line on stdout,
+    {"id": ..., "result": ...} or {"id": ..., "error": "..."}. Exits when
+    stdin is closed. At most `cache_size` finished forecasts are kept.
+    """
+    _cache_sizes["forecasts"] = max(1, cache_size)
+    protocol_out = sys.stdout
+    # Anything Prophet/cmdstanpy print must not corrupt the response stream.
+    sys.stdout = sys.stderr
+
+    def respond(response):
+        protocol_out.write(json.dumps(response) + "\n")
+        protocol_out.flush()
+
+    respond({"ready": True})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            data_path = request.get("data") or default_data_path
+            if not data_path:
+                raise ValueError("No data path given in the request or with --data.")
+            if request.get("series_column"):
+                result = batch_forecast_records(
+                    data_path, request.get("days"), request["series_column"], workers)
+            else:
+                result = forecast_records(data_path, request.get("days"))
+            respond({"id": request_id, "result": result})
+        except Exception as e:
+            respond({"id": request_id, "error": str(e)})
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate forecast using Prophet.')
-    parser.add_argument('--data', required=True, help='Path to the historical data CSV file.')
-    parser.add_argument('--days', required=True, type=int, help='Number of days to predict.')
+    parser.add_argument('--data', help='Path to the historical data CSV file.')
+    parser.add_argument('--days', type=int, help='Number of days to predict.')
+    parser.add_argument('--serve', action='store_true',
+                        help='Answer newline-delimited JSON requests on stdin until it closes.')
+    parser.add_argument('--series-column',
+                        help='Forecast each series in a long-format file, identified by this column.')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Series fitted in parallel with --series-column (default 2).')
+    parser.add_argument('--cache-size', type=int, default=FORECAST_CACHE_SIZE,
+                        help=f'Forecasts kept in memory with --serve (default {FORECAST_CACHE_SIZE}).')
 
     args = parser.parse_args()
 
-    run_forecast(args.data, args.days)
\ No newline at end of file
+    if args.serve:
+        serve(args.data, args.workers, args.cache_size)
+    else:
+        if args.data is None or args.days is None:
+            parser.error('--data and --days are required unless --serve is given.')
+        run_forecast(args.data, args.days, args.series_column, args.workers)
@@ -14,7 +14,10 @@ const config = {
   emailSecure: process.env.EMAIL_SECURE === 'true', 
   emailUser: process.env.EMAIL_USER || '',          
   emailPass: process.env.EMAIL_PASS || '',          
-  emailFrom: process.env.EMAIL_FROM || '"No Reply" <noreply@example.com>'
+  emailFrom: process.env.EMAIL_FROM || '"No Reply" <noreply@example.com>',
+  forecastWorkerEnabled: process.env.FORECAST_WORKER !== 'false',
+  forecastTimeoutMs: parseInt(process.env.FORECAST_TIMEOUT_MS || '120000', 10),
+  forecastCacheSize: parseInt(process.env.FORECAST_CACHE_SIZE || '32', 10)
 };
 
 if (!config.emailUser || !config.emailPass || !config.emailFrom.includes('@')) {
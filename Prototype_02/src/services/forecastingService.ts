@@ -1,5 +1,7 @@
-import { spawn } from 'child_process'; 
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
 import path from 'path';               
+import readline from 'readline';
+import config from '../config';
 
 
 interface ForecastResult {
@@ -9,18 +11,153 @@ interface ForecastResult {
     yhat_upper: number;
 }
 
+interface PendingRequest {
+    resolve: (results: ForecastResult[]) => void;
+    reject: (error: Error) => void;
+    timer: NodeJS.Timeout;
+}
+
+const pythonExecutable = 'python3';
+const scriptPath = path.join('/app', 'python_scripts', 'forecast_demand.py');
+const dataPath = path.join('/app', 'data', 'historical_sales.csv');
+
+/**
+ * Keeps one `forecast_demand.py --serve` process running and sends it
+ * newline-delimited JSON requests, so interpreter startup, the pandas/Prophet
+ * import and model fitting are paid once instead of on every forecast.
+ * The process is (re)started lazily on the next request after it exits.
+ */
+class ForecastWorker {
+    private process: ChildProcessWithoutNullStreams | null = null;
+    private pending = new Map<number, PendingRequest>();
+    private nextId = 1;
+
+    private start(): ChildProcessWithoutNullStreams {
+        // The worker keeps at most FORECAST_CACHE_SIZE forecasts (LRU).
+        const args = [ scriptPath, '--serve', '--data', dataPath, '--cache-size', String(config.forecastCacheSize) ];
+        console.log(`[Forecasting Service] Starting worker: ${pythonExecutable} ${args.join(' ')}`);
+        const child = spawn(pythonExecutable, args);
+
+        readline.createInterface({ input: child.stdout }).on('line', (line) => this.handleLine(line));
+
+        child.stderr.on('data', (data) => {
+            console.error(`[Python Worker STDERR]: ${data.toString()}`);
+        });
+
+        // Writing to a worker that failed to start or just died raises EPIPE;
+        // the 'exit'/'error' handlers below reject the affected requests.
+        child.stdin.on('error', (error) => {
+            console.error('[Forecasting Service] Could not write to forecast worker:', error.message);
+        });
+
+        child.on('exit', (code, signal) => {
+            console.warn(`[Forecasting Service] Worker exited (code ${code}, signal ${signal}).`);
+            if (this.process === child) {
+                this.process = null;
+                this.failAll(new Error(`Forecast worker exited with code ${code}.`));
+            }
+        });
+
+        child.on('error', (error) => {
+            console.error('[Forecasting Service] Failed to start forecast worker:', error);
+            if (this.process === child) {
+                this.process = null;
+                this.failAll(new Error(`Failed to start forecast worker: ${error.message}`));
+            }
+        });
+
+        return child;
+    }
+
+    private handleLine(line: string): void {
+        let response: { id?: number; result?: ForecastResult[]; error?: string; ready?: boolean };
+        try {
+            response = JSON.parse(line);
+        } catch (parseError: any) {
+            console.error('[Forecasting Service] Ignoring non-JSON worker output:', line);
+            return;
+        }
+        if (response.ready) {
+            console.log('[Forecasting Service] Worker ready.');
+            return;
+        }
+
+        const request = response.id !== undefined ? this.pending.get(response.id) : undefined;
+        if (!request) {
+            console.warn('[Forecasting Service] Response for unknown request:', line.slice(0, 200));
+            return;
+        }
+        this.pending.delete(response.id!);
+        clearTimeout(request.timer);
+
+        if (response.error !== undefined || !Array.isArray(response.result)) {
+            request.reject(new Error(`Forecast worker error: ${response.error || 'missing result'}`));
+        } else {
+            request.resolve(response.result);
+        }
+    }
+
+    private failAll(error: Error): void {
+        for (const request of this.pending.values()) {
+            clearTimeout(request.timer);
+            request.reject(error);
+        }
+        this.pending.clear();
+    }
+
+    forecast(daysToPredict: number): Promise<ForecastResult[]> {
+        if (!this.process) {
+            this.process = this.start();
+        }
+        const child = this.process;
+        const id = this.nextId++;
+
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(() => {
+                // A stuck worker would block every later request; replace it
+                // and fail everything that was waiting on it.
+                const error = new Error(`Forecast worker did not answer within ${config.forecastTimeoutMs} ms.`);
+                if (this.process === child) {
+                    this.process = null;
+                    this.failAll(error);
+                    child.kill();
+                } else {
+                    this.pending.delete(id);
+                    reject(error);
+                }
+            }, config.forecastTimeoutMs);
+
+            this.pending.set(id, { resolve, reject, timer });
+            child.stdin.write(JSON.stringify({ id, days: daysToPredict }) + '\n');
+        });
+    }
+}
+
+const worker = new ForecastWorker();
+
 /**
  * Calls the Python Prophet script to generate a forecast.
+ * Requests go to the long-lived forecast worker unless FORECAST_WORKER=false,
+ * in which case a one-shot script process is spawned per forecast.
  * @param daysToPredict Number of days into the future to forecast.
  * @returns A Promise that resolves with an array of ForecastResult objects or rejects with an error.
  */
 export const generateForecast = (daysToPredict: number): Promise<ForecastResult[]> => {
     console.log(`[Forecasting Service] Requesting forecast for ${daysToPredict} days...`);
 
-    const pythonExecutable = 'python3';
-    const scriptPath = path.join('/app', 'python_scripts', 'forecast_demand.py');
-    const dataPath = path.join('/app', 'data', 'historical_sales.csv');
-    
+    if (config.forecastWorkerEnabled) {
+        return worker.forecast(daysToPredict).then((forecastResults) => {
+            console.log(`[Forecasting Service] Forecast received from worker (${forecastResults.length} records).`);
+            return forecastResults;
+        });
+    }
+    return runOneShotForecast(daysToPredict);
+};
+
+/**
+ * Spawns `forecast_demand.py` for a single forecast and parses its stdout.
+ */
+const runOneShotForecast = (daysToPredict: number): Promise<ForecastResult[]> => {
     return new Promise((resolve, reject) => {
         const args = [ scriptPath, '--data', dataPath, '--days', String(daysToPredict) ];
         console.log(`[Forecasting Service] Spawning: ${pythonExecutable} ${args.join(' ')}`);